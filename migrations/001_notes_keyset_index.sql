@@ -0,0 +1,5 @@
+-- Composite index backing keyset pagination of GET /api/notes.
+-- Pages are read in (updated_at DESC, id DESC) order, so a cursor lookup is a
+-- single index range scan of `limit + 1` rows.
+CREATE INDEX IF NOT EXISTS notes_updated_at_id_idx
+    ON public.notes (updated_at DESC, id DESC);
@@ -0,0 +1,49 @@
+-- Server-side full-text search for GET /api/notes/search (Supabase runtime).
+--
+-- `search` is a generated tsvector (title > tags > content weights) with a GIN
+-- index; `search_notes()` is called through PostgREST RPC and returns one page
+-- of notes ordered by ts_rank_cd. The 'simple' configuration is used because
+-- notes are written in many languages. `q` must be a to_tsquery expression;
+-- the app builds it from user input (see Note.build_tsquery).
+-- Idempotent: safe to re-run.
+
+ALTER TABLE public.notes
+    ADD COLUMN IF NOT EXISTS search tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS notes_search_idx ON public.notes USING gin (search);
+
+CREATE OR REPLACE FUNCTION public.search_notes(q text, page_size integer DEFAULT 20, page_offset integer DEFAULT 0)
+RETURNS TABLE (
+    id          bigint,
+    title       text,
+    content     text,
+    tags        text,
+    event_date  date,
+    event_time  time,
+    created_at  timestamptz,
+    updated_at  timestamptz,
+    rank        real
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT n.id, n.title, n.content, n.tags, n.event_date, n.event_time, n.created_at, n.updated_at,
+           ts_rank_cd(n.search, query) AS rank
+    FROM public.notes AS n, to_tsquery('simple', q) AS query
+    WHERE n.search @@ query
+    ORDER BY rank DESC, n.updated_at DESC, n.id DESC
+    LIMIT least(greatest(page_size, 1), 200) OFFSET greatest(page_offset, 0);
+$$;
+
+-- Supabase exposes RPCs to the API roles; plain Postgres has no such roles
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        GRANT EXECUTE ON FUNCTION public.search_notes(text, integer, integer) TO anon, authenticated;
+    END IF;
+END
+$$;
@@ -0,0 +1,38 @@
+-- Tombstones for GET /api/notes/changes (delta sync, Supabase runtime).
+--
+-- Every delete from `notes` (Note.delete(), the dashboard, raw SQL) leaves a
+-- row here via trigger, so clients holding a sync token learn about removals
+-- without re-downloading the list. `deleted_at` is indexed for the
+-- `deleted_at >= <token>` range scan. Idempotent: safe to re-run.
+
+CREATE TABLE IF NOT EXISTS public.note_tombstones (
+    note_id     bigint PRIMARY KEY,
+    deleted_at  timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS note_tombstones_deleted_at_idx
+    ON public.note_tombstones (deleted_at);
+
+CREATE OR REPLACE FUNCTION public.notes_record_tombstone()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.note_tombstones (note_id, deleted_at)
+    VALUES (old.id, now())
+    ON CONFLICT (note_id) DO UPDATE SET deleted_at = excluded.deleted_at;
+    RETURN old;
+END
+$$;
+
+DROP TRIGGER IF EXISTS notes_tombstone_ad ON public.notes;
+CREATE TRIGGER notes_tombstone_ad AFTER DELETE ON public.notes
+    FOR EACH ROW EXECUTE FUNCTION public.notes_record_tombstone();
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        GRANT SELECT ON public.note_tombstones TO anon, authenticated;
+    END IF;
+END
+$$;
@@ -0,0 +1,37 @@
+-- Batched event_date/event_time writes for the inference backfill
+-- (`python -m src.batch_infer backfill`, Supabase runtime).
+--
+-- `set_note_events()` applies a JSON array of {id, event_date, event_time}
+-- in one UPDATE ... FROM, so a page of changes is one PostgREST RPC instead of
+-- one PATCH per note. updated_at is bumped so ETags and delta sync clients see
+-- the change; the updated rows are returned for the app's caches.
+-- Idempotent: safe to re-run.
+
+CREATE OR REPLACE FUNCTION public.set_note_events(changes jsonb)
+RETURNS TABLE (
+    id          bigint,
+    title       text,
+    content     text,
+    tags        text,
+    event_date  date,
+    event_time  time,
+    created_at  timestamptz,
+    updated_at  timestamptz
+)
+LANGUAGE sql VOLATILE
+AS $$
+    UPDATE public.notes AS n
+    SET event_date = c.event_date, event_time = c.event_time, updated_at = now()
+    FROM jsonb_to_recordset(changes) AS c(id bigint, event_date date, event_time time)
+    WHERE n.id = c.id
+    RETURNING n.id, n.title, n.content, n.tags, n.event_date, n.event_time, n.created_at, n.updated_at;
+$$;
+
+-- Supabase exposes RPCs to the API roles; plain Postgres has no such roles
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+        GRANT EXECUTE ON FUNCTION public.set_note_events(jsonb) TO anon, authenticated;
+    END IF;
+END
+$$;
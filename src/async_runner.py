@@ -0,0 +1,72 @@
+"""One long-lived asyncio event loop per worker process for sync (WSGI) code.
+
+Flask handlers call the async `note_supabase.Note` methods through `run()`,
+which submits the coroutine to a loop running forever in a daemon thread and
+blocks the calling request thread until it finishes. Because every request
+shares that loop, the async Supabase client (and its connection pool) created
+on it is reused, and the network waits of concurrent requests overlap instead
+of each request spinning up and tearing down its own loop.
+
+The caller's context variables (request trace, log route) are carried over
+into the coroutine's task, by `run()` and `submit()` alike, as `asyncio.to_thread` does in the other direction.
+
+The loop is recreated after fork() (e.g. gunicorn --preload), since threads
+do not survive into the child.
+"""
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's background loop, starting its thread on first use."""
+    global _loop, _loop_pid
+    if _loop is not None and _loop_pid == os.getpid():
+        return _loop
+    with _lock:
+        if _loop is None or _loop_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='async-runner', daemon=True)
+            thread.start()
+            _loop, _loop_pid = loop, os.getpid()
+        return _loop
+
+
+def run(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run `coro` on the background loop and return its result (exceptions propagate).
+    Must not be called from the background loop itself, which would deadlock.
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("async_runner.run() called from its own event loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), loop)
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise
+
+
+async def _in_context(coro: Awaitable[Any], ctx: contextvars.Context) -> Any:
+    # The task has its own context: setting the caller's values here does not leak to other tasks
+    for var, value in ctx.items():
+        var.set(value)
+    return await coro
+
+
+def submit(coro: Awaitable[Any]) -> concurrent.futures.Future:
+    """Schedule `coro` on the background loop without waiting; returns a concurrent Future.
+    Like run(), the coroutine sees the caller's context variables.
+    """
+    return asyncio.run_coroutine_threadsafe(_in_context(coro, contextvars.copy_context()), get_loop())
@@ -0,0 +1,205 @@
+"""Batch event date/time inference (`POST /api/infer/batch`) and the backfill command.
+
+`infer_many()` runs `datetime_infer.infer_event_datetime` over many texts
+against one shared reference `now`. Texts are cut into chunks of
+NOTES_INFER_CHUNK_SIZE (default 256) and spread over a process pool of
+NOTES_INFER_WORKERS processes (default: CPU count, max 4; 0 runs inline), so
+a large batch is not held to one core by the GIL. Results are yielded in
+input order as chunks complete, which lets the endpoint stream NDJSON:
+
+    POST /api/infer/batch  {"texts": ["Dinner tomorrow 6pm", ["title", "content"]], "now": "2025-10-16T09:00"}
+    -> {"index": 0, "event_date": "2025-10-17", "event_time": "18:00"}
+       {"index": 1, "event_date": null, "event_time": null}
+
+An item may be a list of strings (e.g. title and content), inferred as one
+text like generate-and-save does. Batches that fit in one chunk, and hosts
+where a pool cannot be started (some serverless sandboxes), run inline.
+
+Backfill fills `event_date`/`event_time` on existing notes (Supabase runtime):
+
+    python -m src.batch_infer backfill [--dry-run] [--overwrite] [--now ISO] [--batch-size N]
+
+Notes are read in keyset pages, inferred through the same pool, and only the
+rows whose values change are written, one `set_note_events` RPC per page
+(migrations/004_notes_event_backfill.sql). Existing values are kept unless
+--overwrite is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src import log
+from src.datetime_infer import infer_event_datetime
+from src.pagination import POSTGREST_MAX_ROWS
+
+logger = log.get_logger(__name__)
+
+MAX_TEXTS = 50000
+# A page reads batch + 1 rows; a read cut by PostgREST's max-rows would end the backfill early
+MAX_BACKFILL_BATCH = POSTGREST_MAX_ROWS - 1
+
+Item = Union[str, Sequence[str], None]
+
+_pool = None  # concurrent.futures.ProcessPoolExecutor, started on first use
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def workers() -> int:
+    value = os.getenv('NOTES_INFER_WORKERS')
+    if value in (None, ''):
+        return min(4, os.cpu_count() or 1)
+    return max(0, int(value))
+
+
+def chunk_size() -> int:
+    return max(1, int(os.getenv('NOTES_INFER_CHUNK_SIZE', 256)))
+
+
+def parse_request(payload: Any) -> Tuple[List[Item], datetime]:
+    """Validate a `POST /api/infer/batch` body; raises ValueError (400) on bad input."""
+    if not isinstance(payload, dict) or not isinstance(payload.get('texts'), list):
+        raise ValueError("texts must be a list")
+    texts = payload['texts']
+    if len(texts) > MAX_TEXTS:
+        raise ValueError(f"at most {MAX_TEXTS} texts per request")
+    for i, item in enumerate(texts):
+        parts = item if isinstance(item, list) else [item]
+        if not all(p is None or isinstance(p, str) for p in parts):
+            raise ValueError(f"texts[{i}] must be a string or a list of strings")
+    now = payload.get('now')
+    if now in (None, ''):
+        return texts, datetime.now()
+    try:
+        parsed = datetime.fromisoformat(str(now).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError("now must be an ISO datetime")
+    # Inference works on calendar dates; keep the caller's wall-clock values
+    return texts, parsed.replace(tzinfo=None)
+
+
+def _infer_chunk(chunk: List[Item], now: datetime) -> List[Tuple[Optional[str], Optional[str]]]:
+    results = []
+    for item in chunk:
+        parts = [item] if item is None or isinstance(item, str) else item
+        results.append(infer_event_datetime(*parts, now=now))
+    return results
+
+
+def _get_pool(size: int):
+    """Process-wide pool, started on first use; None when processes are unavailable."""
+    global _pool, _pool_pid
+    if _pool is not None and _pool_pid == os.getpid():
+        return _pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            try:
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # spawn: forking a threaded web worker can deadlock the child
+                _pool = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError, ImportError) as e:
+                logger.warning("Process pool unavailable (%s); inferring inline", e)
+                return None
+            _pool_pid = os.getpid()
+    return _pool
+
+
+def _chunks(items: Sequence[Item], size: int) -> Iterator[List[Item]]:
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+def infer_many(items: Iterable[Item], now: Optional[datetime] = None, chunk: Optional[int] = None,
+               max_workers: Optional[int] = None) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+    """Yield (event_date, event_time) for each item, in order, as chunks complete."""
+    items = items if isinstance(items, list) else list(items)
+    now = now or datetime.now()
+    size = chunk or chunk_size()
+    max_workers = workers() if max_workers is None else max_workers
+    pool = _get_pool(max_workers) if max_workers > 0 and len(items) > size else None
+    if pool is None:
+        for part in _chunks(items, size):
+            yield from _infer_chunk(part, now)
+        return
+    # map() keeps every chunk in flight and hands results back in submission order
+    parts = list(_chunks(items, size))
+    for results in pool.map(_infer_chunk, parts, [now] * len(parts)):
+        yield from results
+
+
+def iter_ndjson(items: List[Item], now: datetime) -> Iterator[str]:
+    """The streamed `POST /api/infer/batch` body, one write per chunk of results."""
+    size = chunk_size()
+    lines = []
+    for index, (event_date, event_time) in enumerate(infer_many(items, now, size)):
+        lines.append(json.dumps({'index': index, 'event_date': event_date, 'event_time': event_time}) + '\n')
+        if len(lines) >= size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def plan_updates(rows: List[Dict[str, Any]], inferred: Iterable[Tuple[Optional[str], Optional[str]]],
+                 overwrite: bool = False) -> List[Dict[str, Any]]:
+    """Changes to write for `to_dict()` rows: only rows whose event_date/event_time would differ.
+    Inferred values never clear a field; existing values are replaced only with `overwrite`.
+    """
+    changes = []
+    for row, (event_date, event_time) in zip(rows, inferred):
+        # Stored times come back as HH:MM:SS
+        event_time = f"{event_time}:00" if event_time else None
+        new_date = event_date if event_date and (overwrite or not row.get('event_date')) else row.get('event_date')
+        new_time = event_time if event_time and (overwrite or not row.get('event_time')) else row.get('event_time')
+        if (new_date, new_time) != (row.get('event_date'), row.get('event_time')):
+            changes.append({'id': row['id'], 'event_date': new_date, 'event_time': new_time})
+    return changes
+
+
+async def backfill(note_cls, now: Optional[datetime] = None, batch_size: int = 500,
+                   overwrite: bool = False, dry_run: bool = False) -> Dict[str, int]:
+    """Infer event fields for every note, page by page, and write the changed rows in one call per page."""
+    now = now or datetime.now()
+    batch_size = max(1, min(batch_size, MAX_BACKFILL_BATCH))
+    loop = asyncio.get_running_loop()
+    summary = {'scanned': 0, 'changed': 0, 'written': 0}
+    cursor = None
+    while True:
+        rows, cursor = await note_cls.get_page(batch_size, cursor, as_dicts=True)
+        texts = [[row['title'], row['content']] for row in rows]
+        # Inference is CPU-bound; keep it off the loop
+        inferred = await loop.run_in_executor(None, lambda: list(infer_many(texts, now)))
+        changes = plan_updates(rows, inferred, overwrite)
+        summary['scanned'] += len(rows)
+        summary['changed'] += len(changes)
+        if changes and not dry_run:
+            summary['written'] += await note_cls.set_events_many(changes)
+        # Updated rows move to the head of the (updated_at DESC, id DESC) order, behind the cursor
+        if not cursor:
+            return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.batch_infer')
+    commands = parser.add_subparsers(dest='command', required=True)
+    cmd = commands.add_parser('backfill', help='infer event_date/event_time for existing notes')
+    cmd.add_argument('--dry-run', action='store_true', help='report the changes without writing them')
+    cmd.add_argument('--overwrite', action='store_true', help='replace existing values too')
+    cmd.add_argument('--now', help='reference time for relative cues (ISO, default: now)')
+    cmd.add_argument('--batch-size', type=int, default=500, help=f'notes per page/write (max {MAX_BACKFILL_BATCH})')
+    args = parser.parse_args(argv)
+
+    from src.models.note_supabase import Note
+    now = datetime.fromisoformat(args.now) if args.now else None
+    summary = asyncio.run(backfill(Note, now, args.batch_size, args.overwrite, args.dry_run))
+    print(f"[infer] Scanned {summary['scanned']} notes, {summary['changed']} to change, "
+          f"{summary['written']} written{' (dry run)' if args.dry_run else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Shared parsing for `POST /api/notes/bulk` (NDJSON note import).
+
+The body is newline-delimited JSON, one note object per line, read as a stream
+so large imports never sit in memory as a whole:
+    {"title": "Badminton", "content": "5pm @polyu", "tags": ["sports"], "event_date": "2025-10-17"}
+
+Each backend parses rows with `parse_rows()`/`parse_line()`, giving it its own
+date/time normalizers, and inserts the valid ones in batches (one multi-row
+insert per batch). Bad lines, and rows the database rejects, are reported by
+line number and never abort the import.
+
+Tuning: NOTES_BULK_BATCH_SIZE (rows per insert, default 500, also
+overridable per request with `?batch_size=`, capped at MAX_BATCH_SIZE) and
+NOTES_BULK_CONCURRENCY (batches in flight on the Supabase backends, default 4).
+"""
+import json
+import os
+import threading
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src import log
+
+logger = log.get_logger(__name__)
+
+MAX_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+
+def concurrency() -> int:
+    return max(1, int(os.getenv('NOTES_BULK_CONCURRENCY', 4)))
+
+
+def parse_batch_size(value) -> int:
+    """Parse `?batch_size=`; raises ValueError for non-positive values, clamps to MAX_BATCH_SIZE."""
+    if value in (None, ''):
+        value = os.getenv('NOTES_BULK_BATCH_SIZE', 500)
+    size = int(value)
+    if size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    return min(size, MAX_BATCH_SIZE)
+
+
+def normalize_row(obj: Any, parse_date: Callable, parse_time: Callable) -> Dict[str, Any]:
+    """Validate one decoded line and return insert-ready fields; raises ValueError on bad input."""
+    if not isinstance(obj, dict):
+        raise ValueError("each line must be a JSON object")
+    title = obj.get('title')
+    content = obj.get('content')
+    if not (title or content):
+        raise ValueError("title or content is required")
+    tags = obj.get('tags')
+    if isinstance(tags, list):
+        tags = ','.join(str(t).strip() for t in tags if str(t).strip())
+    elif tags is not None:
+        tags = str(tags).strip()
+    row = {
+        'title': str(title or 'Untitled'),
+        'content': str(content or ''),
+        'tags': tags or None,
+        'event_date': parse_date(obj.get('event_date')),
+        'event_time': parse_time(obj.get('event_time')),
+    }
+    if obj.get('event_date') not in (None, '') and row['event_date'] is None:
+        raise ValueError(f"invalid event_date: {obj.get('event_date')!r}")
+    if obj.get('event_time') not in (None, '') and row['event_time'] is None:
+        raise ValueError(f"invalid event_time: {obj.get('event_time')!r}")
+    return row
+
+
+def parse_line(line, parse_date: Callable, parse_time: Callable) -> Optional[Dict[str, Any]]:
+    """Decode and normalize one NDJSON line; None for blank lines, ValueError for bad ones."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8', errors='replace')
+    line = line.strip()
+    if not line:
+        return None
+    return normalize_row(json.loads(line), parse_date, parse_time)  # JSONDecodeError is a ValueError
+
+
+def parse_rows(lines: Iterable, parse_date: Callable, parse_time: Callable,
+               report: 'ImportReport') -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line_number, row) for each valid line, recording invalid ones in `report`."""
+    for line_no, line in enumerate(lines, start=1):
+        try:
+            row = parse_line(line, parse_date, parse_time)
+        except ValueError as e:
+            report.error(line_no, str(e))
+            continue
+        if row is not None:
+            yield line_no, row
+
+
+class _LineSplitter:
+    """Splits a byte stream fed chunk by chunk into lines. Each chunk is scanned once and a
+    partial line is kept as a list of pieces, so a line spanning many chunks costs linear time.
+    """
+
+    def __init__(self):
+        self.pending: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        *lines, rest = chunk.split(b'\n')
+        if lines and self.pending:
+            self.pending.append(lines[0])
+            lines[0] = b''.join(self.pending)
+            self.pending = []
+        if rest:
+            self.pending.append(rest)
+        return lines
+
+    def tail(self) -> bytes:
+        return b''.join(self.pending)
+
+
+def read_lines(stream, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Split a file-like byte stream into lines, reading it in large chunks.
+    (Iterating a WSGI input stream directly calls readline(), which reads one byte at a time.)
+    """
+    splitter = _LineSplitter()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield from splitter.feed(chunk)
+    tail = splitter.tail()
+    if tail:
+        yield tail
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]):
+    """Split an async byte stream (e.g. Starlette's request.stream()) into lines."""
+    splitter = _LineSplitter()
+    async for chunk in chunks:
+        for line in splitter.feed(chunk):
+            yield line
+    tail = splitter.tail()
+    if tail:
+        yield tail
+
+
+def batches(rows: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def insert_batch(insert_many: Callable[[List[Dict[str, Any]]], Awaitable[int]],
+                       batch: List[Tuple[int, Dict[str, Any]]], report: 'ImportReport') -> None:
+    """Insert one batch with a single call; if that fails, retry row by row so only bad rows fail."""
+    try:
+        report.add_inserted(await insert_many([row for _, row in batch]))
+        return
+    except Exception as e:
+        if len(batch) == 1:
+            report.error(batch[0][0], str(e))
+            return
+        logger.warning("Batch of %d rows failed (%s); retrying row by row", len(batch), e)
+    for line_no, row in batch:
+        try:
+            report.add_inserted(await insert_many([row]))
+        except Exception as e:
+            report.error(line_no, str(e))
+
+
+class ImportReport:
+    """Accumulates the per-import summary returned to the client (thread-safe)."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_inserted(self, count: int) -> None:
+        with self._lock:
+            self.inserted += count
+
+    def error(self, line_no: int, message: str) -> None:
+        with self._lock:
+            self.failed += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append({'line': line_no, 'error': message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'inserted': self.inserted,
+                'failed': self.failed,
+                'errors': sorted(self.errors, key=lambda e: e['line']),
+                'errors_truncated': self.failed > len(self.errors),
+            }
@@ -0,0 +1,116 @@
+"""Cold-start profiler for the Vercel entrypoint (`api/index.py`).
+
+    python -m src.coldstart [--path /api/health] [--path /] [--top 25]
+
+Starts a fresh interpreter with `-X importtime`, imports `api.index` and sends
+the given requests to its WSGI `app` through werkzeug's test client, the way
+the first invocation of a serverless instance does. Prints the wall time of
+each step, the slowest imports (cumulative, the `-X importtime` tree
+flattened) and the import time per top-level package, so a regression in
+what the first request has to import shows up as a line item.
+
+`measure()` is also what tests/bench_cold_start.py asserts its budget on.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Sequence
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line with the timings
+_CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import api.index as entry
+from werkzeug.test import Client
+result = {'import_ms': (time.perf_counter() - t0) * 1000, 'requests': []}
+client = Client(entry.app)
+for path in sys.argv[1:]:
+    t = time.perf_counter()
+    response = client.get(path)
+    response.close()
+    result['requests'].append({'path': path, 'status': response.status_code,
+                               'ms': (time.perf_counter() - t) * 1000})
+result['total_ms'] = (time.perf_counter() - t0) * 1000
+print('COLDSTART ' + json.dumps(result))
+'''
+
+
+class ImportRecord(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parse `-X importtime` lines ("import time: self [us] | cumulative | name")."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip(' ')
+        records.append(ImportRecord(stripped, int(parts[0]), int(parts[1]), (len(name) - len(stripped)) // 2))
+    return records
+
+
+def by_package(records: Sequence[ImportRecord]) -> Dict[str, int]:
+    """Self time in microseconds summed per top-level package, largest first."""
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.name.split('.')[0]] += record.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure(paths: Sequence[str] = ('/api/health',), importtime: bool = True) -> Dict:
+    """Time `import api.index` plus `paths` in a fresh interpreter."""
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _CHILD] + list(paths)
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(cmd, cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, timeout=120)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith('COLDSTART ')]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"cold-start child failed ({proc.returncode}):\n{proc.stderr[-2000:]}")
+    result = json.loads(lines[-1][len('COLDSTART '):])
+    result['imports'] = parse_importtime(proc.stderr) if importtime else []
+    return result
+
+
+def report(result: Dict, top: int = 25) -> str:
+    out = [f"import api.index: {result['import_ms']:8.1f} ms"]
+    for request in result['requests']:
+        out.append(f"GET {request['path']:<20} {request['ms']:8.1f} ms  ({request['status']})")
+    out.append(f"total: {result['total_ms']:8.1f} ms  (-X importtime adds its own overhead)")
+    imports = result['imports']
+    if imports:
+        out.append(f"\nSlowest imports (cumulative ms, self ms):")
+        for record in sorted(imports, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+            out.append(f"  {record.cumulative_us / 1000:8.1f} {record.self_us / 1000:8.1f}  {'  ' * record.depth}{record.name}")
+        out.append(f"\nSelf time by top-level package (ms):")
+        for package, us in list(by_package(imports).items())[:top]:
+            out.append(f"  {us / 1000:8.1f}  {package}")
+    return '\n'.join(out)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m src.coldstart', description=__doc__.split('\n')[0])
+    parser.add_argument('--path', action='append', help='request to send after the import (repeatable, default /api/health)')
+    parser.add_argument('--top', type=int, default=25, help='rows per table')
+    parser.add_argument('--json', action='store_true', help='print the raw measurements')
+    args = parser.parse_args(argv)
+    result = measure(args.path or ['/api/health'])
+    if args.json:
+        print(json.dumps(dict(result, imports=[r._asdict() for r in result['imports']]), indent=2))
+    else:
+        print(report(result, args.top))
+
+
+if __name__ == '__main__':
+    main()
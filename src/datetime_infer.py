@@ -0,0 +1,239 @@
+"""Event date/time inference from free text (no external deps).
+
+Used by generate-and-save to fill `event_date`/`event_time` from the user's
+text and the LLM's content. Cues, by priority within each field:
+
+    time: 24h "18:00" > "6pm"/"6:30 pm" > noon/midday > midnight > morning >
+          afternoon > evening > night
+    date: tomorrow/tmr > today > [next|this] weekday > "17 oct [2025]" >
+          "oct 17[, 2025]" > numeric 17/10/2025, 2025-10-17
+
+A field takes the value of its highest-priority cue and, within a cue, its
+first occurrence - the same answers as the dozen separate regex searches and
+substring scans this replaces. Here the lowered text is tokenized once into
+digit and letter runs: a keyword table (memoized per word) flags relative and
+time-of-day words and the tokens that can start a weekday or month form, and
+the full cue patterns are only tried, anchored, at those tokens. Cues that can
+no longer change the result are dropped as the scan goes, so it usually stops
+after the first few cues of a long pasted text.
+"""
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from src import tracing
+
+WEEKDAYS = {
+    'monday': 0, 'mon': 0,
+    'tuesday': 1, 'tue': 1, 'tues': 1,
+    'wednesday': 2, 'wed': 2,
+    'thursday': 3, 'thu': 3, 'thurs': 3,
+    'friday': 4, 'fri': 4,
+    'saturday': 5, 'sat': 5,
+    'sunday': 6, 'sun': 6,
+}
+
+MONTHS = {
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sep': 9, 'sept': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+
+_WEEKDAY = 'monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tue|tues|wed|thu|thurs|fri|sat|sun'
+_MONTH = 'jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|sep|sept|september|oct|october|nov|november|dec|december'
+
+# Anchored cue patterns. A leading "at " (allowed by the old 24h/am-pm
+# searches) never changes the captured digits, so it is left out.
+_PATTERNS = {
+    't24': r'\b([01]?\d|2[0-3]):([0-5]\d)\b',
+    'ampm': r'(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?\s*(am|pm)\b',
+    'weekday': rf'\b(next|this)?\s*({_WEEKDAY})\b',
+    'day_month': rf'\b(\d{{1,2}})\s+({_MONTH})\s*(\d{{4}})?\b',
+    'month_day': rf'\b({_MONTH})\s+(\d{{1,2}})(?:,\s*(\d{{4}}))?\b',
+    'numeric': r'\b\d{1,4}[\-/\.]\d{1,2}[\-/\.]\d{1,4}\b',
+}
+TIME_CATEGORIES = ('t24', 'ampm', 'noon', 'midnight', 'morning', 'afternoon', 'evening', 'night')
+DATE_CATEGORIES = ('tomorrow', 'today', 'weekday', 'day_month', 'month_day', 'numeric')
+_FIXED_TIMES = {'noon': '12:00', 'midnight': '00:00', 'morning': '09:00',
+                'afternoon': '15:00', 'evening': '19:00', 'night': '21:00'}
+
+_COMPILED = {name: re.compile(p) for name, p in _PATTERNS.items()}
+
+
+_TOKEN = re.compile(r'(\d+)|([a-z]+)')
+_KEYWORDS = {
+    'noon': ('noon', 'midday'), 'midnight': ('midnight',), 'morning': ('morning',),
+    'afternoon': ('afternoon',), 'evening': ('evening',), 'night': ('night',),
+    'tomorrow': ('tomorrow', 'tmr'), 'today': ('today',),
+}
+_MODIFIERS = ('next', 'this')
+
+
+@lru_cache(maxsize=4096)
+def _word_cues(word: str) -> Tuple[str, ...]:
+    """Cues a letter run can carry: keywords anywhere inside it (so "tonight" is night),
+    plus the weekday/month forms it may start (confirmed by the anchored pattern)."""
+    cues = [cat for cat, words in _KEYWORDS.items() if any(w in word for w in words)]
+    if word in WEEKDAYS or word in _MODIFIERS or (word[:4] in _MODIFIERS and word[4:] in WEEKDAYS):
+        cues.append('weekday')
+    if word in MONTHS:
+        cues.append('month_day')
+    return tuple(cues)
+
+
+def _next_weekday(target_weekday: int, ref: datetime) -> datetime:
+    days_ahead = (target_weekday - ref.weekday()) % 7
+    if days_ahead == 0:
+        days_ahead = 7
+    return ref + timedelta(days=days_ahead)
+
+
+def _this_or_next_weekday(target_weekday: int, ref: datetime, force_next: bool) -> datetime:
+    if force_next:
+        return _next_weekday(target_weekday, ref)
+    # upcoming occurrence including today
+    days_ahead = (target_weekday - ref.weekday()) % 7
+    return ref + timedelta(days=days_ahead)
+
+
+def _parse_numeric_date(token: str) -> Optional[datetime]:
+    token = token.replace('.', '/').replace('-', '/').strip()
+    parts = token.split('/')
+    try:
+        if len(parts) == 3:
+            a, b, c = parts
+            if len(a) == 4:  # YYYY/MM/DD
+                return datetime(int(a), int(b), int(c))
+            d1, m1, y1 = int(a), int(b), int(c)
+            if 1 <= d1 <= 31 and 1 <= m1 <= 12 and len(c) == 4:
+                if d1 > 12:
+                    return datetime(y1, m1, d1)
+                if m1 > 12:
+                    return datetime(y1, d1, m1)
+                return datetime(y1, m1, d1)
+    except Exception:
+        return None
+    return None
+
+
+def _value(category: str, m: 're.Match', now: datetime) -> Optional[str]:
+    """Field value for a category's first match; None when it does not yield one (e.g. 31 feb)."""
+    if category == 't24':
+        return f"{int(m.group(1)):02d}:{int(m.group(2)):02d}"
+    if category == 'ampm':
+        h = int(m.group(1)); mi = int(m.group(2) or 0)
+        if m.group(4) == 'pm' and h != 12:
+            h += 12
+        if m.group(4) == 'am' and h == 12:
+            h = 0
+        h = max(0, min(23, h)); mi = max(0, min(59, mi))
+        return f"{h:02d}:{mi:02d}"
+    if category in _FIXED_TIMES:
+        return _FIXED_TIMES[category]
+    if category == 'tomorrow':
+        return (now + timedelta(days=1)).date().isoformat()
+    if category == 'today':
+        return now.date().isoformat()
+    if category == 'weekday':
+        dt = _this_or_next_weekday(WEEKDAYS[m.group(2)], now, force_next=(m.group(1) == 'next'))
+        return dt.date().isoformat()
+    try:
+        if category == 'day_month':
+            return datetime(int(m.group(3) or now.year), MONTHS[m.group(2)], int(m.group(1))).date().isoformat()
+        if category == 'month_day':
+            return datetime(int(m.group(3) or now.year), MONTHS[m.group(1)], int(m.group(2))).date().isoformat()
+    except ValueError:
+        return None
+    dt = _parse_numeric_date(m.group(0))
+    return dt.date().isoformat() if dt else None
+
+
+def scan(text: str, now: Optional[datetime] = None,
+         categories: Iterable[str] = TIME_CATEGORIES + DATE_CATEGORIES) -> Dict[str, Optional[str]]:
+    """Single left-to-right pass; returns {'date': ..., 'time': ...} for the fields asked for."""
+    s = (text or '').lower()
+    now = now or datetime.now()
+    pending = set(categories)
+    best: Dict[str, Tuple[int, str]] = {}  # field -> (priority, value)
+    numeric_resume = 0  # numeric tokens are tried in non-overlapping order, like re.findall
+
+    def settle(category: str, value: Optional[str]) -> None:
+        pending.discard(category)
+        order = TIME_CATEGORIES if category in TIME_CATEGORIES else DATE_CATEGORIES
+        field = 'time' if order is TIME_CATEGORIES else 'date'
+        rank = order.index(category)
+        if value is not None and (field not in best or rank < best[field][0]):
+            best[field] = (rank, value)
+            # Lower-priority cues of this field can no longer win
+            pending.difference_update(order[rank + 1:])
+
+    for tok in _TOKEN.finditer(s):
+        word = tok.group(2)
+        if word is not None:
+            cues = _word_cues(word)
+            if not cues:
+                continue
+            start = tok.start()
+            for category in cues:
+                if category not in pending:
+                    continue
+                if category in _KEYWORDS:
+                    settle(category, _value(category, None, now))
+                else:
+                    m = _COMPILED[category].match(s, start)
+                    if m:
+                        settle(category, _value(category, m, now))
+        else:
+            start, end = tok.span()
+            # 24h, day-month and numeric forms start a digit run; "5pm"/"5:30 pm" starts
+            # in its last two digits ("1130am" reads as 30am, as it always has)
+            for category in ('t24', 'day_month'):
+                if category in pending:
+                    m = _COMPILED[category].match(s, start)
+                    if m:
+                        settle(category, _value(category, m, now))
+            if 'numeric' in pending and start >= numeric_resume:
+                m = _COMPILED['numeric'].match(s, start)
+                if m:
+                    numeric_resume = m.end()
+                    value = _value('numeric', m, now)
+                    if value is not None:
+                        settle('numeric', value)
+            if 'ampm' in pending:
+                for p in range(max(start, end - 2), end):
+                    m = _COMPILED['ampm'].match(s, p)
+                    if m:
+                        settle('ampm', _value('ampm', m, now))
+                        break
+        if not pending:
+            break
+    return {field: best[field][1] for field in best}
+
+
+def infer_time(text: str) -> Optional[str]:
+    return scan(text, categories=TIME_CATEGORIES).get('time')
+
+
+def infer_date(text: str, now: datetime = None) -> Optional[str]:
+    if not text:
+        return None
+    return scan(text, now, categories=DATE_CATEGORIES).get('date')
+
+
+@tracing.traced('infer')
+def infer_event_datetime(*texts: str, now: datetime = None) -> tuple:
+    merged = ' \n '.join(t for t in texts if t)
+    if not merged:
+        return None, None
+    found = scan(merged, now)
+    return found.get('date'), found.get('time')
@@ -1,8 +1,20 @@
+"""Supabase configuration and lazily created clients.
+
+Nothing here touches the network or imports the `supabase` package (about half
+of the app's import time) at import: `init_supabase_if_needed()` only checks
+the configuration, and the async clients are created, with their imports, on
+first use by `get_async_supabase()`. Serverless cold starts that only serve
+the UI or /api/health never pay for them.
+"""
+import asyncio
 import os
-from typing import Optional
-from supabase import create_client
+import weakref
 from dotenv import load_dotenv
 
+from src import log
+
+logger = log.get_logger(__name__)
+
 # Load environment variables once at import time (safe for serverless)
 load_dotenv()
 
@@ -18,31 +30,47 @@ _SUPABASE_KEY = (
     or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 )
 
-supabase = None  # type: Optional[object]
-DB_READY = False
+_warned = False
 
 def init_supabase_if_needed() -> bool:
-    """Lazy-init Supabase client. Returns True if ready, False otherwise.
-    Avoids raising at import time on serverless cold start.
+    """Return True if Supabase is configured, False otherwise (never raises, no I/O).
+    Clients are created on first use by get_async_supabase().
     """
-    global supabase, DB_READY
-    if DB_READY and supabase is not None:
-        return True
+    global _warned
     if not _SUPABASE_KEY:
-        print("SUPABASE_KEY/SUPABASE_ANON_KEY is not set; database features are disabled")
-        DB_READY = False
-        return False
-    try:
-        print(f"Initializing Supabase client with URL: {_SUPABASE_URL}")
-        supabase = create_client(_SUPABASE_URL, _SUPABASE_KEY)
-        # Do not run test queries at import/cold start to reduce latency/failures
-        DB_READY = True
-        return True
-    except Exception as e:
-        print(f"Failed to initialize Supabase client: {e}")
-        supabase = None
-        DB_READY = False
+        if not _warned:
+            _warned = True
+            logger.warning("SUPABASE_KEY/SUPABASE_ANON_KEY is not set; database features are disabled")
         return False
+    return True
 
-# Try best-effort init (won't raise)
-init_supabase_if_needed()
\ No newline at end of file
+# Async clients keyed by event loop: their httpx connection pool is bound to the loop
+# that created it (the async_runner loop under Flask, uvicorn's loop under FastAPI)
+_async_clients = weakref.WeakKeyDictionary()
+# Client creations in flight: concurrent first requests on a loop wait for the same one
+_async_pending = weakref.WeakKeyDictionary()
+
+
+async def get_async_supabase():
+    """Return the non-blocking Supabase client for the running event loop, creating it once.
+    Raises RuntimeError when the database is not configured.
+    """
+    if not init_supabase_if_needed():
+        raise RuntimeError("Database is not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+    task = _async_pending.get(loop)
+    if task is None:
+        from supabase import acreate_client
+        logger.info("Initializing Supabase client with URL: %s", _SUPABASE_URL)
+        task = _async_pending[loop] = loop.create_task(acreate_client(_SUPABASE_URL, _SUPABASE_KEY))
+    try:
+        # shield: a cancelled caller must not cancel the creation the others are waiting for
+        client = await asyncio.shield(task)
+    finally:
+        if task.done():
+            _async_pending.pop(loop, None)  # a failed creation is retried by the next call
+    _async_clients[loop] = client
+    return client
@@ -0,0 +1,85 @@
+"""Strong ETags and conditional GET helpers shared by the note backends.
+
+Validators are derived from metadata only, so a matching `If-None-Match` is
+answered with 304 before any note is serialized. They are strong because
+they change on every write: updated_at is stored with microseconds.
+- list: max(updated_at) plus the newest tombstone deleted_at (plus the query
+  string, so each keyset page has its own tag). Inserts and updates bump the
+  first, deletes the second; both backends record tombstones.
+- detail: note id plus its updated_at, encoded reversibly so an `If-Match`
+  on PUT/DELETE can be checked by the database in the same statement
+  (`... WHERE id = :id AND updated_at = :updated_at`).
+"""
+import hashlib
+from datetime import datetime
+from typing import Any, Optional, Union
+
+from src.pagination import decode_cursor, encode_cursor
+
+# Revalidate on every use; the 304 path is cheap
+CACHE_CONTROL = 'no-cache'
+
+
+def _tag(*parts: Any) -> str:
+    raw = '|'.join('' if p is None else str(p) for p in parts)
+    return '"' + hashlib.sha1(raw.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def _iso(value: Union[str, datetime, None]) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def list_etag(max_updated_at: Union[str, datetime, None], deleted_mark: Union[str, datetime, None],
+              query: str = '') -> str:
+    return _tag('list', _iso(max_updated_at), _iso(deleted_mark), query)
+
+
+def note_etag(note_id: Union[int, str], updated_at: Union[str, datetime, None]) -> str:
+    if updated_at is None:
+        return _tag('note', note_id)
+    return '"' + encode_cursor(updated_at, note_id) + '"'
+
+
+def if_match_updated_at(if_match: Optional[str], note_id: Union[int, str]) -> Optional[str]:
+    """The updated_at an `If-Match` header pins for `note_id` (None when absent or `*`).
+    Raises ValueError when it cannot match, i.e. the request must fail with 412.
+    """
+    if not if_match or if_match.strip() == '*':
+        return None
+    value = if_match.strip()
+    # If-Match uses strong comparison: weak tags and lists of several tags never match here
+    if not (len(value) > 2 and value[0] == value[-1] == '"'):
+        raise ValueError('If-Match does not match the current note')
+    updated_at, tagged_id = decode_cursor(value[1:-1])
+    if str(tagged_id) != str(note_id):
+        raise ValueError('If-Match does not match the current note')
+    return updated_at
+
+
+def expected_updated_at(if_match: Optional[str], body_updated_at: Any, note_id: Union[int, str]) -> Optional[str]:
+    """Optimistic-concurrency precondition for a write: from `If-Match`, else an `updated_at`
+    echoed in the request body. Raises ValueError (412) when it is unusable."""
+    if if_match:
+        return if_match_updated_at(if_match, note_id)
+    if body_updated_at in (None, ''):
+        return None
+    try:
+        datetime.fromisoformat(str(body_updated_at).replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError('updated_at must be an ISO timestamp')
+    return str(body_updated_at)
+
+
+def matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header value matches `etag` (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
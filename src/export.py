@@ -0,0 +1,86 @@
+"""Streaming export for `GET /api/notes/export?format=ndjson|csv`.
+
+Notes are read in keyset-ordered chunks (`Note.get_page`, newest first) and
+each chunk is encoded and sent before the next one is fetched, so a worker
+holds at most one chunk in memory whatever the size of the table.
+Chunk size: NOTES_EXPORT_CHUNK_SIZE (default 500). A chunk is one `limit + 1`
+read, so the size is capped below PostgREST's max-rows (see pagination.py):
+a read cut short by the server would look like the last page.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.pagination import POSTGREST_MAX_ROWS
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+COLUMNS = ['id', 'title', 'content', 'tags', 'event_date', 'event_time', 'created_at', 'updated_at']
+
+
+def parse_format(value: Optional[str]) -> str:
+    fmt = (value or 'ndjson').lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+def chunk_size() -> int:
+    return min(max(1, int(os.getenv('NOTES_EXPORT_CHUNK_SIZE', 500))), POSTGREST_MAX_ROWS - 1)
+
+
+def content_disposition(fmt: str) -> str:
+    return f'attachment; filename="notes-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"'
+
+
+def header(fmt: str) -> bytes:
+    if fmt == 'csv':
+        return encode_chunk(fmt, [dict(zip(COLUMNS, COLUMNS))])
+    return b''
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        # SQLAlchemy's to_dict splits tags; keep the stored comma-separated form
+        return ','.join(str(v) for v in value)
+    return value
+
+
+def encode_chunk(fmt: str, rows: Iterable[Dict[str, Any]]) -> bytes:
+    """Encode a chunk of `Note.to_dict()` rows as NDJSON lines or CSV records."""
+    if fmt == 'csv':
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([_csv_value(row.get(c)) for c in COLUMNS])
+        return buf.getvalue().encode('utf-8')
+    return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows).encode('utf-8')
+
+
+async def iter_chunks(note_cls, size: int):
+    """Yield lists of note dicts in (updated_at DESC, id DESC) order, one keyset page at a time."""
+    cursor = None
+    while True:
+        notes, cursor = await note_cls.get_page(size, cursor, as_dicts=True)
+        if notes:
+            yield notes
+        if not cursor:
+            return
+
+
+def iter_chunks_sync(note_cls, size: int, run) -> Iterable[List[Dict[str, Any]]]:
+    """Same as iter_chunks for WSGI code: `run` executes one coroutine (e.g. async_runner.run)."""
+    cursor = None
+    while True:
+        notes, cursor = run(note_cls.get_page(size, cursor, as_dicts=True))
+        if notes:
+            yield notes
+        if not cursor:
+            return
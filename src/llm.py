@@ -1,24 +1,41 @@
 # import libraries
-import os
-from openai import OpenAI
-
-token = os.environ["GITHUB_TOKEN"]
-endpoint = "https://models.github.ai/inference"
+from src import log, metrics, tracing
+from src.llm_cache import cache
+from src.llm_clients import api_key, base_url, get_client
+from src.translation import batch_messages, parse_batch
+
+# Failing at import is intended: the translate and generate-and-save routes in main_flask
+# fall back to OpenAI / a plain extractor when this module cannot be imported
+if not api_key('github'):
+    raise RuntimeError("GITHUB_TOKEN is not set")
+endpoint = base_url('github')
 model = "openai/gpt-4.1-mini"
+logger = log.get_logger(__name__)
 # A function to call an LLM model and return the response
+# Identical (model, messages, temperature, top_p) requests are served from src.llm_cache
+@tracing.traced('llm')
 def call_llm_model(model, messages, temperature=1.0, top_p=1.0):    
-    client = OpenAI(base_url=endpoint, api_key=token)
-    response = client.chat.completions.create(  
-        messages=messages,
-        temperature=temperature, top_p=top_p, model=model)
-    return response.choices[0].message.content
+    def _call():
+        client = get_client('github')  # pooled keep-alive client, see src/llm_clients.py
+        response = client.chat.completions.create(  
+            messages=messages,
+            temperature=temperature, top_p=top_p, model=model)
+        return response.choices[0].message.content
+    return cache.get_or_call(_call, model, messages, temperature, top_p, namespace=endpoint)
 
 # A function to translate to target language
+@metrics.llm_call
 def translate(text, target_language):
     prompt = f"Translate the following text to {target_language}:\n\n{text}"
     messages = [{"role": "user", "content": prompt}]
     return call_llm_model(model, messages)
 
+# A function to translate several short strings (e.g. tags) in one call
+@metrics.llm_call
+def translate_batch(texts, target_language):
+    response = call_llm_model(model, batch_messages(texts, target_language))
+    return parse_batch(response, len(texts))
+
 system_prompt = '''
 Extract the user's notes into the following structured fields:
 1. Title: A concise title of the notes less than 5 words
@@ -35,6 +52,7 @@ Output:
 }}
 '''
 # A function to extract notes from user input
+@metrics.llm_call
 def extract_notes(text, lang="English"):
     prompt = f"Extract the user's notes into structured fields in {lang}."
     messages = [
@@ -56,7 +74,7 @@ def extract_notes(text, lang="English"):
         }
         return result
     except (json.JSONDecodeError, KeyError) as e:
-        print(f"⚠️ Could not parse LLM response as JSON: {e}")
+        logger.warning("Could not parse LLM response as JSON: %s", e)
         # Return raw response as fallback
         return {
             'title': 'AI Generated Note',
@@ -0,0 +1,195 @@
+"""Content-addressed cache for LLM chat completions.
+
+Entries are keyed by a SHA-256 of (namespace, model, messages, temperature,
+top_p), so repeating the same extract/translate request - same text, same
+language, same model - returns the stored completion instead of paying
+another GitHub Models/OpenAI round trip.
+
+Two tiers:
+- memory: per-process LRU (LLM_CACHE_MEMORY_ENTRIES, default 256)
+- disk: SQLite file shared by all workers on the host (LLM_CACHE_PATH, default
+  in the temp dir, which is also writable on serverless), with a TTL
+  (LLM_CACHE_TTL seconds, default 7 days) and a total size cap
+  (LLM_CACHE_MAX_BYTES, default 50 MB) enforced by evicting least recently
+  used rows.
+Set LLM_CACHE=0 to bypass both tiers.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from src import log
+
+logger = log.get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_access_idx ON llm_cache (last_access);
+"""
+
+
+def make_key(model: str, messages: List[Dict[str, Any]], temperature: float = 1.0,
+             top_p: float = 1.0, namespace: str = '') -> str:
+    payload = json.dumps(
+        [namespace, model, messages, float(temperature), float(top_p)],
+        sort_keys=True, ensure_ascii=False, separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, path: Optional[str] = None, ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 50 * 1024 * 1024, memory_entries: int = 256, enabled: bool = True):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.enabled = enabled
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+
+    @classmethod
+    def from_env(cls) -> 'LLMCache':
+        return cls(
+            path=os.getenv('LLM_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'notetaker_llm_cache.sqlite3'),
+            ttl=float(os.getenv('LLM_CACHE_TTL', 7 * 24 * 3600)),
+            max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', 50 * 1024 * 1024)),
+            memory_entries=int(os.getenv('LLM_CACHE_MEMORY_ENTRIES', 256)),
+            enabled=os.getenv('LLM_CACHE', '1').lower() not in ('0', 'false', 'off'),
+        )
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Open the disk tier lazily; on failure the cache degrades to memory only."""
+        if self._conn is None and self.path:
+            try:
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(_SCHEMA)
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning("Disk tier unavailable (%s): %s", self.path, e)
+                self.path = None
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return entry[0]
+                del self._memory[key]
+            try:
+                conn = self._db()
+                row = conn.execute(
+                    'SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone() if conn else None
+                if row is not None:
+                    conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+                    conn.commit()
+                    self._remember(key, row[0], row[1])
+                    self.counters['disk_hits'] += 1
+                    return row[0]
+            except sqlite3.Error as e:
+                self.counters['errors'] += 1
+                logger.warning("Read failed: %s", e)
+            self.counters['misses'] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.counters['stores'] += 1
+            try:
+                conn = self._db()
+                if conn is None:
+                    return
+                conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access, expires_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, value, len(value.encode('utf-8')), now, now, expires_at),
+                )
+                self._evict(conn, now)
+                conn.commit()
+            except sqlite3.Error as e:
+                self.counters['errors'] += 1
+                logger.warning("Write failed: %s", e)
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under max_bytes."""
+        removed = conn.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if total > self.max_bytes:
+            for key, size in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_access').fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                total -= size
+                removed += 1
+        self.counters['evictions'] += max(removed, 0)
+
+    def get_or_call(self, fn: Callable[[], str], model: str, messages: List[Dict[str, Any]],
+                    temperature: float = 1.0, top_p: float = 1.0, namespace: str = '') -> str:
+        """Return the cached completion for these inputs, calling `fn()` and storing on a miss."""
+        if not self.enabled:
+            return fn()
+        key = make_key(model, messages, temperature, top_p, namespace)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = fn()
+        self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._db()
+            if conn is not None:
+                conn.execute('DELETE FROM llm_cache')
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters['memory_hits'] + self.counters['disk_hits'] + self.counters['misses']
+            hits = self.counters['memory_hits'] + self.counters['disk_hits']
+            return dict(
+                self.counters,
+                enabled=self.enabled,
+                memory_entries=len(self._memory),
+                hit_rate=(hits / lookups) if lookups else None,
+                path=self.path,
+            )
+
+
+# Process-wide cache shared by src.llm and the inline translators in main_flask
+cache = LLMCache.from_env()
@@ -0,0 +1,106 @@
+"""Process-wide registry of pooled OpenAI-compatible clients.
+
+Building `OpenAI(...)` per call opens a fresh TLS connection every time. Here
+each provider gets one client per process, backed by an `httpx.Client` whose
+keep-alive pool is reused by every request (the client is thread-safe), so a
+warm call costs only the inference time.
+
+Providers:
+- github: GitHub Models, key GITHUB_TOKEN, base URL GITHUB_MODELS_ENDPOINT
+  (default https://models.github.ai/inference)
+- openai: OpenAI, key OPENAI_API_KEY, base URL OPENAI_BASE_URL (default api.openai.com)
+Pointing either base URL at a local server (see tests/fake_llm.py) runs the
+app against a fake endpoint.
+
+Tuning: LLM_POOL_SIZE (connections per provider, default 10),
+LLM_TIMEOUT (read timeout seconds, default 60), LLM_CONNECT_TIMEOUT
+(default 5), LLM_MAX_RETRIES (default 2), LLM_KEEPALIVE_EXPIRY (default 60).
+"""
+import atexit
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+PROVIDERS = {
+    'github': {
+        'key_env': 'GITHUB_TOKEN',
+        'base_url_env': 'GITHUB_MODELS_ENDPOINT',
+        'default_base_url': 'https://models.github.ai/inference',
+    },
+    'openai': {
+        'key_env': 'OPENAI_API_KEY',
+        'base_url_env': 'OPENAI_BASE_URL',
+        'default_base_url': 'https://api.openai.com/v1',
+    },
+}
+
+_clients: Dict[str, Tuple[int, object]] = {}  # provider -> (pid, OpenAI client)
+_lock = threading.Lock()
+
+
+def base_url(provider: str) -> str:
+    spec = PROVIDERS[provider]
+    return os.getenv(spec['base_url_env']) or spec['default_base_url']
+
+
+def api_key(provider: str) -> Optional[str]:
+    return os.getenv(PROVIDERS[provider]['key_env'])
+
+
+def _build(provider: str):
+    import httpx
+    from openai import OpenAI
+
+    pool_size = int(os.getenv('LLM_POOL_SIZE', 10))
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=float(os.getenv('LLM_KEEPALIVE_EXPIRY', 60)),
+        ),
+        timeout=httpx.Timeout(
+            float(os.getenv('LLM_TIMEOUT', 60)),
+            connect=float(os.getenv('LLM_CONNECT_TIMEOUT', 5)),
+        ),
+    )
+    return OpenAI(
+        base_url=base_url(provider),
+        api_key=api_key(provider),
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', 2)),
+        http_client=http_client,
+    )
+
+
+def get_client(provider: str = 'github'):
+    """Return the shared client for `provider`, creating it on first use.
+    Clients inherited across fork() are not reused (their sockets belong to the parent).
+    """
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    pid = os.getpid()
+    entry = _clients.get(provider)
+    if entry is not None and entry[0] == pid:
+        return entry[1]
+    with _lock:
+        entry = _clients.get(provider)
+        if entry is None or entry[0] != pid:
+            if not api_key(provider):
+                raise RuntimeError(f"{PROVIDERS[provider]['key_env']} is not set")
+            entry = _clients[provider] = (pid, _build(provider))
+        return entry[1]
+
+
+def close_all() -> None:
+    """Close every pooled connection (tests, shutdown, or after changing the env)."""
+    with _lock:
+        pid = os.getpid()
+        for provider, (owner, client) in list(_clients.items()):
+            if owner == pid:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+        _clients.clear()
+
+
+atexit.register(close_all)
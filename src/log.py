@@ -0,0 +1,223 @@
+"""Leveled, non-blocking logging for the request paths.
+
+    from src import log
+    logger = log.get_logger(__name__)
+    logger.debug("Received note data: %s", log.preview(data))
+
+Records go through a `QueueHandler` to a `QueueListener` thread, which does the
+line formatting and the stderr write. Messages use %-style arguments and
+payloads are wrapped in `preview()`, which renders (and truncates) only when a
+record is actually emitted: below the configured level a call costs one cached
+level check and no string formatting at all. An emitted message is rendered
+in the calling thread, before it is queued, so a payload the request mutates
+afterwards is logged as it was at the call. Full request/response payloads are logged at
+DEBUG; INFO is the default.
+
+Per-route sampling thins the INFO-and-below output of busy routes while
+keeping every warning and error. Request handlers call `bind_route()` once per
+request; the keep/drop decision is made on the first record of that request
+and applies to all of its records, so a sampled request logs completely.
+
+Env:
+  NOTES_LOG_LEVEL      DEBUG, INFO (default), WARNING, ERROR
+  NOTES_LOG_FORMAT     text (default) or json (one object per line)
+  NOTES_LOG_MAX_CHARS  preview() truncation length (default 500)
+  NOTES_LOG_SAMPLE     per-route keep rates, e.g. "/api/notes=0.1,/api/health=0,*=1"
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+ROOT = 'notes'
+
+_route: contextvars.ContextVar = contextvars.ContextVar('notes_log_route', default=None)
+_keep: contextvars.ContextVar = contextvars.ContextVar('notes_log_keep', default=None)
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+def max_chars() -> int:
+    try:
+        return max(16, int(os.getenv('NOTES_LOG_MAX_CHARS', '500')))
+    except ValueError:
+        return 500
+
+
+class Preview:
+    """Lazy, truncated str() of a payload for use as a logging argument."""
+    __slots__ = ('value', 'limit')
+
+    def __init__(self, value: Any, limit: Optional[int] = None):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = self.value if isinstance(self.value, str) else repr(self.value)
+        limit = self.limit or max_chars()
+        if len(text) > limit:
+            return f'{text[:limit]}... [{len(text)} chars]'
+        return text
+
+    __repr__ = __str__
+
+
+def preview(value: Any, limit: Optional[int] = None) -> Preview:
+    return Preview(value, limit)
+
+
+def parse_sample(spec: Optional[str]) -> Dict[str, float]:
+    """'route=rate,...' -> {route: rate}; bad entries are ignored, rates clamped to [0, 1]."""
+    rates: Dict[str, float] = {}
+    for part in (spec or '').split(','):
+        route, sep, rate = part.strip().rpartition('=')
+        if not sep or not route:
+            continue
+        try:
+            rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            continue
+    return rates
+
+
+class RouteSampler(logging.Filter):
+    """Drops INFO-and-below records of requests not picked for their route's sample."""
+
+    def __init__(self, rates: Dict[str, float], rand=random.random):
+        super().__init__()
+        self.rates = rates
+        self.rand = rand
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = _route.get()
+        record.route = route
+        if record.levelno >= logging.WARNING or route is None:
+            return True
+        keep = _keep.get()
+        if keep is None:
+            rate = self.rates.get(route, self.rates.get('*', 1.0))
+            keep = rate >= 1.0 or (rate > 0.0 and self.rand() < rate)
+            _keep.set(keep)
+        return keep
+
+
+def bind_route(route: Optional[str]) -> None:
+    """Tag the records of the current request (context) with `route` and reset its sample decision."""
+    _route.set(route)
+    _keep.set(None)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s%(route_tag)s %(message)s')
+
+    def format(self, record: logging.LogRecord) -> str:
+        route = getattr(record, 'route', None)
+        record.route_tag = f' [{route}]' if route else ''
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        route = getattr(record, 'route', None)
+        if route:
+            entry['route'] = route
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueues the record with its message and traceback already rendered.
+
+    The args (often a `Preview` of a live payload) would otherwise be read on the
+    listener thread while the request thread keeps changing them; everything else
+    (timestamp, route tag, JSON) is still formatted there.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _level() -> int:
+    name = os.getenv('NOTES_LOG_LEVEL', 'INFO').upper()
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+
+def configure(stream=None, force: bool = False) -> logging.Logger:
+    """Install the queue handler on the `notes` logger (once per process unless `force`)."""
+    global _listener, _listener_pid
+    root = logging.getLogger(ROOT)
+    if _listener is not None and _listener_pid == os.getpid() and not force:
+        return root
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid() and not force:
+            return root
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+        target = logging.StreamHandler(stream or sys.stderr)
+        fmt = os.getenv('NOTES_LOG_FORMAT', 'text').lower()
+        target.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        handler = _QueueHandler(q)
+        handler.addFilter(RouteSampler(parse_sample(os.getenv('NOTES_LOG_SAMPLE'))))
+        for old in list(root.handlers):
+            root.removeHandler(old)
+        root.addHandler(handler)
+        root.setLevel(_level())
+        root.propagate = False
+        listener = logging.handlers.QueueListener(q, target, respect_handler_level=True)
+        listener.start()
+        _listener, _listener_pid = listener, os.getpid()
+    return root
+
+
+def flush() -> None:
+    """Stop the listener after it has written everything queued (it restarts on next configure())."""
+    global _listener
+    with _lock:
+        if _listener is not None and _listener_pid == os.getpid():
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """A child of the `notes` logger for module `name` (e.g. notes.main_flask)."""
+    configure()
+    short = name[4:] if name.startswith('src.') else name
+    return logging.getLogger(f'{ROOT}.{short}')
+
+
+def _after_fork_in_child() -> None:
+    # The listener thread does not survive fork(); start a fresh one if the parent had one
+    global _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        configure()
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -3,12 +3,11 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from src import metrics, profiling, static_assets, tracing
 from src.routes import note_supabase
-from src.db_config import supabase
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -25,6 +24,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling of single requests (X-Notes-Profile header, see src/profiling.py)
+app.add_middleware(profiling.ASGIMiddleware)
+# Server-Timing header and slow-request traces (src/tracing.py)
+app.add_middleware(tracing.ASGIMiddleware)
+# Request counts and latency per route, served at /api/metrics (added last = outermost, so all middleware time is included)
+app.add_middleware(metrics.ASGIMiddleware)
+
 # Include routers
 app.include_router(note_supabase.router, prefix="/api")
 
@@ -36,18 +42,14 @@ os.makedirs(static_folder, exist_ok=True)
 app.mount("/static", StaticFiles(directory=static_folder), name="static")
 
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
-    """Serve the Single Page Application"""
-    static_folder = os.path.join(os.path.dirname(__file__), 'static')
-    file_path = os.path.join(static_folder, full_path)
-    
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    else:
-        index_path = os.path.join(static_folder, 'index.html')
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
+async def serve_spa(full_path: str, request: Request):
+    """Serve the Single Page Application from the in-memory asset table (src/static_assets.py)"""
+    result = static_assets.get_table(static_folder).respond(
+        full_path, request.headers.get("accept-encoding"), request.headers.get("if-none-match"))
+    if result is None:
         raise HTTPException(status_code=404, detail="File not found")
+    status, headers, body = result
+    return Response(content=body, status_code=status, headers=headers)
 
 # Health check endpoint
 @app.get("/health")
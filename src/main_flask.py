@@ -1,26 +1,38 @@
 import os
 import sys
 import json
-import asyncio
+import time
+from collections import deque
 from dotenv import load_dotenv
 
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
-from src.db_config import DB_READY, init_supabase_if_needed
-from src.models.note_supabase import Note
+from src import async_runner, batch_infer, bulk_import, etags, export, log, metrics, profiling, static_assets, sync, tracing
+from src.datetime_infer import infer_event_datetime
+from src.db_config import init_supabase_if_needed
+from src.models.note_supabase import Note, NoteConflict
+from src.pagination import parse_limit, parse_offset, page_envelope
+from src.llm_cache import cache as llm_cache
+from src.note_cache import cache as note_cache
+from src.translation import batch_messages, parse_batch, translate_fields
 
 # Load environment variables
 load_dotenv()
 
+logger = log.get_logger(__name__)
+
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
-print(f"[main_flask] Loaded. static_folder={app.static_folder}")
+logger.info("Loaded. static_folder=%s", app.static_folder)
 
 # Enable CORS for all routes
 CORS(app)
 
+# On-demand profiling of single requests (X-Notes-Profile header, see src/profiling.py)
+app.wsgi_app = profiling.WSGIMiddleware(app.wsgi_app)
+
 # Configure JSON encoder for better datetime handling
 app.json_encoder = json.JSONEncoder
 
@@ -33,29 +45,35 @@ def not_found_error(error):
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
+@app.before_request
+def _start_request():
+    request.environ['notes.start'] = time.perf_counter()
+    request.environ['notes.trace'] = tracing.start()
+    # Route template (not the raw path) so NOTES_LOG_SAMPLE rates apply per endpoint
+    log.bind_route(request.url_rule.rule if request.url_rule else request.path)
+
+@app.after_request
+def _record_request(response):
+    start = request.environ.get('notes.start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.record_request('flask', request.method, route, response.status_code, time.perf_counter() - start)
+    timing = tracing.finish(request.environ.pop('notes.trace', None), f'{request.method} {request.path}')
+    if timing:
+        response.headers['Server-Timing'] = timing
+    return response
+
 def _run_async(coro):
-    """Run an async coroutine in a safe event loop context for WSGI servers."""
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            new_loop = asyncio.new_event_loop()
-            try:
-                asyncio.set_event_loop(new_loop)
-                return new_loop.run_until_complete(coro)
-            finally:
-                new_loop.close()
-                asyncio.set_event_loop(loop)
-        else:
-            return loop.run_until_complete(coro)
-    except RuntimeError:
-        # No current event loop
-        loop = asyncio.new_event_loop()
-        try:
-            asyncio.set_event_loop(loop)
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+    """Run an async coroutine on the worker's persistent background loop (see src/async_runner.py)."""
+    return async_runner.run(coro)
+
+def _with_etag(response, etag: str):
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = etags.CACHE_CONTROL
+    return response
+
+def _not_modified(etag: str):
+    return _with_etag(Response(status=304), etag)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -68,152 +86,43 @@ def health():
     })
 
 
-# ------------------ Date/Time Inference Helpers (no external deps) ------------------
-from datetime import datetime, timedelta
-import re
-
-WEEKDAYS = {
-    'monday': 0, 'mon': 0,
-    'tuesday': 1, 'tue': 1, 'tues': 1,
-    'wednesday': 2, 'wed': 2,
-    'thursday': 3, 'thu': 3, 'thurs': 3,
-    'friday': 4, 'fri': 4,
-    'saturday': 5, 'sat': 5,
-    'sunday': 6, 'sun': 6,
-}
-
-MONTHS = {
-    'january': 1, 'jan': 1,
-    'february': 2, 'feb': 2,
-    'march': 3, 'mar': 3,
-    'april': 4, 'apr': 4,
-    'may': 5,
-    'june': 6, 'jun': 6,
-    'july': 7, 'jul': 7,
-    'august': 8, 'aug': 8,
-    'september': 9, 'sep': 9, 'sept': 9,
-    'october': 10, 'oct': 10,
-    'november': 11, 'nov': 11,
-    'december': 12, 'dec': 12,
-}
-
-def _next_weekday(target_weekday: int, ref: datetime) -> datetime:
-    days_ahead = (target_weekday - ref.weekday()) % 7
-    if days_ahead == 0:
-        days_ahead = 7
-    return ref + timedelta(days=days_ahead)
-
-def _this_or_next_weekday(target_weekday: int, ref: datetime, force_next: bool) -> datetime:
-    if force_next:
-        return _next_weekday(target_weekday, ref)
-    # upcoming occurrence including today
-    days_ahead = (target_weekday - ref.weekday()) % 7
-    return ref + timedelta(days=days_ahead)
-
-def infer_time(text: str) -> str or None:
-    s = (text or '').lower()
-    # Prefer explicit 24-hour times like 18:00 or 09:30 first
-    m0 = re.search(r'(?:\bat\s*)?\b([01]?\d|2[0-3]):([0-5]\d)\b', s)
-    if m0:
-        h = int(m0.group(1)); mi = int(m0.group(2))
-        return f"{h:02d}:{mi:02d}"
-    # hh:mm[:ss] with optional am/pm (fallback)
-    m = re.search(r'(?:at\s*)?(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?\s*(am|pm)\b', s)
-    if m:
-        h = int(m.group(1)); mi = int(m.group(2) or 0)
-        ampm = m.group(4)
-        if ampm == 'pm' and h != 12:
-            h += 12
-        if ampm == 'am' and h == 12:
-            h = 0
-        h = max(0, min(23, h)); mi = max(0, min(59, mi))
-        return f"{h:02d}:{mi:02d}"
-    # 5pm / 1130am compact
-    m2 = re.search(r'\b(\d{1,2})(\d{2})?\s*(am|pm)\b', s)
-    if m2:
-        h = int(m2.group(1)); mi = int(m2.group(2) or 0)
-        ampm = m2.group(3)
-        if ampm == 'pm' and h != 12:
-            h += 12
-        if ampm == 'am' and h == 12:
-            h = 0
-        return f"{h:02d}:{mi:02d}"
-    # Named periods
-    if any(w in s for w in ['noon', 'midday']):
-        return '12:00'
-    if 'midnight' in s:
-        return '00:00'
-    if 'morning' in s:
-        return '09:00'
-    if 'afternoon' in s:
-        return '15:00'
-    if 'evening' in s:
-        return '19:00'
-    if 'night' in s:
-        return '21:00'
-    return None
-
-def _parse_numeric_date(token: str) -> datetime or None:
-    token = token.replace('.', '/').replace('-', '/').strip()
-    parts = token.split('/')
-    try:
-        if len(parts) == 3:
-            a, b, c = parts
-            if len(a) == 4:  # YYYY/MM/DD
-                return datetime(int(a), int(b), int(c))
-            d1, m1, y1 = int(a), int(b), int(c)
-            if 1 <= d1 <= 31 and 1 <= m1 <= 12 and len(c) == 4:
-                if d1 > 12:
-                    return datetime(y1, m1, d1)
-                if m1 > 12:
-                    return datetime(y1, d1, m1)
-                return datetime(y1, m1, d1)
-    except Exception:
-        return None
-    return None
-
-def infer_date(text: str, now: datetime = None) -> str or None:
-    if not text:
-        return None
-    now = now or datetime.now()
-    s = text.lower()
-    # Relative
-    if any(k in s for k in ['tomorrow', 'tmr', 'tmrw']):
-        return (now + timedelta(days=1)).date().isoformat()
-    if 'today' in s:
-        return now.date().isoformat()
-    # Weekdays
-    m = re.search(r'\b(next|this)?\s*(monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tue|tues|wed|thu|thurs|fri|sat|sun)\b', s)
-    if m:
-        modifier = (m.group(1) or '').strip()
-        wd = WEEKDAYS[m.group(2)]
-        dt = _this_or_next_weekday(wd, now, force_next=(modifier == 'next'))
-        return dt.date().isoformat()
-    # Month name forms
-    m2 = re.search(r'\b(\d{1,2})\s+(jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|sep|sept|september|oct|october|nov|november|dec|december)\s*(\d{4})?\b', s)
-    if m2:
-        day = int(m2.group(1)); month = MONTHS[m2.group(2)]; year = int(m2.group(3) or now.year)
-        try:
-            return datetime(year, month, day).date().isoformat()
-        except Exception:
-            pass
-    m3 = re.search(r'\b(jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|sep|sept|september|oct|october|nov|november|dec|december)\s+(\d{1,2})(?:,\s*(\d{4}))?\b', s)
-    if m3:
-        month = MONTHS[m3.group(1)]; day = int(m3.group(2)); year = int(m3.group(3) or now.year)
-        try:
-            return datetime(year, month, day).date().isoformat()
-        except Exception:
-            pass
-    # Numeric
-    for tok in re.findall(r'\b\d{1,4}[\-/\.]\d{1,2}[\-/\.]\d{1,4}\b', s):
-        dt = _parse_numeric_date(tok)
-        if dt:
-            return dt.date().isoformat()
-    return None
+@app.route('/api/llm/cache', methods=['GET'])
+def llm_cache_stats():
+    """Hit/miss counters of the LLM response cache (src/llm_cache.py)."""
+    return jsonify(llm_cache.stats())
+
+
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request, DB and LLM latency histograms and error counters (src/metrics.py)."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Request profiles captured via the X-Notes-Profile header, newest first (src/profiling.py)."""
+    if not profiling.authorized(request.headers.get(profiling.TOKEN_HEADER) or request.args.get('token')):
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify({'profiles': profiling.list_profiles()})
 
-def infer_event_datetime(*texts: str) -> tuple:
-    merged = ' \n '.join(t for t in texts if t)
-    return infer_date(merged), infer_time(merged)
+
+@app.route('/api/admin/profiles/<name>', methods=['GET'])
+def download_profile(name):
+    if not profiling.authorized(request.headers.get(profiling.TOKEN_HEADER) or request.args.get('token')):
+        return jsonify({"error": "Forbidden"}), 403
+    path = profiling.profile_path(name)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    with open(path, 'rb') as f:
+        data = f.read()
+    return Response(data, mimetype='application/octet-stream',
+                    headers={'Content-Disposition': f'attachment; filename="{name}"'})
+
+
+@app.route('/api/notes/cache', methods=['GET'])
+def note_cache_stats():
+    """Hit/miss counters of the Note.get_by_id read cache (src/note_cache.py)."""
+    return jsonify(note_cache.stats())
 
 
 @app.route('/api/notes', methods=['GET'])
@@ -221,21 +130,101 @@ def get_notes():
     try:
         if not init_supabase_if_needed():
             return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
-        notes = _run_async(Note.get_all())
-        return jsonify([note.to_dict() for note in notes])
+        # Conditional GET: a one-row version query decides 304 before any note is fetched
+        max_updated_at, deleted_mark = _run_async(Note.get_version())
+        etag = etags.list_etag(max_updated_at, deleted_mark, request.query_string.decode())
+        if etags.matches(request.headers.get('If-None-Match'), etag):
+            return _not_modified(etag)
+        # Keyset pagination when `limit` or `cursor` is given; plain list otherwise (legacy clients)
+        if 'limit' in request.args or 'cursor' in request.args:
+            try:
+                limit = parse_limit(request.args.get('limit'))
+                notes, next_cursor = _run_async(Note.get_page(limit, request.args.get('cursor'), as_dicts=True))
+            except ValueError as ve:
+                return jsonify({"error": str(ve)}), 400
+            return _with_etag(jsonify(page_envelope(notes, limit, next_cursor)), etag)
+        # Rows go straight to their to_dict() form (no per-row pydantic model)
+        notes = _run_async(Note.get_all(as_dicts=True))
+        return _with_etag(jsonify(notes), etag)
     except Exception as e:
-        print(f"Error in get_notes: {str(e)}")
+        logger.error("Error in get_notes: %s", e)
         return jsonify({"error": "Failed to retrieve notes"}), 500
 
+@app.route('/api/notes/search', methods=['GET'])
+def search_notes():
+    """Ranked full-text search backed by the `search` tsvector column (see migrations/).
+    Optional `tags=a,b` restricts results to notes carrying every listed tag.
+    """
+    try:
+        if not init_supabase_if_needed():
+            return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
+        q = (request.args.get('q') or '').strip()
+        tags = [t.strip() for t in (request.args.get('tags') or '').split(',') if t.strip()]
+        try:
+            limit = parse_limit(request.args.get('limit'), default=20)
+            offset = parse_offset(request.args.get('offset'))
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
+        notes, ranks, has_more = _run_async(Note.search(q, limit, offset, tags=tags)) if (q or tags) else ([], [], False)
+        items = []
+        for note, rank in zip(notes, ranks):
+            item = note.to_dict()
+            item['rank'] = rank
+            items.append(item)
+        return jsonify({
+            'notes': items,
+            'limit': limit,
+            'offset': offset,
+            'next_offset': offset + limit if has_more else None,
+        })
+    except Exception as e:
+        logger.error("Error in search_notes: %s", e)
+        return jsonify({"error": "Failed to search notes"}), 500
+
+@app.route('/api/notes/export', methods=['GET'])
+def export_notes():
+    """Stream every note as NDJSON (default) or CSV, fetched in keyset-ordered chunks."""
+    try:
+        fmt = export.parse_format(request.args.get('format'))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    if not init_supabase_if_needed():
+        return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
+
+    def generate():
+        yield export.header(fmt)
+        try:
+            for rows in export.iter_chunks_sync(Note, export.chunk_size(), _run_async):
+                yield export.encode_chunk(fmt, rows)
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated body
+            logger.error("[export] Aborted: %s", e)
+
+    return Response(generate(), content_type=export.FORMATS[fmt],
+                    headers={'Content-Disposition': export.content_disposition(fmt)})
+
+@app.route('/api/notes/changes', methods=['GET'])
+def note_changes():
+    """Delta sync: notes updated and ids deleted since `since` (see src/sync.py), plus the next token."""
+    try:
+        if not init_supabase_if_needed():
+            return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
+        try:
+            return jsonify(_run_async(sync.changes(Note, request.args.get('since'))))
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error("Error in note_changes: %s", e)
+        return jsonify({"error": "Failed to retrieve changes"}), 500
+
 @app.route('/api/notes', methods=['POST'])
 def create_note():
     try:
-        print("Received create note request")
         if not request.is_json:
             return jsonify({"error": "Request must be JSON"}), 400
             
         data = request.json
-        print(f"Received note data: {data}")
+        logger.debug("Received note data: %s", log.preview(data))
         
         # Validate required fields: allow either title or content (match frontend UX)
         if not (data.get('title') or data.get('content')):
@@ -249,7 +238,8 @@ def create_note():
         try:
             if not init_supabase_if_needed():
                 return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
-            print(f"Creating note with title: {data.get('title')} and content length: {len(data.get('content') or '')}")
+            logger.debug("Creating note with title: %s and content length: %d",
+                         log.preview(data.get('title')), len(data.get('content') or ''))
             note = _run_async(Note.create(
                 title=(data.get('title') or 'Untitled'),
                 content=(data.get('content') or ''),
@@ -259,28 +249,62 @@ def create_note():
             ))
             
             result = note.to_dict()
-            print(f"Successfully created note: {result}")
+            logger.debug("Created note: %s", log.preview(result))
             return jsonify(result), 201
             
         except ValueError as ve:
             error_msg = str(ve)
-            print(f"Validation error: {error_msg}")
+            logger.warning("Validation error: %s", error_msg)
             return jsonify({"error": error_msg}), 400
             
         except Exception as e:
-            error_msg = f"Database error: {str(e)}"
-            print(error_msg)
-            import traceback
-            traceback.print_exc()
+            logger.exception("Database error: %s", e)
             return jsonify({"error": "Failed to save note to database"}), 500
             
     except Exception as e:
-        error_msg = f"Request processing error: {str(e)}"
-        print(error_msg)
-        import traceback
-        traceback.print_exc()
+        logger.exception("Request processing error: %s", e)
         return jsonify({"error": "Failed to process note creation request"}), 500
 
+@app.route('/api/notes/bulk', methods=['POST'])
+def bulk_import_notes():
+    """Import notes from an NDJSON body (one note object per line) using batched multi-row inserts.
+    Returns {inserted, failed, errors: [{line, error}], errors_truncated}; bad rows never abort the import.
+    """
+    if not init_supabase_if_needed():
+        return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
+    try:
+        batch_size = bulk_import.parse_batch_size(request.args.get('batch_size'))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    try:
+        report = bulk_import.ImportReport()
+        rows = bulk_import.parse_rows(bulk_import.read_lines(request.stream), Note.format_date_str, Note.format_time_str, report)
+        # The request thread keeps reading the body while up to N batches are inserted on the loop
+        in_flight = deque()
+        for batch in bulk_import.batches(rows, batch_size):
+            in_flight.append(async_runner.submit(bulk_import.insert_batch(Note.insert_many, batch, report)))
+            if len(in_flight) >= bulk_import.concurrency():
+                in_flight.popleft().result()
+        for future in in_flight:
+            future.result()
+
+        result = report.to_dict()
+        logger.info("[bulk] Imported %d notes, %d failed", result['inserted'], result['failed'])
+        return jsonify(result)
+    except Exception as e:
+        logger.exception("Error importing notes: %s", e)
+        return jsonify({"error": "Failed to import notes"}), 500
+
+@app.route('/api/infer/batch', methods=['POST'])
+def infer_batch():
+    """Infer event date/time for many texts against one `now`; streams NDJSON results in input order."""
+    try:
+        texts, now = batch_infer.parse_request(request.get_json(silent=True))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    return Response(batch_infer.iter_ndjson(texts, now), mimetype='application/x-ndjson')
+
 @app.route('/api/notes/<note_id>', methods=['GET'])
 def get_note(note_id):
     try:
@@ -289,9 +313,12 @@ def get_note(note_id):
         note = _run_async(Note.get_by_id(note_id))
         if note is None:
             return jsonify({"error": "Note not found"}), 404
-        return jsonify(note.to_dict())
+        etag = etags.note_etag(note.id, note.updated_at)
+        if etags.matches(request.headers.get('If-None-Match'), etag):
+            return _not_modified(etag)
+        return _with_etag(jsonify(note.to_dict()), etag)
     except Exception as e:
-        print(f"Error in get_note: {str(e)}")
+        logger.error("Error in get_note: %s", e)
         return jsonify({"error": "Failed to retrieve note"}), 500
 
 @app.route('/api/notes/<note_id>', methods=['PUT'])
@@ -299,13 +326,13 @@ def update_note(note_id):
     try:
         if not init_supabase_if_needed():
             return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
-        note = _run_async(Note.get_by_id(note_id))
-        if note is None:
-            return jsonify({"error": "Note not found"}), 404
-
         if not request.is_json:
             return jsonify({"error": "Request must be JSON"}), 400
         data = request.json or {}
+        try:
+            expected = etags.expected_updated_at(request.headers.get('If-Match'), data.get('updated_at'), note_id)
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 412
 
         # Normalize tags from list or string
         tags_val = data.get('tags')
@@ -324,20 +351,25 @@ def update_note(note_id):
         if isinstance(event_time, str) and event_time.strip() == '':
             event_time = None
 
-        updated_note = _run_async(note.update(
+        # One PATCH ... RETURNING; a missing row means 404, a stale precondition 412
+        updated_note = _run_async(Note.update_by_id(
+            note_id,
             title=data.get('title'),
             content=data.get('content'),
             tags=tags_norm,
             event_date=event_date,
-            event_time=event_time
+            event_time=event_time,
+            expected_updated_at=expected,
         ))
-        return jsonify(updated_note.to_dict())
+        if updated_note is None:
+            return jsonify({"error": "Note not found"}), 404
+        return _with_etag(jsonify(updated_note.to_dict()), etags.note_etag(updated_note.id, updated_note.updated_at))
+    except NoteConflict as ce:
+        return jsonify({"error": str(ce)}), 412
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
-        print(f"Error updating note {note_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error updating note %s: %s", note_id, e)
         return jsonify({"error": "Failed to update note"}), 500
 
 @app.route('/api/notes/<note_id>', methods=['DELETE'])
@@ -345,15 +377,18 @@ def delete_note(note_id):
     try:
         if not init_supabase_if_needed():
             return jsonify({"error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."}), 503
-        note = _run_async(Note.get_by_id(note_id))
-        if note is None:
+        try:
+            expected = etags.expected_updated_at(request.headers.get('If-Match'), request.args.get('updated_at'), note_id)
+        except ValueError as ve:
+            return jsonify({"error": str(ve)}), 412
+        # One DELETE; the affected row count tells 404 apart
+        if not _run_async(Note.delete_by_id(note_id, expected_updated_at=expected)):
             return jsonify({"error": "Note not found"}), 404
-        _run_async(note.delete())
         return jsonify({"message": "Note deleted successfully"})
+    except NoteConflict as ce:
+        return jsonify({"error": str(ce)}), 412
     except Exception as e:
-        print(f"Error deleting note {note_id}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error deleting note %s: %s", note_id, e)
         return jsonify({"error": "Failed to delete note"}), 500
 
 @app.route('/api/notes/<note_id>/translate', methods=['POST'])
@@ -364,45 +399,52 @@ def translate_note(note_id):
     - Robust tag handling (string/list/empty)
     """
     try:
-        print(f"Starting translation for note {note_id}")
+        logger.debug("Starting translation for note %s", note_id)
 
         # Safe import: prefer src.llm.translate
         translator = None
+        batch_translator = None
         translator_mode = None
         try:
-            from src.llm import translate as _llm_translate
+            from src.llm import translate as _llm_translate, translate_batch as _llm_translate_batch
             translator = _llm_translate
+            batch_translator = _llm_translate_batch
             translator_mode = 'src.llm'
-            print("[translate] Using src.llm.translate")
+            logger.debug("[translate] Using src.llm.translate")
         except Exception as e:
-            print(f"[translate] src.llm import failed: {e}")
+            logger.debug("[translate] src.llm import failed: %s", e)
 
         # If unavailable, try to build a local translator using available credentials (GitHub Models or OpenAI)
         if translator is None:
-            from openai import OpenAI
+            from src.llm_clients import base_url, get_client
             gh_token = os.getenv('GITHUB_TOKEN')
             oa_key = os.getenv('OPENAI_API_KEY')
 
-            if gh_token:
-                def translator(text, lang):
-                    client = OpenAI(base_url='https://models.github.ai/inference', api_key=gh_token)
-                    prompt = f"Translate the following text to {lang}:\n\n{text}"
-                    resp = client.chat.completions.create(messages=[{"role":"user","content":prompt}], model='openai/gpt-4.1-mini', temperature=0.2)
-                    return resp.choices[0].message.content
-                translator_mode = 'github-models'
-                print("[translate] Using GitHub Models via GITHUB_TOKEN")
-            elif oa_key:
+            if gh_token or oa_key:
+                provider = 'github' if gh_token else 'openai'
+                llm_model = 'openai/gpt-4.1-mini' if gh_token else os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+
+                @tracing.traced('llm')
+                def complete(messages):
+                    def _call():
+                        resp = get_client(provider).chat.completions.create(messages=messages, model=llm_model, temperature=0.2)
+                        return resp.choices[0].message.content
+                    return llm_cache.get_or_call(_call, llm_model, messages, temperature=0.2,
+                                                 namespace=base_url(provider))
+
                 def translator(text, lang):
-                    client = OpenAI(api_key=oa_key)
-                    prompt = f"Translate the following text to {lang}:\n\n{text}"
-                    resp = client.chat.completions.create(messages=[{"role":"user","content":prompt}], model=os.getenv('OPENAI_MODEL','gpt-4o-mini'), temperature=0.2)
-                    return resp.choices[0].message.content
-                translator_mode = 'openai'
-                print("[translate] Using OpenAI via OPENAI_API_KEY")
+                    return complete([{"role": "user", "content": f"Translate the following text to {lang}:\n\n{text}"}])
+
+                def batch_translator(texts, lang):
+                    return parse_batch(complete(batch_messages(texts, lang)), len(texts))
+
+                translator_mode = 'github-models' if gh_token else 'openai'
+                logger.debug("[translate] Using %s", 'GitHub Models via GITHUB_TOKEN' if gh_token else 'OpenAI via OPENAI_API_KEY')
             else:
                 # No credentials -> degrade gracefully to identity translator to avoid 503s on Vercel
-                print("[translate] No AI credentials found; using identity fallback")
+                logger.warning("[translate] No AI credentials found; using identity fallback")
                 translator = lambda s, lang: s
+                batch_translator = lambda items, lang: list(items)
                 translator_mode = 'identity-fallback'
 
         # Ensure DB is configured
@@ -411,34 +453,28 @@ def translate_note(note_id):
                 "error": "Database not configured. Set SUPABASE_URL and SUPABASE_KEY."
             }), 503
 
-        # Fetch the note (async helper)
-        note = _run_async(Note.get_by_id(note_id))
-        if note is None:
-            print(f"Note {note_id} not found")
-            return jsonify({"error": "Note not found"}), 404
-
         data = request.json or {}
-        print(f"Received translation request data: {data}")
+        logger.debug("Received translation request data: %s", log.preview(data))
         target_language = data.get('target_language')
         if not target_language:
-            print("Missing target_language in request")
             return jsonify({"error": "target_language is required"}), 400
 
+        # The SPA sends the fields it shows; the note is only read when one is missing
+        note = None
+        if data.get('title') is None or data.get('content') is None or 'tags' not in data:
+            note = _run_async(Note.get_by_id(note_id))
+            if note is None:
+                return jsonify({"error": "Note not found"}), 404
+
         # Baseline text fields, allow overriding from request
         title = (data.get('title') if data.get('title') is not None else note.title) or ''
         content = (data.get('content') if data.get('content') is not None else note.content) or ''
-        tags = data.get('tags', note.tags)
+        tags = data['tags'] if 'tags' in data else note.tags
         if tags is None:
             tags = ''
-        print(f"Original title: {title}")
-        print(f"Original content: {content}")
-        print(f"Original tags: {tags}")
+        logger.debug("Original title: %s, content: %s, tags: %s", log.preview(title), log.preview(content), log.preview(tags))
 
-        # Translate title and content
-        translated_title = translator(title, target_language).strip() if title.strip() else ''
-        translated_content = translator(content, target_language).strip() if content.strip() else ''
-
-        # Normalize tags to list and translate each
+        # Normalize tags to list
         if isinstance(tags, list):
             tag_list = [str(t).strip() for t in tags if str(t).strip()]
         elif isinstance(tags, str):
@@ -446,14 +482,11 @@ def translate_note(note_id):
         else:
             tag_list = []
 
-        translated_tags = []
-        for tag in tag_list:
-            try:
-                tt = translator(tag, target_language)
-                translated_tags.append(tt.strip().strip("'\""))
-            except Exception as e:
-                print(f"Error translating tag '{tag}': {e}")
-                translated_tags.append(tag)
+        # Title, content and all tags (one batched call) are translated concurrently
+        translated = translate_fields(translator, batch_translator, title, content, tag_list, target_language)
+        translated_title = translated['title']
+        translated_content = translated['content']
+        translated_tags = translated['tags']
 
         response = {
             'translated_title': translated_title,
@@ -465,18 +498,17 @@ def translate_note(note_id):
             'target_language': target_language,
             'translator': translator_mode,
         }
-        print(f"Sending response: {response}")
+        logger.debug("Sending response: %s", log.preview(response))
         return jsonify(response)
 
     except Exception as e:
-        print(f"Translation error: {str(e)}")
+        logger.exception("Translation error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/notes/generate-and-save', methods=['POST'])
 def generate_and_save_note():
     """Generate a structured note from user input using LLM and save it"""
     try:
-        print("Starting AI note generation")
         # Try importing LLM extractor; fall back if unavailable (do not modify llm.py)
         def _fallback_extract(text: str, lang: str):
             words = (text or '').strip().split()
@@ -490,11 +522,9 @@ def generate_and_save_note():
             from src.llm import extract_notes  # may fail if GITHUB_TOKEN missing at import time
             _extract = lambda t, lang: extract_notes(t, lang=lang)
         except Exception as e:
-            print(f"[generate-and-save] LLM import failed, using fallback: {e}")
+            logger.warning("[generate-and-save] LLM import failed, using fallback: %s", e)
             _extract = _fallback_extract
-        from datetime import datetime
-        import re
-        
+
         data = request.json
         if not data or 'text' not in data:
             return jsonify({'error': 'text is required'}), 400
@@ -502,16 +532,16 @@ def generate_and_save_note():
         text = data['text']
         language = data.get('language', 'English')
         
-        print(f"Generating note for text: {text} in {language}")
+        logger.debug("Generating note for text: %s in %s", log.preview(text), language)
         
         # Extract structured notes using LLM (or fallback)
         structured_note = _extract(text, language)
-        print(f"LLM response: {structured_note}")
+        logger.debug("LLM response: %s", log.preview(structured_note))
         
         # Infer event date/time using both the raw text and LLM content
         content = structured_note.get('content', '') or ''
         event_date, event_time = infer_event_datetime(text, content)
-        print(f"Inferred event_date: {event_date}, event_time: {event_time}")
+        logger.debug("Inferred event_date: %s, event_time: %s", event_date, event_time)
 
         # Get tags from LLM response and convert to string
         tags = structured_note.get('tags', [])
@@ -540,15 +570,15 @@ def generate_and_save_note():
                 'event_date': event_date,
                 'event_time': event_time
             }
-            print(f"Generated note: {result}")
+            logger.debug("Generated note: %s", log.preview(result))
             return jsonify(result), 201
             
         except Exception as e:
-            print(f"Error creating note: {str(e)}")
+            logger.error("Error creating note: %s", e)
             raise
         
     except Exception as e:
-        print(f"Error generating AI note: {str(e)}")
+        logger.exception("Error generating AI note: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -556,34 +586,23 @@ def generate_and_save_note():
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
+    """SPA and static files from the in-memory asset table (src/static_assets.py)."""
     try:
-        static_folder_path = app.static_folder
-        if static_folder_path is None:
+        result = static_assets.get_table(app.static_folder).respond(
+            path, request.headers.get('Accept-Encoding'), request.headers.get('If-None-Match'))
+        if result is None:
             return ("""
-            <!doctype html><html><head><meta charset='utf-8'><title>NoteTaker</title></head>
-            <body><h1>NoteTaker</h1><p>Static folder not configured.</p></body></html>
+            <!doctype html><html><head><meta charset='utf-8'><title>NoteTaker</title>
+            <style>body{font-family:system-ui,Segoe UI,Roboto,Helvetica,Arial;margin:40px;}</style>
+            </head><body>
+            <h1>NoteTaker</h1>
+            <p>index.html not found in static folder. API should still be accessible at <code>/api/notes</code>.</p>
+            </body></html>
             """), 200
-
-        target = os.path.join(static_folder_path, path) if path else None
-        if path and os.path.exists(target):
-            return send_from_directory(static_folder_path, path)
-        else:
-            index_path = os.path.join(static_folder_path, 'index.html')
-            if os.path.exists(index_path):
-                return send_from_directory(static_folder_path, 'index.html')
-            else:
-                return ("""
-                <!doctype html><html><head><meta charset='utf-8'><title>NoteTaker</title>
-                <style>body{font-family:system-ui,Segoe UI,Roboto,Helvetica,Arial;margin:40px;}</style>
-                </head><body>
-                <h1>NoteTaker</h1>
-                <p>index.html not found in static folder. API should still be accessible at <code>/api/notes</code>.</p>
-                </body></html>
-                """), 200
+        status, headers, body = result
+        return Response(body, status=status, headers=headers)
     except Exception as e:
-        import traceback
-        print(f"[serve] Error: {e}")
-        traceback.print_exc()
+        logger.exception("[serve] Error: %s", e)
         return (f"""
         <!doctype html><html><head><meta charset='utf-8'><title>NoteTaker</title></head>
         <body><h1>NoteTaker</h1><p>Server error while serving UI: {str(e)}</p></body></html>
@@ -591,10 +610,12 @@ def serve(path):
 
 @app.route('/favicon.ico')
 def favicon():
-    static_folder_path = app.static_folder
-    if static_folder_path and os.path.exists(os.path.join(static_folder_path, 'favicon.ico')):
-        return send_from_directory(static_folder_path, 'favicon.ico')
-    return ('', 204)
+    table = static_assets.get_table(app.static_folder)
+    if 'favicon.ico' not in table.assets:
+        return ('', 204)
+    status, headers, body = table.respond('favicon.ico', request.headers.get('Accept-Encoding'),
+                                          request.headers.get('If-None-Match'))
+    return Response(body, status=status, headers=headers)
 
 if __name__ == '__main__':
     port = int(os.getenv("PORT", 5002))
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from src import metrics, profiling, tracing
 from src.routes import note_supabase, user_supabase
 
 app = FastAPI()
@@ -15,6 +16,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling of single requests (X-Notes-Profile header, see src/profiling.py)
+app.add_middleware(profiling.ASGIMiddleware)
+# Server-Timing header and slow-request traces (src/tracing.py)
+app.add_middleware(tracing.ASGIMiddleware)
+# Request counts and latency per route, served at /api/metrics (added last = outermost, so all middleware time is included)
+app.add_middleware(metrics.ASGIMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
@@ -0,0 +1,230 @@
+"""In-process Prometheus metrics, served as text at GET /api/metrics.
+
+    notes_http_requests_total{app,method,route,status}      counter
+    notes_http_request_duration_seconds{app,method,route}   histogram
+    notes_db_call_duration_seconds{method}                  histogram (one per Note method call)
+    notes_llm_call_duration_seconds{function}               histogram (src/llm.py)
+    notes_errors_total{component,operation}                 counter (5xx responses, failed DB/LLM calls)
+
+Recording never takes a lock: every thread writes to its own shard (a plain
+dict of lists in a `threading.local`), and a scrape merges the shards of all
+threads that have recorded something. Shards of finished threads are folded
+into one retired shard (servers that spawn a thread per request would
+otherwise accumulate them). An observation is one dict lookup, one
+`bisect` over the bucket bounds and three list updates, i.e. a few
+microseconds. Routes are labelled by their template (`/api/notes/<note_id>`),
+so label cardinality stays bounded by the route table.
+
+Counters are per process: with several workers each one reports its own, as
+with any multi-process Prometheus target without a push gateway.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Upper bounds in seconds; the +Inf bucket is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help, label names)
+FAMILIES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    'notes_http_requests_total': ('counter', 'HTTP requests by route and status.', ('app', 'method', 'route', 'status')),
+    'notes_http_request_duration_seconds': ('histogram', 'HTTP request latency.', ('app', 'method', 'route')),
+    'notes_db_call_duration_seconds': ('histogram', 'Duration of Note model calls (Supabase round trips).', ('method',)),
+    'notes_llm_call_duration_seconds': ('histogram', 'Duration of LLM calls, cache hits included.', ('function',)),
+    'notes_errors_total': ('counter', 'Errors: 5xx responses and failed DB/LLM calls.', ('component', 'operation')),
+}
+
+_local = threading.local()
+_shards: List[Tuple[threading.Thread, Dict]] = []
+_retired: Dict = {}
+_shards_lock = threading.Lock()  # only taken when a thread records for the first time, and by scrapes
+_RETIRE_EVERY = 64
+
+
+def _merge(into: Dict, shard: Dict) -> None:
+    for key, cell in list(shard.items()):
+        total = into.get(key)
+        if total is None:
+            into[key] = list(cell)
+        else:
+            for i, value in enumerate(cell):
+                total[i] += value
+
+
+def _retire_dead() -> None:
+    # Caller holds _shards_lock. A finished thread can no longer write to its shard.
+    alive = []
+    for thread, shard in _shards:
+        if thread.is_alive():
+            alive.append((thread, shard))
+        else:
+            _merge(_retired, shard)
+    _shards[:] = alive
+
+
+def _shard() -> Dict:
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = {}
+        with _shards_lock:
+            if len(_shards) >= _RETIRE_EVERY:
+                _retire_dead()
+            _shards.append((threading.current_thread(), shard))
+        return shard
+
+
+def inc(name: str, labels: Tuple[str, ...], amount: float = 1) -> None:
+    shard = _shard()
+    key = (name, labels)
+    cell = shard.get(key)
+    if cell is None:
+        shard[key] = [amount]
+    else:
+        cell[0] += amount
+
+
+def observe(name: str, labels: Tuple[str, ...], seconds: float) -> None:
+    shard = _shard()
+    key = (name, labels)
+    cell = shard.get(key)
+    if cell is None:
+        # [count, sum, per-bucket counts..., +Inf]
+        cell = shard[key] = [0, 0.0] + [0] * (len(LATENCY_BUCKETS) + 1)
+    cell[0] += 1
+    cell[1] += seconds
+    cell[2 + bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+
+def record_request(app: str, method: str, route: str, status: int, seconds: float) -> None:
+    inc('notes_http_requests_total', (app, method, route, str(status)))
+    observe('notes_http_request_duration_seconds', (app, method, route), seconds)
+    if status >= 500:
+        inc('notes_errors_total', ('http', route))
+
+
+def timed(histogram: str, component: str, label: Optional[str] = None) -> Callable:
+    """Decorator: observe each call's duration in `histogram` (labelled with the function name
+    unless `label` is given) and count exceptions in notes_errors_total{component}.
+    Works for sync and async functions.
+    """
+    def decorate(fn):
+        name = label or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    inc('notes_errors_total', (component, name))
+                    raise
+                finally:
+                    observe(histogram, (name,), time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                inc('notes_errors_total', (component, name))
+                raise
+            finally:
+                observe(histogram, (name,), time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+db_call = timed('notes_db_call_duration_seconds', 'db')
+llm_call = timed('notes_llm_call_duration_seconds', 'llm')
+
+
+def snapshot() -> Dict[Tuple[str, Tuple[str, ...]], List[float]]:
+    """All series merged across threads: {(name, labels): cell}."""
+    merged: Dict[Tuple[str, Tuple[str, ...]], List[float]] = {}
+    with _shards_lock:
+        _retire_dead()
+        _merge(merged, _retired)
+        for _, shard in _shards:
+            _merge(merged, shard)
+    return merged
+
+
+def reset() -> None:
+    with _shards_lock:
+        _retired.clear()
+        for _, shard in _shards:
+            shard.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+_BUCKET_LABELS = tuple(f'le="{b!r}"' for b in LATENCY_BUCKETS) + ('le="+Inf"',)
+
+
+def render() -> str:
+    """Prometheus text exposition format (0.0.4)."""
+    series = snapshot()
+    out: List[str] = []
+    for name, (kind, help_text, label_names) in FAMILIES.items():
+        out.append(f'# HELP {name} {help_text}')
+        out.append(f'# TYPE {name} {kind}')
+        for (series_name, values), cell in sorted(series.items()):
+            if series_name != name:
+                continue
+            if kind == 'counter':
+                out.append(f'{name}{_labels(label_names, values)} {_number(cell[0])}')
+                continue
+            cumulative = 0
+            for bound, count in zip(_BUCKET_LABELS, cell[2:]):
+                cumulative += count
+                out.append(f'{name}_bucket{_labels(label_names, values, bound)} {cumulative}')
+            out.append(f'{name}_sum{_labels(label_names, values)} {_number(cell[1])}')
+            out.append(f'{name}_count{_labels(label_names, values)} {cell[0]}')
+    return '\n'.join(out) + '\n'
+
+
+class ASGIMiddleware:
+    """Records notes_http_* for an ASGI (FastAPI) app, labelled with the matched route's path."""
+
+    def __init__(self, app, app_name: str = 'fastapi'):
+        self.app = app
+        self.app_name = app_name
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get('route'), 'path', None) or 'unmatched'
+            record_request(self.app_name, scope.get('method', ''), route, status[0], time.perf_counter() - start)
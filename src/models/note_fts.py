@@ -0,0 +1,125 @@
+"""SQLite FTS5 full-text index over the SQLAlchemy `Note` model.
+
+`note_fts` is an external-content FTS5 table (it stores only the index, the
+text stays in `note`) kept in sync by triggers on insert, update and delete,
+so every writer - ORM, raw SQL or another process - updates it. Only SQLite
+databases get the index; other dialects keep the LIKE-based search.
+
+Existing databases created before the index existed can be backfilled with:
+    flask note rebuild-search-index
+"""
+import html
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import DDL, event, text
+
+from src.models.note import Note, db
+
+FTS_TABLE = 'note_fts'
+
+# Sentinels wrapped around matches by highlight()/snippet(); swapped for <mark>
+# after HTML-escaping so note text can never inject markup
+_HL_OPEN, _HL_CLOSE = '\x02', '\x03'
+
+_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, content, tags,
+        content='note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS note_fts_ai AFTER INSERT ON note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS note_fts_ad AFTER DELETE ON note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, tags) VALUES ('delete', old.id, old.title, old.content, old.tags);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS note_fts_au AFTER UPDATE ON note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, tags) VALUES ('delete', old.id, old.title, old.content, old.tags);
+        INSERT INTO {FTS_TABLE}(rowid, title, content, tags) VALUES (new.id, new.title, new.content, new.tags);
+    END""",
+]
+
+# Create the index alongside the table on fresh SQLite databases (db.create_all)
+for _stmt in _SCHEMA:
+    event.listen(Note.__table__, 'after_create', DDL(_stmt).execute_if(dialect='sqlite'))
+
+# Title matches weigh more than body matches, tags in between
+_BM25_WEIGHTS = '10.0, 1.0, 5.0'
+_SEARCH_SQL = text(f"""
+    SELECT rowid AS id,
+           bm25({FTS_TABLE}, {_BM25_WEIGHTS}) AS rank,
+           highlight({FTS_TABLE}, 0, :open, :close) AS title_hl,
+           snippet({FTS_TABLE}, 1, :open, :close, '…', 16) AS content_hl
+    FROM {FTS_TABLE}
+    WHERE {FTS_TABLE} MATCH :query
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def build_match_query(q: str) -> str:
+    """Translate user input into a safe FTS5 MATCH expression.
+    - "quoted text" -> phrase query
+    - word* -> prefix query
+    - everything else -> implicit AND of quoted terms (FTS5 operators are neutralised)
+    """
+    parts = []
+    for phrase, word in _QUERY_TOKEN.findall(q or ''):
+        if phrase:
+            terms = ' '.join(re.findall(r'\w+', phrase))
+            if terms:
+                parts.append(f'"{terms}"')
+            continue
+        prefix = word.endswith('*')
+        terms = ' '.join(re.findall(r'\w+', word))
+        if terms:
+            parts.append(f'"{terms}"' + ('*' if prefix else ''))
+    return ' '.join(parts)
+
+
+def fts_available() -> bool:
+    """True when the bound database is SQLite and the FTS table exists."""
+    if db.engine.dialect.name != 'sqlite':
+        return False
+    row = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+    ).first()
+    return row is not None
+
+
+def rebuild_index() -> int:
+    """Create the FTS table/triggers if missing and re-index every note. Returns the note count."""
+    for stmt in _SCHEMA:
+        db.session.execute(text(stmt))
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.commit()
+    return db.session.execute(text('SELECT COUNT(*) FROM note')).scalar()
+
+
+def _mark(value: str) -> str:
+    return html.escape(value or '').replace(_HL_OPEN, '<mark>').replace(_HL_CLOSE, '</mark>')
+
+
+def search(q: str, limit: int = 50) -> List[Dict[str, Any]]:
+    """BM25-ranked search. Each result is `Note.to_dict()` plus `score` and HTML-safe `highlight`."""
+    match = build_match_query(q)
+    if not match:
+        return []
+    rows = db.session.execute(_SEARCH_SQL, {
+        'query': match, 'limit': limit, 'open': _HL_OPEN, 'close': _HL_CLOSE,
+    }).mappings().all()
+    ids = [row['id'] for row in rows]
+    notes = {n.id: n for n in Note.query.filter(Note.id.in_(ids)).all()} if ids else {}
+    results = []
+    for row in rows:
+        note = notes.get(row['id'])
+        if note is None:
+            continue
+        item = note.to_dict()
+        item['score'] = -row['rank']
+        item['highlight'] = {'title': _mark(row['title_hl']), 'content': _mark(row['content_hl'])}
+        results.append(item)
+    return results
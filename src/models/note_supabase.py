@@ -1,8 +1,67 @@
+import asyncio
 from datetime import datetime, date, time
 import re
 from typing import Optional, Dict, Any, Union
 from pydantic import BaseModel
-from src.db_config import supabase, init_supabase_if_needed, DB_READY
+from src.db_config import get_async_supabase, init_supabase_if_needed
+from src.pagination import POSTGREST_MAX_ROWS, decode_cursor, encode_cursor
+from src import log, metrics, search_index, temporal, tracing
+from src.note_cache import cache as note_cache
+
+# Explicit column list: keeps derived columns (e.g. the `search` tsvector) out of API payloads
+NOTE_COLUMNS = 'id,title,content,tags,event_date,event_time,created_at,updated_at'
+
+
+class ReturnMethod:
+    """Values of postgrest.types.ReturnMethod; postgrest (and httpx) are only imported on first use."""
+    minimal = 'minimal'
+    representation = 'representation'
+
+
+logger = log.get_logger(__name__)
+
+# Rows per request when a method walks a whole range: PostgREST silently cuts a longer
+# response to max-rows, which would look like the end of the range (see pagination.py)
+SCAN_PAGE_SIZE = POSTGREST_MAX_ROWS - 1
+
+
+async def _execute(query, name: str):
+    """`await query.execute()` timed as a `db.<method>` trace span (see src/tracing.py)."""
+    with tracing.span(name):
+        return await query.execute()
+
+_TSQUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+# PostgREST prints date, time and timestamptz columns in fixed-width ISO forms, so for trusted rows
+# the length tells whether a value is already what to_dict() would emit: 'YYYY-MM-DD' (4-digit
+# year), 'HH:MM:SS' (no fraction, not 24:00:00), 'YYYY-MM-DDTHH:MM:SS+HH:MM' (no fraction).
+def _timestamp(value: Optional[str]) -> Optional[str]:
+    """A PostgREST timestamptz as `datetime.isoformat()` would print it after parsing."""
+    if value is None or (len(value) == 25 and value[19] in '+-'):
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+
+
+def _returning(query, columns: str):
+    """Have a PATCH/DELETE sent with `return=representation` return only `columns`.
+
+    postgrest-py (0.18) has no select() on write builders, so the `select` parameter is added
+    to the builder's query params; tests/test_note_supabase.py pins that behaviour.
+    """
+    query.params = query.params.add('select', columns)
+    return query
+
+
+def _now() -> str:
+    """Write timestamp for created_at/updated_at. Microseconds are kept: updated_at is the
+    If-Match / ETag validator, so two writes within one second must not share it.
+    """
+    return datetime.utcnow().isoformat()
+
+
+class NoteConflict(Exception):
+    """An optimistic-concurrency precondition (If-Match / updated_at) no longer holds."""
+
 
 class Note(BaseModel):
     id: Optional[Union[int, str]] = None
@@ -14,54 +73,12 @@ class Note(BaseModel):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    # Public normalizers to ensure canonical strings for Supabase
-    @staticmethod
-    def format_date_str(v) -> Optional[str]:
-        if v in (None, '', 'null'):
-            return None
-        if isinstance(v, date) and not isinstance(v, datetime):
-            return v.strftime('%Y-%m-%d')
-        if isinstance(v, datetime):
-            return v.date().strftime('%Y-%m-%d')
-        s = str(v).strip()
-        if 'T' in s:
-            s = s.split('T')[0]
-        for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d'):
-            try:
-                return datetime.strptime(s, fmt).date().strftime('%Y-%m-%d')
-            except ValueError:
-                pass
-        try:
-            return datetime.fromisoformat(s).date().strftime('%Y-%m-%d')
-        except Exception:
-            return None
-
-    @staticmethod
-    def format_time_str(v) -> Optional[str]:
-        if v in (None, '', 'null'):
-            return None
-        if isinstance(v, time):
-            return v.replace(microsecond=0).strftime('%H:%M:%S')
-        if isinstance(v, datetime):
-            return v.time().replace(microsecond=0).strftime('%H:%M:%S')
-        s = str(v).strip().lower()
-        m = re.match(r'^(\d{1,2}):?(\d{2})(?::?(\d{2}))?\s*([ap]\.?.?m\.?)?$', s)
-        if m:
-            h = int(m.group(1)); mi = int(m.group(2)); sec = int(m.group(3) or 0)
-            ampm = m.group(4)
-            if ampm:
-                if 'p' in ampm and h != 12:
-                    h += 12
-                if 'a' in ampm and h == 12:
-                    h = 0
-            h = max(0, min(23, h)); mi = max(0, min(59, mi)); sec = max(0, min(59, sec))
-            return f"{h:02d}:{mi:02d}:{sec:02d}"
-        try:
-            return time.fromisoformat(s).replace(microsecond=0).strftime('%H:%M:%S')
-        except Exception:
-            return None
+    # Public normalizers to ensure canonical strings for Supabase (shared with models/note.py)
+    format_date_str = staticmethod(temporal.format_date)
+    format_time_str = staticmethod(temporal.format_time)
 
     @classmethod
+    @metrics.db_call
     async def create(cls, title: str, content: str, tags: Optional[str] = None,
                     event_date: Optional[str] = None, event_time: Optional[str] = None) -> 'Note':
         if not init_supabase_if_needed():
@@ -71,12 +88,12 @@ class Note(BaseModel):
             event_date_str = Note.format_date_str(event_date)
             event_time_str = Note.format_time_str(event_time)
             if event_date and not event_date_str:
-                print(f"Invalid date format for event_date: {event_date}")
+                logger.warning("Invalid date format for event_date: %s", log.preview(event_date))
             if event_time and not event_time_str:
-                print(f"Invalid time format for event_time: {event_time}")
+                logger.warning("Invalid time format for event_time: %s", log.preview(event_time))
 
             # Prepare data for insertion
-            now = datetime.utcnow().replace(microsecond=0).isoformat()
+            now = _now()
             data = {
                 'title': title,
                 'content': content,
@@ -89,16 +106,17 @@ class Note(BaseModel):
             # Remove None values to avoid sending nulls for non-nullable columns
             payload = {k: v for k, v in data.items() if v is not None}
 
-            print(f"Attempting to insert note with payload: {payload}")
+            logger.debug("Inserting note: %s", log.preview(payload))
             # Insert and return inserted row
-            result = supabase.table('notes').insert(payload).execute()
-            print(f"Insert response: {result}")
+            db = await get_async_supabase()
+            result = await _execute(db.table('notes').insert(payload), 'db.create')
+            logger.debug("Insert response: %s", log.preview(result.data))
 
             if not result.data:
                 raise ValueError("No data returned from insert operation")
 
             return_data = result.data[0]
-            print(f"Successfully inserted note: {return_data}")
+            logger.debug("Inserted note %s", return_data.get('id'))
 
             # Convert timestamps back to datetime objects
             if 'created_at' in return_data and isinstance(return_data['created_at'], str):
@@ -106,43 +124,289 @@ class Note(BaseModel):
             if 'updated_at' in return_data and isinstance(return_data['updated_at'], str):
                 return_data['updated_at'] = datetime.fromisoformat(return_data['updated_at'].replace('Z', '+00:00'))
 
-            return cls(**return_data)
+            note = cls(**return_data)
+            search_index.index_note(note)
+            note_cache.put(note)
+            return note
         except Exception as e:
-            print(f"Error creating note: {e}")
+            logger.error("Error creating note: %s", e)
             raise
 
     @classmethod
-    async def get_all(cls) -> list['Note']:
+    @metrics.db_call
+    async def insert_many(cls, rows: list) -> int:
+        """Insert already-normalized rows (see src/bulk_import.py) with one multi-row request.
+        Every row carries the same keys so PostgREST can use a single `columns` list.
+        Raises on failure; the whole request is one transaction, so either all rows land or none.
+        """
+        if not init_supabase_if_needed():
+            raise RuntimeError("Database is not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+        now = _now()
+        payload = [dict(row, created_at=now, updated_at=now) for row in rows]
+        db = await get_async_supabase()
+        # Rows only need to come back when the in-process search index must see them
+        returning = ReturnMethod.representation if search_index.enabled() else ReturnMethod.minimal
+        result = await _execute(db.table('notes').insert(payload, returning=returning), 'db.insert_many')
+        for note_data in result.data or []:
+            search_index.index_note(cls(**note_data))
+        return len(rows)
+
+    @classmethod
+    @metrics.db_call
+    async def set_events_many(cls, changes: list) -> int:
+        """Write {id, event_date, event_time} changes (see src/batch_infer.py) with one
+        `set_note_events` RPC (migrations/004_notes_event_backfill.sql). Returns rows updated.
+        """
+        if not init_supabase_if_needed():
+            raise RuntimeError("Database is not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+        db = await get_async_supabase()
+        result = await _execute(db.rpc('set_note_events', {'changes': changes}), 'db.set_events_many')
+        for note_data in result.data or []:
+            if isinstance(note_data.get('created_at'), str):
+                note_data['created_at'] = datetime.fromisoformat(note_data['created_at'].replace('Z', '+00:00'))
+            if isinstance(note_data.get('updated_at'), str):
+                note_data['updated_at'] = datetime.fromisoformat(note_data['updated_at'].replace('Z', '+00:00'))
+            note = cls(**note_data)
+            search_index.index_note(note)
+            note_cache.put(note)
+        return len(result.data or [])
+
+    @classmethod
+    @metrics.db_call
+    async def get_all(cls, as_dicts: bool = False) -> list:
+        """All notes; with `as_dicts`, their `to_dict()` form built straight from the rows (see dict_from_row)."""
         if not init_supabase_if_needed():
             return []
         try:
-            result = supabase.table('notes').select('*').execute()
-            notes = []
-            for note_data in result.data:
-                # Convert datetime strings back to datetime objects
+            db = await get_async_supabase()
+            result = await _execute(db.table('notes').select(NOTE_COLUMNS), 'db.get_all')
+            return cls._from_rows(result.data, as_dicts)
+        except Exception as e:
+            logger.error("Error getting all notes: %s", e)
+            raise
+
+    @classmethod
+    @metrics.db_call
+    async def get_version(cls) -> tuple[Optional[str], Optional[str]]:
+        """Return (max updated_at, newest tombstone deleted_at) for the list ETag.
+        Both are single-row index reads run concurrently; no count(*) on the notes table.
+        Writes bump the first (microsecond timestamps), deletes the second.
+        """
+        if not init_supabase_if_needed():
+            return None, None
+        db = await get_async_supabase()
+        result, deleted_mark = await asyncio.gather(
+            _execute(db.table('notes').select('updated_at').order('updated_at', desc=True).limit(1), 'db.get_version'),
+            cls.get_tombstone_watermark(),
+        )
+        rows = result.data or []
+        return (rows[0]['updated_at'] if rows else None), deleted_mark
+
+    @classmethod
+    @metrics.db_call
+    async def get_page(cls, limit: int, cursor: Optional[str] = None, as_dicts: bool = False) -> tuple[list, Optional[str]]:
+        """Return one page of notes ordered by (updated_at DESC, id DESC) and the next cursor.
+        Fetches `limit + 1` rows to detect whether another page exists. `as_dicts` as in get_all.
+        """
+        if not init_supabase_if_needed():
+            return [], None
+        # Malformed cursors raise ValueError before any round trip
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            db = await get_async_supabase()
+            query = db.table('notes').select(NOTE_COLUMNS).order('updated_at', desc=True).order('id', desc=True)
+            if after:
+                ts, last_id = after
+                query = query.or_(f'updated_at.lt."{ts}",and(updated_at.eq."{ts}",id.lt."{last_id}")')
+            result = await _execute(query.limit(limit + 1), 'db.get_page')
+            rows = result.data or []
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor(rows[-1]['updated_at'], rows[-1]['id'])
+            return cls._from_rows(rows, as_dicts), next_cursor
+        except Exception as e:
+            logger.error("Error getting notes page: %s", e)
+            raise
+
+    @staticmethod
+    def build_tsquery(q: str) -> str:
+        """Build a safe to_tsquery('simple', ...) expression from user input.
+        "quoted text" becomes a phrase, `word*` and the last bare word (search-as-you-type)
+        become prefix matches, and all parts are ANDed together.
+        """
+        tokens = _TSQUERY_TOKEN.findall((q or '').lower())
+        parts = []
+        for i, (phrase, word) in enumerate(tokens):
+            words = re.findall(r'\w+', phrase or word)
+            if not words:
+                continue
+            prefix = not phrase and (word.endswith('*') or i == len(tokens) - 1)
+            lexemes = [f"'{w}'" for w in words]
+            if prefix:
+                lexemes[-1] += ':*'
+            parts.append(lexemes[0] if len(lexemes) == 1 else '(' + ' <-> '.join(lexemes) + ')')
+        return ' & '.join(parts)
+
+    @classmethod
+    @metrics.db_call
+    async def search(cls, q: str, limit: int, offset: int = 0,
+                     tags: Optional[list] = None) -> tuple[list['Note'], list[float], bool]:
+        """Ranked full-text search via the `search_notes` RPC (migrations/002_notes_search.sql),
+        or the in-process index when NOTES_SEARCH_BACKEND=memory (see src/search_index.py).
+        Returns (notes, ranks, has_more).
+        """
+        if not init_supabase_if_needed():
+            return [], [], False
+        if search_index.enabled():
+            index = await search_index.ensure_built(cls)
+            hits, has_more = index.search(q, tags=tags or (), limit=limit, offset=offset)
+            return [cls(**doc) for doc, _ in hits], [score for _, score in hits], has_more
+        # Tags are weighted into the tsvector, so requiring them as terms approximates a tag filter
+        parts = [Note.build_tsquery(q)] + [Note.build_tsquery(f'"{t}"') for t in tags or []]
+        tsquery = ' & '.join(p for p in parts if p)
+        if not tsquery:
+            return [], [], False
+        try:
+            db = await get_async_supabase()
+            result = await _execute(db.rpc('search_notes', {
+                'q': tsquery, 'page_size': limit + 1, 'page_offset': offset,
+            }), 'db.search')
+            rows = result.data or []
+            has_more = len(rows) > limit
+            notes, ranks = [], []
+            for note_data in rows[:limit]:
+                ranks.append(note_data.pop('rank', None))
                 if 'created_at' in note_data:
                     note_data['created_at'] = datetime.fromisoformat(note_data['created_at'].replace('Z', '+00:00'))
                 if 'updated_at' in note_data:
                     note_data['updated_at'] = datetime.fromisoformat(note_data['updated_at'].replace('Z', '+00:00'))
                 notes.append(cls(**note_data))
-            return notes
+            return notes, ranks, has_more
         except Exception as e:
-            print(f"Error getting all notes: {e}")
+            logger.error("Error searching notes: %s", e)
             raise
 
     @classmethod
+    @metrics.db_call
+    async def get_updated_since(cls, since: Optional[str], inclusive: bool = False, as_dicts: bool = False,
+                                after_id=None, limit: Optional[int] = None) -> list:
+        """Notes whose updated_at is after `since` (ISO timestamp, None for all), or at it when
+        `inclusive`, ordered by (updated_at, id). With `after_id` the range continues a previous
+        page: notes at `since` itself are kept only past that id. Ranges longer than PostgREST's
+        max-rows must be read in pages of `limit` (see SCAN_PAGE_SIZE).
+        """
+        if not init_supabase_if_needed():
+            return []
+        db = await get_async_supabase()
+        query = db.table('notes').select(NOTE_COLUMNS).order('updated_at').order('id')
+        if since and after_id is not None:
+            query = query.or_(f'updated_at.gt."{since}",and(updated_at.eq."{since}",id.gt."{after_id}")')
+        elif since:
+            query = query.gte('updated_at', since) if inclusive else query.gt('updated_at', since)
+        if limit:
+            query = query.limit(limit)
+        result = await _execute(query, 'db.get_updated_since')
+        return cls._from_rows(result.data or [], as_dicts)
+
+    @classmethod
+    @tracing.traced('from_rows')
+    def _from_rows(cls, rows: list, as_dicts: bool = False) -> list:
+        if as_dicts:
+            return [cls.dict_from_row(row) for row in rows]
+        notes = []
+        for note_data in rows:
+            # Convert datetime strings back to datetime objects
+            if 'created_at' in note_data:
+                note_data['created_at'] = datetime.fromisoformat(note_data['created_at'].replace('Z', '+00:00'))
+            if 'updated_at' in note_data:
+                note_data['updated_at'] = datetime.fromisoformat(note_data['updated_at'].replace('Z', '+00:00'))
+            notes.append(cls(**note_data))
+        return notes
+
+    @classmethod
+    def dict_from_row(cls, row: Dict[str, Any]) -> Dict[str, Any]:
+        """`to_dict()` of a trusted PostgREST row, skipping pydantic validation and the
+        timestamp parse/format round trip. Values already in their canonical form are passed
+        through as-is; any other row takes the full model path, so the output is identical.
+        """
+        event_date, event_time = row.get('event_date'), row.get('event_time')
+        if ((event_date is not None and (len(event_date) != 10 or event_date[0] == '0'))
+                or (event_time is not None and (len(event_time) != 8 or event_time >= '24'))):
+            return cls._from_rows([dict(row)])[0].to_dict()
+        note_id = row.get('id')
+        return {
+            'id': str(note_id) if note_id is not None else None,
+            'title': row['title'],
+            'content': row['content'],
+            'tags': row.get('tags'),
+            'event_date': event_date,
+            'event_time': event_time,
+            'created_at': _timestamp(row.get('created_at')),
+            'updated_at': _timestamp(row.get('updated_at')),
+        }
+
+    @classmethod
+    @metrics.db_call
+    async def get_tombstones_since(cls, since: Optional[str], after_id=None, limit: Optional[int] = None) -> list[tuple]:
+        """(note_id, deleted_at) pairs recorded at or after `since` (all when None), ordered by
+        (deleted_at, note_id); `after_id` and `limit` page the range as in get_updated_since.
+        See migrations/003.
+        """
+        if not init_supabase_if_needed():
+            return []
+        db = await get_async_supabase()
+        query = db.table('note_tombstones').select('note_id,deleted_at').order('deleted_at').order('note_id')
+        if since and after_id is not None:
+            query = query.or_(f'deleted_at.gt."{since}",and(deleted_at.eq."{since}",note_id.gt."{after_id}")')
+        elif since:
+            query = query.gte('deleted_at', since)
+        if limit:
+            query = query.limit(limit)
+        result = await _execute(query, 'db.get_tombstones_since')
+        return [(row['note_id'], row['deleted_at']) for row in result.data or []]
+
+    @classmethod
+    @metrics.db_call
+    async def get_tombstone_watermark(cls) -> Optional[str]:
+        """Newest tombstone deleted_at, or None when nothing has been deleted."""
+        if not init_supabase_if_needed():
+            return None
+        db = await get_async_supabase()
+        result = await _execute(db.table('note_tombstones').select('deleted_at').order('deleted_at', desc=True).limit(1),
+                                'db.get_tombstone_watermark')
+        return result.data[0]['deleted_at'] if result.data else None
+
+    @classmethod
+    @metrics.db_call
+    async def get_all_ids(cls) -> list:
+        """Every note id, read in id order one SCAN_PAGE_SIZE page at a time."""
+        if not init_supabase_if_needed():
+            return []
+        db = await get_async_supabase()
+        ids = []
+        while True:
+            query = db.table('notes').select('id').order('id').limit(SCAN_PAGE_SIZE)
+            if ids:
+                query = query.gt('id', ids[-1])
+            rows = (await _execute(query, 'db.get_all_ids')).data or []
+            ids.extend(row['id'] for row in rows)
+            if len(rows) < SCAN_PAGE_SIZE:
+                return ids
+
+    @classmethod
+    @metrics.db_call
     async def get_by_id(cls, note_id: str) -> Optional['Note']:
         if not init_supabase_if_needed():
             return None
         try:
-            # Coerce numeric ids to int for exact match in Supabase
-            lookup_id = note_id
-            try:
-                if isinstance(note_id, str) and note_id.isdigit():
-                    lookup_id = int(note_id)
-            except Exception:
-                lookup_id = note_id
-            result = supabase.table('notes').select('*').eq('id', lookup_id).execute()
+            lookup_id = cls._lookup_id(note_id)
+            cached = note_cache.get(lookup_id)
+            if cached is not None:
+                return cached
+            generation = note_cache.generation()
+            db = await get_async_supabase()
+            result = await _execute(db.table('notes').select(NOTE_COLUMNS).eq('id', lookup_id), 'db.get_by_id')
             if not result.data:
                 return None
             note_data = result.data[0]
@@ -151,102 +415,129 @@ class Note(BaseModel):
                 note_data['created_at'] = datetime.fromisoformat(note_data['created_at'].replace('Z', '+00:00'))
             if 'updated_at' in note_data:
                 note_data['updated_at'] = datetime.fromisoformat(note_data['updated_at'].replace('Z', '+00:00'))
-            return cls(**note_data)
+            note = cls(**note_data)
+            note_cache.fill(note, generation)
+            return note
         except Exception as e:
-            print(f"Error getting note by ID: {e}")
+            logger.error("Error getting note by ID: %s", e)
             raise
 
-    async def update(self, title: str = None, content: str = None, tags: str = None,
-                    event_date: str = None, event_time: str = None) -> 'Note':
+    @staticmethod
+    def _lookup_id(note_id):
+        # Coerce numeric ids to int for exact match in Supabase
+        if isinstance(note_id, str) and note_id.isdigit():
+            return int(note_id)
+        return note_id
+
+    @classmethod
+    async def _exists(cls, db, lookup_id) -> bool:
+        result = await _execute(db.table('notes').select('id').eq('id', lookup_id).limit(1), 'db.exists')
+        return bool(result.data)
+
+    @classmethod
+    @metrics.db_call
+    async def update_by_id(cls, note_id, title: str = None, content: str = None, tags: str = None,
+                           event_date: str = None, event_time: str = None,
+                           expected_updated_at: Optional[str] = None) -> Optional['Note']:
+        """Update a note with one PATCH that returns the row (`Prefer: return=representation`).
+        Returns None when no such note exists. With `expected_updated_at` the row only matches if
+        it is unchanged since then; otherwise NoteConflict is raised (the existence check that
+        tells the two apart only runs on that failure path).
+        """
+        if not init_supabase_if_needed():
+            raise RuntimeError("Database is not configured")
+        update_data: Dict[str, Any] = {'updated_at': _now()}
+        if title is not None:
+            update_data['title'] = title
+        if content is not None:
+            update_data['content'] = content
+        if tags is not None:
+            update_data['tags'] = tags
+        if event_date is not None:
+            # Reuse the same normalizer from create()
+            update_data['event_date'] = Note.format_date_str(event_date)
+            if event_date and not update_data['event_date']:
+                logger.warning("Invalid date format for event_date in update: %s", log.preview(event_date))
+        if event_time is not None:
+            update_data['event_time'] = Note.format_time_str(event_time)
+            if event_time and not update_data['event_time']:
+                logger.warning("Invalid time format for event_time in update: %s", log.preview(event_time))
+
+        # Remove None fields from update
+        update_payload = {k: v for k, v in update_data.items() if v is not None}
+        lookup_id = cls._lookup_id(note_id)
         try:
-            update_data: Dict[str, Any] = {'updated_at': datetime.utcnow().replace(microsecond=0).isoformat()}
-            if title is not None:
-                update_data['title'] = title
-            if content is not None:
-                update_data['content'] = content
-            if tags is not None:
-                update_data['tags'] = tags
-            if event_date is not None:
-                # Reuse the same normalizer from create()
-                update_data['event_date'] = Note.format_date_str(event_date)
-                if event_date and not update_data['event_date']:
-                    print(f"Invalid date format for event_date in update: {event_date}")
-            if event_time is not None:
-                update_data['event_time'] = Note.format_time_str(event_time)
-                if event_time and not update_data['event_time']:
-                    print(f"Invalid time format for event_time in update: {event_time}")
-
-            # Remove None fields from update
-            update_payload = {k: v for k, v in update_data.items() if v is not None}
-            print(f"Executing update for note {self.id} with payload: {update_payload}")
-            result = supabase.table('notes').update(update_payload).eq('id', self.id).execute()
-            print(f"Update response: {result}")
-            if not result.data:
-                # Some Supabase Python client versions don't return rows on update; fetch explicitly
-                fetched = supabase.table('notes').select('*').eq('id', self.id).limit(1).execute()
-                if not fetched.data:
-                    raise ValueError('Update succeeded but no data returned')
-                updated_data = fetched.data[0]
-            else:
-                updated_data = result.data[0]
-            
-            # Convert datetime strings back to datetime objects
-            if 'created_at' in updated_data and isinstance(updated_data['created_at'], str):
-                updated_data['created_at'] = datetime.fromisoformat(updated_data['created_at'].replace('Z', '+00:00'))
-            if 'updated_at' in updated_data and isinstance(updated_data['updated_at'], str):
-                updated_data['updated_at'] = datetime.fromisoformat(updated_data['updated_at'].replace('Z', '+00:00'))
-                
-            return self.__class__(**updated_data)
+            db = await get_async_supabase()
+            query = db.table('notes').update(update_payload, returning=ReturnMethod.representation).eq('id', lookup_id)
+            if expected_updated_at:
+                query = query.eq('updated_at', expected_updated_at)
+            # Return only the API columns (not the `search` tsvector)
+            result = await _execute(_returning(query, NOTE_COLUMNS), 'db.update_by_id')
         except Exception as e:
-            print(f"Error updating note: {e}")
+            logger.error("Error updating note: %s", e)
             raise
+        if not result.data:
+            # Gone or changed elsewhere: the cached copy is stale either way
+            note_cache.invalidate(lookup_id)
+            if expected_updated_at and await cls._exists(db, lookup_id):
+                raise NoteConflict(f"Note {note_id} was modified since {expected_updated_at}")
+            return None
+        updated_data = result.data[0]
+        # Convert datetime strings back to datetime objects
+        if isinstance(updated_data.get('created_at'), str):
+            updated_data['created_at'] = datetime.fromisoformat(updated_data['created_at'].replace('Z', '+00:00'))
+        if isinstance(updated_data.get('updated_at'), str):
+            updated_data['updated_at'] = datetime.fromisoformat(updated_data['updated_at'].replace('Z', '+00:00'))
+        updated = cls(**updated_data)
+        search_index.index_note(updated)
+        note_cache.put(updated)
+        return updated
 
-    async def delete(self) -> None:
+    @classmethod
+    @metrics.db_call
+    async def delete_by_id(cls, note_id, expected_updated_at: Optional[str] = None) -> bool:
+        """Delete a note with one DELETE; returns False when no row was deleted (404).
+        `expected_updated_at` works as in update_by_id and raises NoteConflict.
+        """
         if not init_supabase_if_needed():
             raise RuntimeError("Database is not configured")
-        supabase.table('notes').delete().eq('id', self.id).execute()
+        lookup_id = cls._lookup_id(note_id)
+        db = await get_async_supabase()
+        # The deleted ids come back in the body: with `return=minimal` PostgREST answers 204 and
+        # postgrest-py reports count 0 whatever Content-Range says
+        query = db.table('notes').delete(returning=ReturnMethod.representation).eq('id', lookup_id)
+        if expected_updated_at:
+            query = query.eq('updated_at', expected_updated_at)
+        result = await _execute(_returning(query, 'id'), 'db.delete_by_id')
+        if not result.data:
+            note_cache.invalidate(lookup_id)
+            if expected_updated_at and await cls._exists(db, lookup_id):
+                raise NoteConflict(f"Note {note_id} was modified since {expected_updated_at}")
+            return False
+        search_index.remove_note(lookup_id)
+        note_cache.invalidate(lookup_id)
+        return True
+
+    async def update(self, title: str = None, content: str = None, tags: str = None,
+                    event_date: str = None, event_time: str = None) -> 'Note':
+        updated = await self.update_by_id(self.id, title=title, content=content, tags=tags,
+                                          event_date=event_date, event_time=event_time)
+        if updated is None:
+            raise ValueError('Update succeeded but no data returned')
+        return updated
+
+    async def delete(self) -> None:
+        await self.delete_by_id(self.id)
 
+    @tracing.traced('to_dict')
     def to_dict(self) -> Dict[str, Any]:
-        # Convert date/time fields to proper strings
-        event_date_str = None
-        if self.event_date:
-            try:
-                if isinstance(self.event_date, (date, datetime)):
-                    d = self.event_date.date() if isinstance(self.event_date, datetime) else self.event_date
-                    event_date_str = d.strftime('%Y-%m-%d')
-                else:
-                    s = str(self.event_date)
-                    if 'T' in s:
-                        s = s.split('T')[0]
-                    event_date_str = datetime.strptime(s, '%Y-%m-%d').date().strftime('%Y-%m-%d')
-            except (ValueError, TypeError) as e:
-                print(f"Error formatting event_date in to_dict: {e}")
-                event_date_str = str(self.event_date)
-
-        event_time_str = None
-        if self.event_time:
-            try:
-                if isinstance(self.event_time, (time, datetime)):
-                    t = self.event_time.time() if isinstance(self.event_time, datetime) else self.event_time
-                    event_time_str = t.replace(microsecond=0).strftime('%H:%M:%S')
-                else:
-                    # assume it's already 'HH:MM[:SS]'
-                    s = str(self.event_time)
-                    parts = s.split(':')
-                    if len(parts) == 2:
-                        s = s + ':00'
-                    event_time_str = s
-            except Exception as e:
-                print(f"Error formatting event_time in to_dict: {e}")
-                event_time_str = str(self.event_time)
-        
         return {
             'id': str(self.id) if self.id is not None else None,
             'title': self.title,
             'content': self.content,
             'tags': self.tags,
-            'event_date': event_date_str,
-            'event_time': event_time_str,
+            'event_date': temporal.format_date(self.event_date),
+            'event_time': temporal.format_time(self.event_time),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
\ No newline at end of file
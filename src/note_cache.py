@@ -0,0 +1,107 @@
+"""Per-process read cache for `note_supabase.Note.get_by_id`.
+
+Holds parsed `Note` objects keyed by id, so repeated reads of a hot note
+(detail views, translate) skip the Supabase round trip, the timestamp parsing
+and the pydantic construction. Bounded by NOTES_CACHE_ENTRIES (default 1024,
+least recently used evicted first) and NOTES_CACHE_TTL seconds (default 30).
+
+Kept coherent by write-through: `Note.create`/`update_by_id` store the row
+they get back and `delete_by_id` drops it. Writes made by other workers or
+outside the app are only seen once the entry expires, so set NOTES_CACHE=0
+for multi-writer deployments. Counters at `GET /api/notes/cache`.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class NoteCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # id -> (note, expires_at)
+        self._lock = threading.Lock()
+        # Bumped by every write; a read-fill started before a write must not store its older row
+        self._generation = 0
+        self.counters = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0, 'evictions': 0}
+
+    @classmethod
+    def from_env(cls) -> 'NoteCache':
+        return cls(
+            max_entries=int(os.getenv('NOTES_CACHE_ENTRIES', 1024)),
+            ttl=float(os.getenv('NOTES_CACHE_TTL', 30)),
+            enabled=os.getenv('NOTES_CACHE', '1').lower() not in ('0', 'false', 'off'),
+        )
+
+    def get(self, note_id) -> Optional[Any]:
+        """Return a copy of the cached note, so callers can never mutate the shared entry."""
+        if not self.enabled:
+            return None
+        key = str(note_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return entry[0].model_copy()
+                del self._entries[key]
+            self.counters['misses'] += 1
+            return None
+
+    def generation(self) -> int:
+        return self._generation
+
+    def fill(self, note, generation: int) -> None:
+        """Store a row read from the database, unless a write happened since `generation()` was taken."""
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._store(note)
+
+    def put(self, note) -> None:
+        """Write-through: store the row a create/update returned (unless a newer one is cached)."""
+        with self._lock:
+            self._generation += 1
+            current = self._entries.get(str(note.id)) if note is not None else None
+            if current and current[0].updated_at and note.updated_at and current[0].updated_at > note.updated_at:
+                return
+            self._store(note)
+
+    def _store(self, note) -> None:
+        if not self.enabled or note is None or note.id is None:
+            return
+        key = str(note.id)
+        self._entries[key] = (note.model_copy(), time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        self.counters['stores'] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters['evictions'] += 1
+
+    def invalidate(self, note_id) -> None:
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(str(note_id), None) is not None:
+                self.counters['invalidations'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return dict(
+                self.counters,
+                enabled=self.enabled,
+                entries=len(self._entries),
+                hit_rate=(self.counters['hits'] / lookups) if lookups else None,
+            )
+
+
+# Process-wide cache used by note_supabase.Note
+cache = NoteCache.from_env()
@@ -0,0 +1,68 @@
+"""Keyset (cursor) pagination helpers shared by the note backends.
+
+Pages are ordered by (updated_at DESC, id DESC). A cursor is an opaque,
+URL-safe token holding the (updated_at, id) pair of the last row of a page;
+the next page starts strictly after that pair, so each page costs one indexed
+range scan of `limit + 1` rows regardless of table size.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# PostgREST's `db-max-rows` on Supabase: larger reads are cut to this many rows without an error.
+# A page reads `limit + 1` rows, so internal page sizes must stay below it.
+POSTGREST_MAX_ROWS = 1000
+
+
+def parse_limit(value, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Parse a `limit` query value, clamped to 1..MAX_PAGE_SIZE. Raises ValueError."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_offset(value) -> int:
+    """Parse an `offset` query value (ranked search results are offset-paged). Raises ValueError."""
+    if value in (None, ''):
+        return 0
+    offset = int(value)
+    if offset < 0:
+        raise ValueError('offset must be zero or a positive integer')
+    return offset
+
+
+def encode_cursor(updated_at: Union[str, datetime], note_id: Union[int, str]) -> str:
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    raw = json.dumps([updated_at, note_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[str, Union[int, str]]:
+    """Return (updated_at ISO string, id) from a cursor. Raises ValueError if malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        updated_at, note_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        # Validate the timestamp so it can be embedded in a filter safely
+        datetime.fromisoformat(str(updated_at).replace('Z', '+00:00'))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(note_id, (int, str)) or isinstance(note_id, bool):
+        raise ValueError('Invalid cursor')
+    if isinstance(note_id, str) and ('"' in note_id or '\\' in note_id):
+        raise ValueError('Invalid cursor')
+    return str(updated_at), note_id
+
+
+def page_envelope(items: List[Dict[str, Any]], limit: int, next_cursor: Optional[str]) -> Dict[str, Any]:
+    return {
+        'notes': items,
+        'limit': limit,
+        'next_cursor': next_cursor,
+    }
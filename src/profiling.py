@@ -0,0 +1,334 @@
+"""Profile a single request on demand, without a redeploy.
+
+Send the request with `X-Notes-Profile: <mode>` (or `?__profile=<mode>`) and
+the secret from NOTES_PROFILE_TOKEN in `X-Notes-Profile-Token` (or
+`?__profile_token=`). The request runs under the chosen profiler, its result is
+saved under NOTES_PROFILE_DIR, and the response names it in `X-Notes-Profile-Id`.
+
+    cpu     cProfile (deterministic) of the request thread -> .prof
+            (`python -m pstats`, snakeviz)
+    sample  stack sampler every NOTES_PROFILE_INTERVAL_MS (default 1) over the
+            request thread, the async_runner loop (Supabase calls) and the
+            translation pool -> .folded (flamegraph.pl, speedscope)
+    alloc   tracemalloc snapshot diff around the request, top 100 lines -> .txt
+
+`GET /api/admin/profiles` lists the captures (newest first) and
+`GET /api/admin/profiles/<name>` downloads one; both need the same token, in
+`X-Notes-Profile-Token` or `?token=`.
+Only the newest NOTES_PROFILE_KEEP (default 50) files are kept.
+
+Without NOTES_PROFILE_TOKEN set nothing can be triggered. A request that does
+not ask for a profile costs one header lookup and one substring test in the
+middleware; no profiler is installed.
+"""
+import cProfile
+import hmac
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from src import log
+
+logger = log.get_logger(__name__)
+
+MODES = {'cpu': '.prof', 'sample': '.folded', 'alloc': '.txt'}
+HEADER = 'X-Notes-Profile'
+TOKEN_HEADER = 'X-Notes-Profile-Token'
+ID_HEADER = 'X-Notes-Profile-Id'
+QUERY = '__profile'
+TOKEN_QUERY = '__profile_token'
+# Threads sampled besides the request's own (see async_runner.py and translation.py)
+SAMPLED_THREAD_PREFIXES = ('async-runner', 'translate')
+
+_NAME = re.compile(r'^[\w.-]+\.(prof|folded|txt)$')
+
+# tracemalloc is process-wide: concurrent alloc sessions share one tracing run,
+# stopped by the last of them (and never if it was already on when the first began)
+_alloc_lock = threading.Lock()
+_alloc_users = 0
+_alloc_started = False
+
+
+def profile_dir() -> str:
+    return os.getenv('NOTES_PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'notes-profiles')
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def authorized(token: Optional[str]) -> bool:
+    """True when profiling is enabled (NOTES_PROFILE_TOKEN set) and `token` matches it."""
+    secret = os.getenv('NOTES_PROFILE_TOKEN')
+    return bool(secret) and bool(token) and hmac.compare_digest(token.encode(), secret.encode())
+
+
+def requested(header: Optional[str], query_string: str) -> Optional[tuple]:
+    """(mode, token) when the request asks for a profile, else None (the cheap, common case)."""
+    if header is None and QUERY not in query_string:
+        return None
+    params = parse_qs(query_string, keep_blank_values=True) if query_string else {}
+    # The substring test also hits e.g. `?q=my__profile_notes`; only the parameter itself counts
+    if header is None and QUERY not in params:
+        return None
+    mode = (header or params.get(QUERY, ['cpu'])[0] or 'cpu').strip().lower()
+    token = params.get(TOKEN_QUERY, [None])[0]
+    return mode, token
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, target_ident: int, interval: float):
+        super().__init__(name='notes-profiler', daemon=True)
+        self.target_ident = target_ident
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def _threads(self) -> Dict[int, str]:
+        names = {self.target_ident: 'request'}
+        for thread in threading.enumerate():
+            if thread.ident and thread.name.startswith(SAMPLED_THREAD_PREFIXES):
+                names[thread.ident] = thread.name
+        return names
+
+    def run(self) -> None:
+        names = self._threads()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, name in names.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                if stack:
+                    stack.append(name)
+                    self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            if self.samples % 200 == 0:
+                names = self._threads()  # pool threads come and go
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Session:
+    """Runs the code inside `with` under the profiler for `mode`; `.name` is the saved file."""
+
+    def __init__(self, mode: str, label: str):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode!r} (use one of {', '.join(MODES)})")
+        self.mode = mode
+        self.label = label
+        self.name: Optional[str] = None
+
+    def __enter__(self) -> 'Session':
+        self.start = time.perf_counter()
+        if self.mode == 'cpu':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        elif self.mode == 'sample':
+            interval = _int_env('NOTES_PROFILE_INTERVAL_MS', 1) / 1000
+            self.sampler = _Sampler(threading.get_ident(), interval)
+            self.sampler.start()
+        else:
+            _alloc_acquire()
+            try:
+                self.before = tracemalloc.take_snapshot()
+            except BaseException:
+                _alloc_release()
+                raise
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        if self.mode == 'cpu':
+            self.profiler.disable()
+            self.name = self._save(lambda path: self.profiler.dump_stats(path), elapsed_ms)
+        elif self.mode == 'sample':
+            self.sampler.stop()
+            body = ''.join(f'{stack} {count}\n' for stack, count in self.sampler.stacks.most_common())
+            self.name = self._save(lambda path: _write_text(path, body), elapsed_ms)
+        else:
+            try:
+                after = tracemalloc.take_snapshot()
+            finally:
+                _alloc_release()
+            stats = after.compare_to(self.before, 'lineno')
+            body = f'# {self.label}: {elapsed_ms:.1f} ms, top allocations by size delta\n'
+            body += ''.join(f'{stat}\n' for stat in stats[:100])
+            self.name = self._save(lambda path: _write_text(path, body), elapsed_ms)
+        return False
+
+    def _save(self, write, elapsed_ms: float) -> Optional[str]:
+        folder = profile_dir()
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', self.label).strip('_')[:60] or 'request'
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        name = f'{stamp}-{self.mode}-{int(elapsed_ms)}ms-{slug}-{os.getpid()}{MODES[self.mode]}'
+        try:
+            os.makedirs(folder, exist_ok=True)
+            write(os.path.join(folder, name))
+            _prune(folder, _int_env('NOTES_PROFILE_KEEP', 50))
+        except OSError as e:
+            logger.warning("Could not save profile %s: %s", name, e)
+            return None
+        logger.info("Profiled %s (%s, %.0f ms): %s", self.label, self.mode, elapsed_ms, name)
+        return name
+
+
+def _alloc_acquire() -> None:
+    global _alloc_users, _alloc_started
+    with _alloc_lock:
+        if _alloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            _alloc_started = True
+        _alloc_users += 1
+
+
+def _alloc_release() -> None:
+    global _alloc_users, _alloc_started
+    with _alloc_lock:
+        _alloc_users -= 1
+        if _alloc_users == 0 and _alloc_started:
+            tracemalloc.stop()
+            _alloc_started = False
+
+
+def _write_text(path: str, body: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(body)
+
+
+def _prune(folder: str, keep: int) -> None:
+    for entry in list_profiles(folder)[keep:]:
+        try:
+            os.remove(os.path.join(folder, entry['name']))
+        except OSError:
+            pass
+
+
+def list_profiles(folder: Optional[str] = None) -> List[dict]:
+    """Saved profiles, newest first: name, mode, size, created (epoch seconds)."""
+    folder = folder or profile_dir()
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return []
+    profiles = []
+    for entry in entries:
+        if entry.is_file() and _NAME.match(entry.name):
+            stat = entry.stat()
+            mode = entry.name.split('-')[1] if entry.name.count('-') >= 2 else None
+            profiles.append({'name': entry.name, 'mode': mode, 'size': stat.st_size, 'created': stat.st_mtime})
+    profiles.sort(key=lambda p: (p['created'], p['name']), reverse=True)
+    return profiles
+
+
+def profile_path(name: str) -> Optional[str]:
+    """Path of a saved profile, or None for unknown (or unsafe) names."""
+    if not _NAME.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def _error(start_response, status: str, message: str):
+    body = ('{"error": "%s"}' % message).encode()
+    start_response(status, [('Content-Type', 'application/json'), ('Content-Length', str(len(body)))])
+    return [body]
+
+
+class WSGIMiddleware:
+    """Profiles requests of a WSGI (Flask) app that ask for it; others pass straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        ask = requested(environ.get('HTTP_X_NOTES_PROFILE'), environ.get('QUERY_STRING', ''))
+        if ask is None:
+            return self.app(environ, start_response)
+        mode, token = ask
+        if not authorized(environ.get('HTTP_X_NOTES_PROFILE_TOKEN') or token):
+            return _error(start_response, '403 Forbidden', 'profiling not allowed')
+        if mode not in MODES:
+            return _error(start_response, '400 Bad Request', f"unknown profile mode (use one of {', '.join(MODES)})")
+        session = Session(mode, f"{environ.get('REQUEST_METHOD', '')} {environ.get('PATH_INFO', '')}")
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['args'] = (status, list(headers), exc_info)
+            return lambda data: captured.setdefault('early', []).append(data)
+
+        with session:
+            result = self.app(environ, capture)
+            try:
+                # Streamed bodies are produced inside the profile too
+                body = captured.get('early', []) + list(result)
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        status, headers, exc_info = captured['args']
+        if session.name:
+            headers.append((ID_HEADER, session.name))
+        start_response(status, headers, exc_info)
+        return body
+
+
+class ASGIMiddleware:
+    """Profiles requests of an ASGI (FastAPI) app that ask for it.
+
+    `cpu` covers the event loop thread, so other requests handled concurrently show up too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get('headers') or [])
+        header = headers.get(b'x-notes-profile')
+        ask = requested(header.decode('latin-1') if header is not None else None,
+                        scope.get('query_string', b'').decode('latin-1'))
+        if ask is None:
+            return await self.app(scope, receive, send)
+        mode, token = ask
+        token_header = headers.get(b'x-notes-profile-token')
+        if not authorized(token_header.decode('latin-1') if token_header else token):
+            return await _asgi_error(send, 403, 'profiling not allowed')
+        if mode not in MODES:
+            return await _asgi_error(send, 400, f"unknown profile mode (use one of {', '.join(MODES)})")
+        session = Session(mode, f"{scope.get('method', '')} {scope.get('path', '')}")
+        messages = []
+
+        async def buffer(message):
+            messages.append(message)
+
+        with session:
+            await self.app(scope, receive, buffer)
+        for message in messages:
+            if message['type'] == 'http.response.start' and session.name:
+                message = dict(message, headers=list(message.get('headers', [])) + [
+                    (ID_HEADER.lower().encode(), session.name.encode())])
+            await send(message)
+
+
+async def _asgi_error(send, status: int, message: str) -> None:
+    body = ('{"error": "%s"}' % message).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
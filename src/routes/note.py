@@ -1,13 +1,57 @@
-from flask import Blueprint, jsonify, request
-from src.models.note import Note, db
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy import and_, func, or_
+from src.models.note import Note, NoteTombstone, db
+from src.models import note_fts
+from src import etags, export, log, sync
+from src.bulk_import import ImportReport, batches, parse_batch_size, parse_rows, read_lines
+from src.pagination import decode_cursor, encode_cursor, parse_limit, page_envelope
 
 note_bp = Blueprint('note', __name__)
+logger = log.get_logger(__name__)
+
+def _with_etag(response, etag):
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = etags.CACHE_CONTROL
+    return response
+
+def _not_modified(etag):
+    return _with_etag(Response(status=304), etag)
 
 @note_bp.route('/notes', methods=['GET'])
 def get_notes():
-    """Get all notes, ordered by most recently updated"""
-    notes = Note.query.order_by(Note.updated_at.desc()).all()
-    return jsonify([note.to_dict() for note in notes])
+    """Get notes, ordered by most recently updated.
+    With `limit`/`cursor` query params, returns one keyset page plus `next_cursor`.
+    """
+    # Conditional GET: both maxima are read from an index, as on the Supabase runtime
+    max_updated_at = db.session.query(func.max(Note.updated_at)).scalar()
+    deleted_mark = db.session.query(func.max(NoteTombstone.deleted_at)).scalar()
+    etag = etags.list_etag(max_updated_at, deleted_mark, request.query_string.decode())
+    if etags.matches(request.headers.get('If-None-Match'), etag):
+        return _not_modified(etag)
+    if 'limit' not in request.args and 'cursor' not in request.args:
+        notes = Note.query.order_by(Note.updated_at.desc()).all()
+        return _with_etag(jsonify([note.to_dict() for note in notes]), etag)
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        query = Note.query.order_by(Note.updated_at.desc(), Note.id.desc())
+        cursor = request.args.get('cursor')
+        if cursor:
+            ts, last_id = decode_cursor(cursor)
+            ts = datetime.fromisoformat(ts)
+            last_id = int(last_id)
+            query = query.filter(or_(
+                Note.updated_at < ts,
+                and_(Note.updated_at == ts, Note.id < last_id),
+            ))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    notes = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(notes) > limit:
+        notes = notes[:limit]
+        next_cursor = encode_cursor(notes[-1].updated_at, notes[-1].id)
+    return _with_etag(jsonify(page_envelope([note.to_dict() for note in notes], limit, next_cursor)), etag)
 
 @note_bp.route('/notes', methods=['POST'])
 def create_note():
@@ -31,11 +75,108 @@ def create_note():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@note_bp.route('/notes/bulk', methods=['POST'])
+def bulk_import_notes():
+    """Import notes from an NDJSON body (see src/bulk_import.py).
+    Each batch is one executemany INSERT and one commit; a failing batch is retried row by row.
+    """
+    try:
+        batch_size = parse_batch_size(request.args.get('batch_size'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    report = ImportReport()
+    insert = Note.__table__.insert()
+    for batch in batches(parse_rows(read_lines(request.stream), Note.parse_date, Note.parse_time, report), batch_size):
+        now = datetime.utcnow()
+        values = [dict(row, created_at=now, updated_at=now) for _, row in batch]
+        try:
+            db.session.execute(insert, values)
+            db.session.commit()
+            report.add_inserted(len(values))
+            continue
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Batch of %d rows failed (%s); retrying row by row", len(values), e)
+        for (line_no, _), value in zip(batch, values):
+            try:
+                db.session.execute(insert, [value])
+                db.session.commit()
+                report.add_inserted(1)
+            except Exception as e:
+                db.session.rollback()
+                report.error(line_no, str(e))
+    return jsonify(report.to_dict())
+
+@note_bp.route('/notes/export', methods=['GET'])
+def export_notes():
+    """Stream every note as NDJSON (default) or CSV (see src/export.py).
+    Rows are read in keyset-ordered chunks so memory stays flat whatever the table size.
+    """
+    try:
+        fmt = export.parse_format(request.args.get('format'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    size = export.chunk_size()
+
+    def generate():
+        yield export.header(fmt)
+        query = Note.query.order_by(Note.updated_at.desc(), Note.id.desc())
+        after = None
+        while True:
+            page = query
+            if after:
+                ts, last_id = after
+                page = page.filter(or_(
+                    Note.updated_at < ts,
+                    and_(Note.updated_at == ts, Note.id < last_id),
+                ))
+            notes = page.limit(size).all()
+            if not notes:
+                return
+            yield export.encode_chunk(fmt, [note.to_dict() for note in notes])
+            after = (notes[-1].updated_at, notes[-1].id)
+            # Drop the chunk's instances from the identity map before fetching the next one
+            db.session.expunge_all()
+            if len(notes) < size:
+                return
+
+    return Response(stream_with_context(generate()), content_type=export.FORMATS[fmt],
+                    headers={'Content-Disposition': export.content_disposition(fmt)})
+
+@note_bp.route('/notes/changes', methods=['GET'])
+def note_changes():
+    """Delta sync: notes updated and ids deleted since `since` (see src/sync.py), plus the next token."""
+    token = request.args.get('since')
+    if not token:
+        updated_mark = db.session.query(func.max(Note.updated_at)).scalar()
+        deleted_mark = db.session.query(func.max(NoteTombstone.deleted_at)).scalar()
+        return jsonify(sync.changes_envelope([], [], (updated_mark, deleted_mark)))
+    try:
+        since = sync.decode_token(token)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    notes = _changed_since(Note.query, Note.updated_at, Note.id, since[0])
+    tombstones = _changed_since(db.session.query(NoteTombstone.note_id, NoteTombstone.deleted_at),
+                                NoteTombstone.deleted_at, NoteTombstone.note_id, since[1])
+    return jsonify(sync.changes_envelope([note.to_dict() for note in notes], tombstones, since, sync.PAGE_SIZE))
+
+def _changed_since(query, ts_column, id_column, position):
+    """Up to PAGE_SIZE + 1 rows from a sync position, in (timestamp, id) order."""
+    since, after_id = sync.lower_bound(position)
+    if since:
+        since = datetime.fromisoformat(since)
+        query = query.filter(ts_column >= since if after_id is None else
+                             or_(ts_column > since, and_(ts_column == since, id_column > after_id)))
+    return query.order_by(ts_column, id_column).limit(sync.PAGE_SIZE + 1).all()
+
 @note_bp.route('/notes/<int:note_id>', methods=['GET'])
 def get_note(note_id):
     """Get a specific note by ID"""
     note = Note.query.get_or_404(note_id)
-    return jsonify(note.to_dict())
+    etag = etags.note_etag(note.id, note.updated_at)
+    if etags.matches(request.headers.get('If-None-Match'), etag):
+        return _not_modified(etag)
+    return _with_etag(jsonify(note.to_dict()), etag)
 
 @note_bp.route('/notes/<int:note_id>', methods=['PUT'])
 def update_note(note_id):
@@ -68,28 +209,41 @@ def delete_note(note_id):
 
 @note_bp.route('/notes/search', methods=['GET'])
 def search_notes():
-    """Search notes by title or content"""
+    """Search notes by title, content and tags.
+    On SQLite uses the FTS5 index: BM25-ranked, highlighted, supports "phrases" and prefix*.
+    """
     query = request.args.get('q', '')
     if not query:
         return jsonify([])
-    
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+
+    if note_fts.fts_available():
+        return jsonify(note_fts.search(query, limit))
+
     notes = Note.query.filter(
         (Note.title.contains(query)) | (Note.content.contains(query))
-    ).order_by(Note.updated_at.desc()).all()
+    ).order_by(Note.updated_at.desc()).limit(limit).all()
     
     return jsonify([note.to_dict() for note in notes])
 
 
+@note_bp.cli.command('rebuild-search-index')
+def rebuild_search_index():
+    """Create/refresh the FTS5 search index for an existing SQLite database."""
+    count = note_fts.rebuild_index()
+    print(f"Rebuilt {note_fts.FTS_TABLE} for {count} notes")
+
+
 @note_bp.route('/notes/generate', methods=['POST'])
 def generate_note():
     """Generate a structured note from user input using LLM"""
     try:
         # Import the extract_notes function from llm.py
-        import sys
-        import os
         import json
-        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__))))
-        from llm import extract_notes
+        from src.llm import extract_notes
         
         data = request.json
         
@@ -141,11 +295,8 @@ def generate_and_save_note():
     """Generate a structured note from user input using LLM and save it to database"""
     try:
         # Import the extract_notes function from llm.py
-        import sys
-        import os
         import json
-        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__))))
-        from llm import extract_notes
+        from src.llm import extract_notes
         
         data = request.json
         
@@ -209,10 +360,7 @@ def translate_note(note_id):
     """Translate a note to the target language using llm.py translate function"""
     try:
         # Import the translate function from llm.py
-        import sys
-        import os
-        sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__))))
-        from llm import translate
+        from src.llm import translate
         
         note = Note.query.get_or_404(note_id)
         data = request.json
@@ -1,11 +1,35 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+from collections import deque
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
-from src.models.note_supabase import Note
+from typing import Optional, List, Union
+from src import batch_infer, bulk_import, etags, export, log, metrics, profiling, sync
+from src.models.note_supabase import Note, NoteConflict
 from src.db_config import init_supabase_if_needed
+from src.note_cache import cache as note_cache
+from src.pagination import parse_limit, parse_offset, page_envelope
 
-router = APIRouter()
+logger = log.get_logger(__name__)
+
+async def _bind_log_route(request: Request):
+    # async, so it runs in the endpoint's own context and the binding is visible there
+    route = request.scope.get("route")
+    log.bind_route(getattr(route, "path", None) or request.url.path)
+
+router = APIRouter(dependencies=[Depends(_bind_log_route)])
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": etags.CACHE_CONTROL})
+
+def _json_response(content, etag: str) -> Response:
+    """Encode already-plain note dicts the way JSONResponse would, skipping the response_model
+    validation and jsonable_encoder walk over every row."""
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"))
+    return Response(body.encode("utf-8"), media_type="application/json",
+                    headers={"ETag": etag, "Cache-Control": etags.CACHE_CONTROL})
 
 class NoteCreate(BaseModel):
     title: str
@@ -20,6 +44,8 @@ class NoteUpdate(BaseModel):
     tags: Optional[str] = None
     event_date: Optional[str] = None
     event_time: Optional[str] = None
+    # Optional optimistic-concurrency check (same as an If-Match header)
+    updated_at: Optional[str] = None
 
 @router.post("/notes", response_model=dict)
 async def create_note(note: NoteCreate):
@@ -38,47 +64,217 @@ async def create_note(note: NoteCreate):
     )
     return created_note.to_dict()
 
-@router.get("/notes", response_model=List[dict])
-async def get_notes():
+@router.get("/notes", response_model=Union[List[dict], dict])
+async def get_notes(request: Request, limit: Optional[int] = None, cursor: Optional[str] = None):
+    if not init_supabase_if_needed():
+        raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+    # Conditional GET: a one-row version query decides 304 before any note is fetched
+    max_updated_at, deleted_mark = await Note.get_version()
+    etag = etags.list_etag(max_updated_at, deleted_mark, request.url.query)
+    if etags.matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
+    # Keyset pagination when `limit` or `cursor` is given; plain list otherwise (legacy clients)
+    if limit is not None or cursor is not None:
+        try:
+            page_size = parse_limit(limit)
+            notes, next_cursor = await Note.get_page(page_size, cursor, as_dicts=True)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        return _json_response(page_envelope(notes, page_size, next_cursor), etag)
+    return _json_response(await Note.get_all(as_dicts=True), etag)
+
+@router.get("/metrics")
+async def prometheus_metrics():
+    """Request, DB and LLM latency histograms and error counters (src/metrics.py)."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def _require_profile_token(request: Request) -> None:
+    if not profiling.authorized(request.headers.get(profiling.TOKEN_HEADER) or request.query_params.get("token")):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+@router.get("/admin/profiles", response_model=dict)
+async def list_profiles(request: Request):
+    """Request profiles captured via the X-Notes-Profile header, newest first (src/profiling.py)."""
+    _require_profile_token(request)
+    return {"profiles": profiling.list_profiles()}
+
+@router.get("/admin/profiles/{name}")
+async def download_profile(name: str, request: Request):
+    _require_profile_token(request)
+    path = profiling.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path, "rb") as f:
+        data = f.read()
+    return Response(data, media_type="application/octet-stream",
+                    headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
+# Declared before /notes/{note_id} so "cache" and "search" are not captured as an id
+@router.get("/notes/cache", response_model=dict)
+async def note_cache_stats():
+    """Hit/miss counters of the Note.get_by_id read cache (src/note_cache.py)."""
+    return note_cache.stats()
+
+@router.get("/notes/search", response_model=dict)
+async def search_notes(q: str = "", limit: Optional[int] = None, offset: Optional[int] = None, tags: str = ""):
+    if not init_supabase_if_needed():
+        raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+    try:
+        page_size = parse_limit(limit, default=20)
+        start = parse_offset(offset)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    tag_list = [t.strip() for t in tags.split(",") if t.strip()]
+    if q.strip() or tag_list:
+        notes, ranks, has_more = await Note.search(q.strip(), page_size, start, tags=tag_list)
+    else:
+        notes, ranks, has_more = [], [], False
+    items = []
+    for note, rank in zip(notes, ranks):
+        item = note.to_dict()
+        item["rank"] = rank
+        items.append(item)
+    return {
+        "notes": items,
+        "limit": page_size,
+        "offset": start,
+        "next_offset": start + page_size if has_more else None,
+    }
+
+@router.get("/notes/export")
+async def export_notes(format: str = "ndjson"):
+    """Stream every note as NDJSON or CSV, fetched in keyset-ordered chunks."""
+    try:
+        fmt = export.parse_format(format)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if not init_supabase_if_needed():
+        raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+
+    async def generate():
+        yield export.header(fmt)
+        try:
+            async for rows in export.iter_chunks(Note, export.chunk_size()):
+                yield export.encode_chunk(fmt, rows)
+        except Exception as e:
+            logger.error("[export] Aborted: %s", e)
+
+    return StreamingResponse(generate(), media_type=export.FORMATS[fmt],
+                             headers={"Content-Disposition": export.content_disposition(fmt)})
+
+@router.get("/notes/changes", response_model=dict)
+async def note_changes(since: Optional[str] = None):
+    """Delta sync: notes updated and ids deleted since `since` (see src/sync.py), plus the next token."""
     if not init_supabase_if_needed():
         raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
-    notes = await Note.get_all()
-    return [note.to_dict() for note in notes]
+    try:
+        return await sync.changes(Note, since)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+@router.post("/notes/bulk", response_model=dict)
+async def bulk_import_notes(request: Request, batch_size: Optional[int] = None):
+    """Import notes from an NDJSON body with batched multi-row inserts (see src/bulk_import.py)."""
+    if not init_supabase_if_needed():
+        raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
+    try:
+        size = bulk_import.parse_batch_size(batch_size)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    report = bulk_import.ImportReport()
+    in_flight = deque()
+    batch = []
+    line_no = 0
+    async for line in bulk_import.iter_lines(request.stream()):
+        line_no += 1
+        try:
+            row = bulk_import.parse_line(line, Note.format_date_str, Note.format_time_str)
+        except ValueError as e:
+            report.error(line_no, str(e))
+            continue
+        if row is None:
+            continue
+        batch.append((line_no, row))
+        if len(batch) >= size:
+            in_flight.append(asyncio.create_task(bulk_import.insert_batch(Note.insert_many, batch, report)))
+            batch = []
+            if len(in_flight) >= bulk_import.concurrency():
+                await in_flight.popleft()
+    if batch:
+        in_flight.append(asyncio.create_task(bulk_import.insert_batch(Note.insert_many, batch, report)))
+    await asyncio.gather(*in_flight)
+    return report.to_dict()
+
+@router.post("/infer/batch")
+async def infer_batch(request: Request):
+    """Infer event date/time for many texts against one `now` (see src/batch_infer.py)."""
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = None
+    try:
+        texts, now = batch_infer.parse_request(payload)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    # A sync iterator: Starlette drains it in a worker thread, off the event loop
+    return StreamingResponse(batch_infer.iter_ndjson(texts, now), media_type="application/x-ndjson")
 
 @router.get("/notes/{note_id}", response_model=dict)
-async def get_note(note_id: str):
+async def get_note(note_id: str, request: Request, response: Response):
     if not init_supabase_if_needed():
         raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
     note = await Note.get_by_id(note_id)
     if note is None:
         raise HTTPException(status_code=404, detail="Note not found")
+    etag = etags.note_etag(note.id, note.updated_at)
+    if etags.matches(request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = etags.CACHE_CONTROL
     return note.to_dict()
 
 @router.put("/notes/{note_id}", response_model=dict)
-async def update_note(note_id: str, note: NoteUpdate):
+async def update_note(note_id: str, note: NoteUpdate, request: Request, response: Response):
     if not init_supabase_if_needed():
         raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
-    existing_note = await Note.get_by_id(note_id)
-    if existing_note is None:
-        raise HTTPException(status_code=404, detail="Note not found")
+    try:
+        expected = etags.expected_updated_at(request.headers.get("if-match"), note.updated_at, note_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=412, detail=str(ve))
     tags = note.tags
     if isinstance(tags, list):
         tags = ",".join(t.strip() for t in tags if t)
-    updated_note = await existing_note.update(
-        title=note.title,
-        content=note.content,
-        tags=tags,
-        event_date=note.event_date,
-        event_time=note.event_time,
-    )
+    # One PATCH ... RETURNING; a missing row means 404, a stale precondition 412
+    try:
+        updated_note = await Note.update_by_id(
+            note_id,
+            title=note.title,
+            content=note.content,
+            tags=tags,
+            event_date=note.event_date,
+            event_time=note.event_time,
+            expected_updated_at=expected,
+        )
+    except NoteConflict as ce:
+        raise HTTPException(status_code=412, detail=str(ce))
+    if updated_note is None:
+        raise HTTPException(status_code=404, detail="Note not found")
+    response.headers["ETag"] = etags.note_etag(updated_note.id, updated_note.updated_at)
     return updated_note.to_dict()
 
 @router.delete("/notes/{note_id}")
-async def delete_note(note_id: str):
+async def delete_note(note_id: str, request: Request, updated_at: Optional[str] = None):
     if not init_supabase_if_needed():
         raise HTTPException(status_code=503, detail="Database not configured. Set SUPABASE_URL and SUPABASE_KEY.")
-    note = await Note.get_by_id(note_id)
-    if note is None:
+    try:
+        expected = etags.expected_updated_at(request.headers.get("if-match"), updated_at, note_id)
+    except ValueError as ve:
+        raise HTTPException(status_code=412, detail=str(ve))
+    # One DELETE; the affected row count tells 404 apart
+    try:
+        deleted = await Note.delete_by_id(note_id, expected_updated_at=expected)
+    except NoteConflict as ce:
+        raise HTTPException(status_code=412, detail=str(ce))
+    if not deleted:
         raise HTTPException(status_code=404, detail="Note not found")
-    await note.delete()
     return {"message": "Note deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,402 @@
+"""In-process inverted index with BM25 ranking over notes.
+
+For deployments that cannot add database-side search, set
+NOTES_SEARCH_BACKEND=memory and `Note.search` is answered from this index
+instead of the `search_notes` RPC. The index is built once per worker on the first
+search, reading the notes in keyset pages below PostgREST's max-rows, and then
+kept current by the create, update and delete paths of `note_supabase.Note`.
+Writes made while the build runs are queued and replayed before the index is
+used; before the first search those hooks are no-ops.
+
+Postings are two parallel `array` columns per term (doc numbers and term
+frequencies), so 100k notes cost a few MB rather than one Python object per
+posting. Deleted/replaced documents are tombstoned and the arrays are
+compacted once a quarter of the documents are dead.
+
+Set NOTES_SEARCH_SNAPSHOT=<path> to persist the index: it is written after a
+build and at exit, and a restarted worker restores it and only fetches rows
+changed since the snapshot instead of re-tokenizing every note. The snapshot
+is a pickle and must only be read from a trusted local path.
+
+Each worker holds its own copy; writes made by other workers are picked up on
+the next restart/rebuild, so use the Postgres search for multi-writer setups.
+"""
+import atexit
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src import export, log
+from src.pagination import POSTGREST_MAX_ROWS
+
+logger = log.get_logger(__name__)
+
+SNAPSHOT_VERSION = 1
+# Notes per read while building or catching up; a read cut by PostgREST's max-rows would end it early
+SCAN_PAGE_SIZE = POSTGREST_MAX_ROWS - 1
+
+# Scripts written without spaces are indexed as overlapping character bigrams
+_CJK_RANGES = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+_TOKEN = re.compile(f'([{_CJK_RANGES}]+)|[^\\W{_CJK_RANGES}]+')
+
+
+_HAS_CJK = re.compile(f'[{_CJK_RANGES}]')
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    text = (text or '').lower()
+    if not _HAS_CJK.search(text):
+        return _WORD.findall(text)
+    tokens = []
+    for m in _TOKEN.finditer(text):
+        run = m.group(1)
+        if run and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(m.group(0))
+    return tokens
+
+
+def _split_tags(tags) -> List[str]:
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return [t.strip().lower() for t in tags if t and str(t).strip()]
+
+
+class NoteIndex:
+    K1 = 1.2
+    B = 0.75
+    TITLE_BOOST = 2  # title tokens are counted this many times
+    COMPACT_RATIO = 0.25
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.doc_ids: List[Any] = []           # docno -> note id, None once deleted
+        self.docs: List[Optional[Dict[str, Any]]] = []  # docno -> note dict (to_dict form)
+        self.doc_len = array('I')
+        self.doc_tags: List[frozenset] = []
+        self.docno_by_id: Dict[str, int] = {}
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.tag_docs: Dict[str, array] = {}
+        self.total_len = 0
+        self.dead = 0
+        self.watermark: Optional[str] = None   # max updated_at indexed
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.docno_by_id)
+
+    # ---- writes ----
+    def add(self, doc: Dict[str, Any]) -> None:
+        """Index (or re-index) a note given in `Note.to_dict()` form."""
+        key = str(doc['id'])
+        terms = Counter(tokenize(doc.get('content')))
+        terms.update(tokenize(doc.get('tags')))
+        for tok in tokenize(doc.get('title')):
+            terms[tok] += self.TITLE_BOOST
+        length = sum(terms.values())
+        tags = frozenset(_split_tags(doc.get('tags')))
+        with self._lock:
+            self._remove_locked(key)
+            docno = len(self.doc_ids)
+            self.doc_ids.append(doc['id'])
+            self.docs.append(doc)
+            self.doc_len.append(length)
+            self.doc_tags.append(tags)
+            self.docno_by_id[key] = docno
+            self.total_len += length
+            for tok, tf in terms.items():
+                plist = self.postings.get(tok)
+                if plist is None:
+                    plist = self.postings[tok] = (array('I'), array('H'))
+                plist[0].append(docno)
+                plist[1].append(min(tf, 0xFFFF))
+            for tag in tags:
+                self.tag_docs.setdefault(tag, array('I')).append(docno)
+            updated = doc.get('updated_at')
+            if updated and (self.watermark is None or updated > self.watermark):
+                self.watermark = updated
+            self.dirty = True
+
+    def remove(self, note_id) -> None:
+        with self._lock:
+            self._remove_locked(str(note_id))
+            if self.dead > self.COMPACT_RATIO * max(len(self.doc_ids), 1):
+                self.compact()
+
+    def _remove_locked(self, key: str) -> None:
+        docno = self.docno_by_id.pop(key, None)
+        if docno is None:
+            return
+        self.total_len -= self.doc_len[docno]
+        self.doc_ids[docno] = None
+        self.docs[docno] = None
+        self.doc_tags[docno] = frozenset()
+        self.dead += 1
+        self.dirty = True
+
+    def compact(self) -> None:
+        """Drop tombstoned documents and renumber the survivors."""
+        with self._lock:
+            remap = array('i', [-1]) * len(self.doc_ids)
+            doc_ids, docs, doc_len, doc_tags = [], [], array('I'), []
+            for old, note_id in enumerate(self.doc_ids):
+                if note_id is None:
+                    continue
+                remap[old] = len(doc_ids)
+                doc_ids.append(note_id)
+                docs.append(self.docs[old])
+                doc_len.append(self.doc_len[old])
+                doc_tags.append(self.doc_tags[old])
+
+            def _rewrite(docnos: array, values: Optional[array] = None):
+                new_docnos, new_values = array('I'), (array(values.typecode) if values is not None else None)
+                for i, d in enumerate(docnos):
+                    if remap[d] >= 0:
+                        new_docnos.append(remap[d])
+                        if values is not None:
+                            new_values.append(values[i])
+                return new_docnos, new_values
+
+            postings = {}
+            for tok, (docnos, tfs) in self.postings.items():
+                new_docnos, new_tfs = _rewrite(docnos, tfs)
+                if new_docnos:
+                    postings[tok] = (new_docnos, new_tfs)
+            tag_docs = {}
+            for tag, docnos in self.tag_docs.items():
+                new_docnos, _ = _rewrite(docnos)
+                if new_docnos:
+                    tag_docs[tag] = new_docnos
+            self.doc_ids, self.docs, self.doc_len, self.doc_tags = doc_ids, docs, doc_len, doc_tags
+            self.postings, self.tag_docs = postings, tag_docs
+            self.docno_by_id = {str(note_id): i for i, note_id in enumerate(doc_ids)}
+            self.dead = 0
+            self.dirty = True
+
+    # ---- reads ----
+    def search(self, q: str, tags: Iterable[str] = (), limit: int = 20,
+               offset: int = 0) -> Tuple[List[Tuple[Dict[str, Any], float]], bool]:
+        """BM25 over all query terms (OR), optionally restricted to notes carrying every tag.
+        Returns ([(note dict, score), ...], has_more).
+
+        Terms are scored rarest first, MaxScore-style: once the current k-th best score
+        exceeds the most the remaining (common) terms could add, those terms are only
+        looked up for documents already in the running, by bisecting their postings,
+        instead of being scanned in full.
+        """
+        terms = list(dict.fromkeys(tokenize(q)))
+        wanted = frozenset(_split_tags(list(tags)))
+        need = offset + limit + 1
+        with self._lock:
+            if not terms:
+                return self._tag_listing(wanted, limit, offset)
+            doc_ids, doc_len, doc_tags = self.doc_ids, self.doc_len, self.doc_tags
+            n_docs = max(len(self.docno_by_id), 1)
+            k1, b = self.K1, self.B
+            base = k1 * (1 - b)
+            norm = k1 * b / ((self.total_len / n_docs) or 1.0)
+
+            plan = []
+            for tok in terms:
+                plist = self.postings.get(tok)
+                if plist is not None:
+                    df = len(plist[0])
+                    idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                    # idf * (k1 + 1) bounds the term's contribution to any document
+                    plan.append((df, idf * (k1 + 1), plist))
+            plan.sort(key=lambda p: p[0])
+            remaining = [0.0] * (len(plan) + 1)
+            for i in range(len(plan) - 1, -1, -1):
+                remaining[i] = remaining[i + 1] + plan[i][1]
+
+            scores: Dict[int, float] = {}
+            for i, (_, idf_k, (docnos, tfs)) in enumerate(plan):
+                if len(scores) >= need and heapq.nlargest(need, scores.values())[-1] > remaining[i]:
+                    for d in scores:
+                        j = bisect_left(docnos, d)
+                        if j < len(docnos) and docnos[j] == d:
+                            tf = tfs[j]
+                            scores[d] += idf_k * tf / (tf + base + norm * doc_len[d])
+                    continue
+                for d, tf in zip(docnos, tfs):
+                    if doc_ids[d] is None or (wanted and not wanted <= doc_tags[d]):
+                        continue
+                    scores[d] = scores.get(d, 0.0) + idf_k * tf / (tf + base + norm * doc_len[d])
+            top = heapq.nlargest(need, scores.items(), key=lambda kv: kv[1])
+            page = top[offset:]
+            return [(self.docs[d], score) for d, score in page[:limit]], len(page) > limit
+
+    def _tag_listing(self, wanted: frozenset, limit: int, offset: int):
+        """Tag-only query: every live note carrying all tags, most recently updated first."""
+        if not wanted:
+            return [], False
+        rarest = min(wanted, key=lambda t: len(self.tag_docs.get(t, ())))
+        live = [d for d in self.tag_docs.get(rarest, ())
+                if self.doc_ids[d] is not None and wanted <= self.doc_tags[d]]
+        live.sort(key=lambda d: self.docs[d].get('updated_at') or '', reverse=True)
+        page = live[offset:offset + limit + 1]
+        return [(self.docs[d], 0.0) for d in page[:limit]], len(page) > limit
+
+    # ---- persistence ----
+    def save(self, path: str) -> None:
+        with self._lock:
+            state = {
+                'version': SNAPSHOT_VERSION,
+                'doc_ids': self.doc_ids,
+                'docs': self.docs,
+                'doc_len': self.doc_len,
+                'doc_tags': self.doc_tags,
+                'postings': self.postings,
+                'tag_docs': self.tag_docs,
+                'total_len': self.total_len,
+                'dead': self.dead,
+                'watermark': self.watermark,
+            }
+            tmp = f'{path}.tmp'
+            with open(tmp, 'wb') as fh:
+                pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path: str) -> 'NoteIndex':
+        with open(path, 'rb') as fh:
+            state = pickle.load(fh)
+        if state.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported search index snapshot version: {state.get('version')}")
+        index = cls()
+        for name in ('doc_ids', 'docs', 'doc_len', 'doc_tags', 'postings', 'tag_docs', 'total_len', 'dead', 'watermark'):
+            setattr(index, name, state[name])
+        index.docno_by_id = {str(note_id): i for i, note_id in enumerate(index.doc_ids) if note_id is not None}
+        return index
+
+
+# ---- process-wide index used by note_supabase.Note ----
+_index: Optional[NoteIndex] = None
+_build_lock = threading.Lock()
+# Writes seen while a build is running, as ('add', doc) / ('remove', id); None when no build is running
+_pending: Optional[List[Tuple[str, Any]]] = None
+
+
+def enabled() -> bool:
+    return os.getenv('NOTES_SEARCH_BACKEND', '').lower() == 'memory'
+
+
+def _snapshot_path() -> Optional[str]:
+    return os.getenv('NOTES_SEARCH_SNAPSHOT') or None
+
+
+async def _changed_since(note_cls, since: str):
+    """Notes updated after `since`, read in (updated_at, id) keyset pages."""
+    after_id = None
+    while True:
+        docs = await note_cls.get_updated_since(since, as_dicts=True, after_id=after_id, limit=SCAN_PAGE_SIZE)
+        for doc in docs:
+            yield doc
+        if len(docs) < SCAN_PAGE_SIZE:
+            return
+        since, after_id = docs[-1]['updated_at'], docs[-1]['id']
+
+
+async def ensure_built(note_cls) -> NoteIndex:
+    """Return the worker's index, restoring a snapshot or building it from every note."""
+    global _index, _pending
+    if _index is not None:
+        return _index
+    with _build_lock:
+        if _pending is None:
+            _pending = []
+    try:
+        index = await _load_or_build(note_cls)
+    except BaseException:
+        with _build_lock:
+            if _index is None:
+                _pending = None
+        raise
+    with _build_lock:
+        if _index is None:
+            # Replay in order: a write that the reads already saw is applied again, harmlessly
+            for op, arg in _pending or ():
+                _update(index, op, arg)
+            _pending = None
+            _index = index
+            path = _snapshot_path()
+            if path:
+                index.save(path)
+                atexit.register(_save_if_dirty)
+    return _index
+
+
+async def _load_or_build(note_cls) -> NoteIndex:
+    path = _snapshot_path()
+    index = None
+    if path and os.path.exists(path):
+        try:
+            index = NoteIndex.load(path)
+            # Catch up with writes made while this worker was down
+            if index.watermark:
+                async for doc in _changed_since(note_cls, index.watermark):
+                    index.add(doc)
+            live_ids = {str(i) for i in await note_cls.get_all_ids()}
+            for key in [k for k in index.docno_by_id if k not in live_ids]:
+                index.remove(key)
+            logger.info("Restored %d notes from %s", len(index), path)
+        except Exception as e:
+            logger.warning("Snapshot restore failed, rebuilding: %s", e)
+            index = None
+    if index is None:
+        index = NoteIndex()
+        async for docs in export.iter_chunks(note_cls, SCAN_PAGE_SIZE):
+            for doc in docs:
+                index.add(doc)
+        logger.info("Built index for %d notes", len(index))
+    return index
+
+
+def _save_if_dirty() -> None:
+    path = _snapshot_path()
+    if _index is not None and path and _index.dirty:
+        try:
+            _index.save(path)
+        except Exception as e:
+            logger.warning("Failed to write snapshot: %s", e)
+
+
+def _update(index: NoteIndex, op: str, arg: Any) -> None:
+    if op == 'add':
+        index.add(arg)
+    else:
+        index.remove(arg)
+
+
+def _apply(op: str, arg: Any) -> None:
+    if _index is None:
+        with _build_lock:
+            if _index is None:
+                if _pending is not None:
+                    _pending.append((op, arg))
+                return
+    _update(_index, op, arg)
+
+
+def index_note(note) -> None:
+    """Write hook: (re)index a created/updated note once a build has started."""
+    if _index is not None or _pending is not None:
+        _apply('add', note.to_dict())
+
+
+def remove_note(note_id) -> None:
+    """Write hook: drop a deleted note once a build has started."""
+    if _index is not None or _pending is not None:
+        _apply('remove', note_id)
@@ -0,0 +1,128 @@
+"""In-memory static asset table for the SPA routes (`serve()` / `serve_spa()`).
+
+Every file under the static folder is read once per process, together with
+its gzip variant and, when the optional `brotli` package is installed, its
+brotli variant (kept only when they save at least 10%). Each variant carries
+a strong ETag derived from the content hash (`"<sha256>"`, `"<sha256>-br"`,
+`"<sha256>-gzip"`), so a request is answered from memory: pick the variant
+from `Accept-Encoding`, return 304 on a matching `If-None-Match`, otherwise
+the prebuilt bytes. No stat/open per request.
+
+Unknown paths fall back to index.html (client-side routing). The table is
+built on the first static request rather than at import, so API-only cold
+starts never pay for compression. Set NOTES_STATIC_RELOAD=1 while editing the
+UI to rebuild it on every request instead.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from src import etags
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+INDEX = 'index.html'
+CACHE_CONTROL = 'no-cache'  # names are not fingerprinted; revalidation is a cheap 304
+MIN_SAVING = 0.9  # keep a compressed variant only if it is at most 90% of the original
+ENCODINGS = ('br', 'gzip')
+
+
+class Asset:
+    __slots__ = ('content_type', 'variants')
+
+    def __init__(self, data: bytes, content_type: str):
+        self.content_type = content_type
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        # encoding ('' = identity) -> (etag, body)
+        self.variants: Dict[str, Tuple[str, bytes]] = {'': (f'"{digest}"', data)}
+        compressed = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(data, quality=11)
+        for encoding, body in compressed.items():
+            if len(body) <= len(data) * MIN_SAVING:
+                self.variants[encoding] = (f'"{digest}-{encoding}"', body)
+
+
+class AssetTable:
+    def __init__(self, folder: Optional[str]):
+        self.folder = folder
+        self.assets: Dict[str, Asset] = {}
+        if folder and os.path.isdir(folder):
+            for root, _, files in os.walk(folder):
+                for name in files:
+                    full = os.path.join(root, name)
+                    key = os.path.relpath(full, folder).replace(os.sep, '/')
+                    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                        content_type += '; charset=utf-8'
+                    with open(full, 'rb') as f:
+                        self.assets[key] = Asset(f.read(), content_type)
+
+    def lookup(self, path: str) -> Optional[Asset]:
+        """The asset for a URL path, or index.html for unknown paths (None if there is no index)."""
+        return self.assets.get(path.lstrip('/')) or self.assets.get(INDEX)
+
+    def respond(self, path: str, accept_encoding: Optional[str],
+                if_none_match: Optional[str]) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """(status, headers, body) for a GET of `path`; None when there is nothing to serve."""
+        asset = self.lookup(path)
+        if asset is None:
+            return None
+        encoding = negotiate(accept_encoding, tuple(asset.variants))
+        etag, body = asset.variants[encoding]
+        headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+        if etags.matches(if_none_match, etag):
+            return 304, headers, b''
+        headers['Content-Type'] = asset.content_type
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return 200, headers, body
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: Optional[str], available: Tuple[str, ...]) -> str:
+    """Best encoding of `available` the client accepts ('' = identity); ties prefer brotli."""
+    if not accept_encoding:
+        return ''
+    q: Dict[str, float] = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        weight = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        q[name.strip().lower()] = weight
+    best, best_q = '', 0.0
+    for encoding in ENCODINGS:
+        weight = q.get(encoding, q.get('*', 0.0))
+        if encoding in available and weight > best_q:
+            best, best_q = encoding, weight
+    return best
+
+
+_tables: Dict[str, AssetTable] = {}
+_lock = threading.Lock()
+
+
+def get_table(folder: Optional[str]) -> AssetTable:
+    """The process-wide table for `folder`, built on first use."""
+    key = folder or ''
+    if os.getenv('NOTES_STATIC_RELOAD', '').lower() in ('1', 'true', 'on'):
+        return AssetTable(folder)
+    table = _tables.get(key)
+    if table is None:
+        with _lock:
+            table = _tables.get(key)
+            if table is None:
+                table = _tables[key] = AssetTable(folder)
+    return table
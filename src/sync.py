@@ -0,0 +1,150 @@
+"""Delta sync for `GET /api/notes/changes?since=<token>`.
+
+A sync token is an opaque, URL-safe pair of positions, one for the notes
+(by `updated_at`, id) and one for the tombstones (by `deleted_at`, note id).
+A response returns at most PAGE_SIZE rows of each, oldest first (indexed
+range scans, so the cost follows the number of changes, not the size of the
+table), and sets `has_more` when either was cut short: the client then asks
+again with the new token right away. Until then the token holds the exact
+(timestamp, id) key of the last row sent, so paging neither skips nor
+repeats rows.
+
+Once a delta is complete the token holds plain watermarks, the newest
+timestamps sent. Those come from the writer's clock and a write can commit
+a little after a later timestamp was already read, so the next delta starts
+WINDOW before each watermark, inclusive: rows in that window are re-sent and
+merging them again is harmless.
+
+Without `since` the endpoint only returns the current token, which a client
+takes before loading its first page.
+"""
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from src.pagination import POSTGREST_MAX_ROWS
+
+# Rows of each kind per response; one is read past it to set has_more, within PostgREST's max-rows
+PAGE_SIZE = POSTGREST_MAX_ROWS - 1
+# How far before a watermark the next delta starts, to cover writes that commit late
+WINDOW = timedelta(seconds=10)
+
+Timestamp = Union[str, datetime, None]
+# A watermark (ISO timestamp), a [timestamp, id] key to continue after, or None (from the start)
+Position = Union[str, List[Any], None]
+
+
+def _iso(value: Timestamp) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _position(value: Any) -> Any:
+    return [_iso(value[0]), value[1]] if isinstance(value, (list, tuple)) else _iso(value)
+
+
+def encode_token(updated_at: Any, deleted_at: Any) -> str:
+    """Token for a pair of positions (watermarks, [timestamp, id] keys or None)."""
+    raw = json.dumps([_position(updated_at), _position(deleted_at)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _check_position(mark: Any) -> Position:
+    if mark is None:
+        return None
+    if isinstance(mark, list):
+        ts, key = mark if len(mark) == 2 else (None, None)
+        # Ids are embedded in a filter too: integers (or digit strings) only
+        if not isinstance(ts, str) or not (key is None or (not isinstance(key, bool) and str(key).isdigit())):
+            raise ValueError
+        _parse(ts)
+        return [ts, None if key is None else int(key)]
+    _parse(str(mark))
+    return str(mark)
+
+
+def decode_token(token: str) -> Tuple[Position, Position]:
+    """Return the (notes, tombstones) positions of a token. Raises ValueError if malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        marks = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(marks, list) or len(marks) != 2:
+            raise ValueError
+        # Validated timestamps and ids can be embedded in a filter safely
+        return tuple(_check_position(mark) for mark in marks)
+    except Exception:
+        raise ValueError('Invalid sync token')
+
+
+def lower_bound(position: Position) -> Tuple[Optional[str], Any]:
+    """(since, after_id) to read a position from: rows after the (since, after_id) key, or at or
+    after `since` when after_id is None; (None, None) reads everything."""
+    if position is None:
+        return None, None
+    if isinstance(position, list):
+        return position[0], position[1]
+    return (_parse(position) - WINDOW).isoformat(), None
+
+
+def _newest(current: Optional[str], values: Iterable[Timestamp]) -> Optional[str]:
+    newest = current
+    for value in values:
+        value = _iso(value)
+        if value and (newest is None or _parse(value) > _parse(newest)):
+            newest = value
+    return newest
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _next(position: Position, rows: List[Tuple[Timestamp, Any]], has_more: bool) -> Position:
+    """Position after sending `rows` ((timestamp, id) keys, oldest first) from `position`."""
+    if has_more:
+        # Mid-delta: continue after the exact key of the last row sent
+        if rows:
+            return [_iso(rows[-1][0]), rows[-1][1]]
+        return position if position is None else list(lower_bound(position))
+    mark = position[0] if isinstance(position, list) else position
+    return _newest(mark, (ts for ts, _ in rows))
+
+
+def changes_envelope(notes: List[Dict[str, Any]], tombstones: List[Tuple[Any, Timestamp]],
+                     since: Tuple[Position, Position], limit: Optional[int] = None) -> Dict[str, Any]:
+    """Build the response from changed `to_dict()` rows and (note_id, deleted_at) tombstones, each
+    read from `since` in key order with up to `limit + 1` rows (the extra one only flags has_more).
+    Without `limit` (the tokens-only response) the positions become watermarks."""
+    notes_more = limit is not None and len(notes) > limit
+    tombstones_more = limit is not None and len(tombstones) > limit
+    notes, tombstones = notes[:limit], tombstones[:limit]
+    has_more = notes_more or tombstones_more
+    return {
+        'notes': notes,
+        'deleted': [str(note_id) for note_id, _ in tombstones],
+        'has_more': has_more,
+        'sync_token': encode_token(
+            _next(since[0], [(n['updated_at'], _id(n['id'])) for n in notes], has_more),
+            _next(since[1], [(deleted_at, _id(note_id)) for note_id, deleted_at in tombstones], has_more),
+        ),
+    }
+
+
+def _id(value: Any) -> Any:
+    return int(value) if isinstance(value, str) and value.isdigit() else value
+
+
+async def changes(note_cls, token: Optional[str]) -> Dict[str, Any]:
+    """Delta for the Supabase runtimes: the note and tombstone range reads run concurrently."""
+    if not token:
+        return changes_envelope([], [], await note_cls.get_version())
+    # Malformed tokens raise ValueError before any round trip
+    since = decode_token(token)
+    (notes_since, notes_after), (deleted_since, deleted_after) = lower_bound(since[0]), lower_bound(since[1])
+    notes, tombstones = await asyncio.gather(
+        note_cls.get_updated_since(notes_since, inclusive=True, as_dicts=True, after_id=notes_after,
+                                   limit=PAGE_SIZE + 1),
+        note_cls.get_tombstones_since(deleted_since, after_id=deleted_after, limit=PAGE_SIZE + 1),
+    )
+    return changes_envelope(notes, tombstones, since, PAGE_SIZE)
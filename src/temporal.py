@@ -0,0 +1,147 @@
+"""Event date/time normalization shared by both Note models.
+
+`parse_date`/`parse_time` turn user input into `date`/`time` values (None
+when unusable); `format_date`/`format_time` give the canonical 'YYYY-MM-DD'
+and 'HH:MM:SS' strings sent to Supabase and returned by `to_dict()`.
+
+Accepted inputs are unchanged: YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY (when the
+day/month reading is not a valid date), DD-MM-YYYY, YYYY/MM/DD, ISO strings
+with a time part, and HH:MM[:SS] / '2:43 pm' times. Instead of trying up to
+five `strptime` formats and catching each ValueError, the format is picked from
+the string's shape with one anchored regex per shape and the calendar checked
+arithmetically, so the failure path raises nothing. Only strings that fit no
+shape but could still be ISO (they start with a 4-digit year, or a digit for
+times) reach `fromisoformat`. Results for strings are memoized in bounded
+LRU caches, since the same few dates and times recur across a list.
+"""
+import calendar
+import re
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Any, Optional
+
+CACHE_SIZE = 4096
+
+# Same components strptime matches for %d, %m and %Y
+_D = r'(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])'
+_M = r'(1[0-2]|0[1-9]|[1-9])'
+_Y = r'(\d\d\d\d)'
+
+_YMD_DASH = re.compile(rf'{_Y}-{_M}-{_D}')
+_DMY_DASH = re.compile(rf'{_D}-{_M}-{_Y}')
+_YMD_SLASH = re.compile(rf'{_Y}/{_M}/{_D}')
+_DMY_SLASH = re.compile(rf'{_D}/{_M}/{_Y}')
+_MDY_SLASH = re.compile(rf'{_M}/{_D}/{_Y}')
+
+_TIME = re.compile(r'(\d{1,2}):?(\d{2})(?::?(\d{2}))?\s*([ap]\.?.?m\.?)?')
+
+
+def _ymd(year: str, month: str, day: str) -> Optional[date]:
+    y, m, d = int(year), int(month), int(day)
+    if y < 1 or d > calendar.monthrange(y, m)[1]:
+        return None
+    return date(y, m, d)
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == '' or value == 'null'
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_date_text(text: str) -> Optional[date]:
+    v = text.strip()
+    # Trim a time portion (e.g. 2025-10-17T00:00:00Z)
+    if 'T' in v:
+        v = v.split('T')[0]
+    if '/' in v:
+        m = _YMD_SLASH.fullmatch(v)
+        if m:
+            return _ymd(*m.groups())
+        # DD/MM/YYYY wins; MM/DD/YYYY only when that is not a valid date
+        m = _DMY_SLASH.fullmatch(v)
+        parsed = _ymd(m.group(3), m.group(2), m.group(1)) if m else None
+        if parsed is None:
+            m = _MDY_SLASH.fullmatch(v)
+            parsed = _ymd(m.group(3), m.group(1), m.group(2)) if m else None
+        if parsed is not None:
+            return parsed
+    else:
+        m = _YMD_DASH.fullmatch(v)
+        if m:
+            parsed = _ymd(*m.groups())
+        else:
+            m = _DMY_DASH.fullmatch(v)
+            parsed = _ymd(m.group(3), m.group(2), m.group(1)) if m else None
+        if parsed is not None:
+            return parsed
+    # Other ISO 8601 forms (20251017, 2025-W42-4, '2025-10-17 10:00') all start with the year
+    if v[:4].isdigit():
+        try:
+            return datetime.fromisoformat(v).date()
+        except ValueError:
+            return None
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_time_text(text: str) -> Optional[time]:
+    v = text.strip().lower()
+    m = _TIME.fullmatch(v)
+    if m:
+        h = int(m.group(1))
+        mi = int(m.group(2))
+        s = int(m.group(3) or 0)
+        ampm = m.group(4)
+        if ampm:
+            if 'p' in ampm and h != 12:
+                h += 12
+            if 'a' in ampm and h == 12:
+                h = 0
+        # Clamp to valid ranges
+        return time(hour=max(0, min(23, h)), minute=max(0, min(59, mi)), second=max(0, min(59, s)))
+    # ISO forms with fractions or offsets ('10:30:00.5+08:00')
+    if v[:1].isdigit():
+        try:
+            return time.fromisoformat(v).replace(microsecond=0)
+        except ValueError:
+            return None
+    return None
+
+
+def parse_date(value: Any) -> Optional[date]:
+    """date/datetime pass through (as a date); strings are parsed; None when unusable."""
+    if _is_blank(value):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return _parse_date_text(str(value))
+
+
+def parse_time(value: Any) -> Optional[time]:
+    """time/datetime pass through without microseconds; strings are parsed; None when unusable."""
+    if _is_blank(value):
+        return None
+    if isinstance(value, time):
+        return value.replace(microsecond=0)
+    if isinstance(value, datetime):
+        return value.time().replace(microsecond=0)
+    return _parse_time_text(str(value))
+
+
+def format_date(value: Any) -> Optional[str]:
+    d = parse_date(value)
+    if d is None:
+        return None
+    # isoformat() is the same string, minus strftime's cost, for 4-digit years
+    return d.isoformat() if d.year >= 1000 else d.strftime('%Y-%m-%d')
+
+
+def format_time(value: Any) -> Optional[str]:
+    t = parse_time(value)
+    return None if t is None else '%02d:%02d:%02d' % (t.hour, t.minute, t.second)
+
+
+def cache_info() -> dict:
+    return {'date': _parse_date_text.cache_info()._asdict(), 'time': _parse_time_text.cache_info()._asdict()}
@@ -0,0 +1,232 @@
+"""Per-request trace spans, reported as a `Server-Timing` header.
+
+    with tracing.span('db.create'):
+        ...
+
+    @tracing.traced('llm')
+    def call_llm_model(...): ...
+
+A request handler starts a `Trace` (Flask before/after_request hooks, or
+`ASGIMiddleware` for the FastAPI apps) and spans opened anywhere below it, in
+the request thread, on the async_runner loop or in the translation pool, are
+recorded into it through a context variable. Outside a request `span()`
+returns a shared no-op, so instrumented code costs one ContextVar lookup.
+
+The response carries the per-name totals, e.g.
+
+    Server-Timing: llm;dur=5412.3, db.create;dur=121.7, infer;dur=0.4, to_dict;dur=0.1, total;dur=5538.0
+
+(`;desc="N calls"` is added for names seen more than once). Requests slower
+than NOTES_TRACE_SLOW_MS are also written as a Chrome trace-event JSON file
+(open in chrome://tracing or https://ui.perfetto.dev) to NOTES_TRACE_DIR.
+
+Env:
+  NOTES_SERVER_TIMING  set to 0 to omit the header (spans are then not recorded)
+  NOTES_TRACE_SLOW_MS  write traces of requests at least this slow (unset: never)
+  NOTES_TRACE_DIR      where trace files go (default <tmp>/notes-traces)
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src import log
+
+logger = log.get_logger(__name__)
+
+# Spans kept individually per trace for the JSON file; totals keep counting past it
+MAX_SPANS = 2000
+
+_current: contextvars.ContextVar = contextvars.ContextVar('notes_trace', default=None)
+
+
+def enabled() -> bool:
+    return os.getenv('NOTES_SERVER_TIMING', '1').lower() not in ('0', 'false', 'off')
+
+
+def slow_ms() -> Optional[float]:
+    try:
+        return float(os.environ['NOTES_TRACE_SLOW_MS'])
+    except (KeyError, ValueError):
+        return None
+
+
+def trace_dir() -> str:
+    return os.getenv('NOTES_TRACE_DIR') or os.path.join(tempfile.gettempdir(), 'notes-traces')
+
+
+class Trace:
+    __slots__ = ('start', 'wall_start', 'spans', 'totals', 'lock')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.wall_start = time.time()
+        # (name, start offset s, duration s, thread id)
+        self.spans: List[tuple] = []
+        # name -> [calls, seconds]
+        self.totals: Dict[str, list] = {}
+        self.lock = threading.Lock()  # spans may close concurrently (translation pool)
+
+    def add(self, name: str, start: float, duration: float) -> None:
+        with self.lock:
+            total = self.totals.get(name)
+            if total is None:
+                self.totals[name] = [1, duration]
+            else:
+                total[0] += 1
+                total[1] += duration
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append((name, start - self.start, duration, threading.get_ident()))
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        parts = []
+        for name, (calls, seconds) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            part = f'{name};dur={seconds * 1000:.1f}'
+            parts.append(part + (f';desc="{calls} calls"' if calls > 1 else ''))
+        parts.append(f'total;dur={self.elapsed() * 1000:.1f}')
+        return ', '.join(parts)
+
+    def chrome_events(self, label: str) -> dict:
+        pid = os.getpid()
+        events = [{'name': label, 'ph': 'X', 'ts': 0, 'dur': round(self.elapsed() * 1e6, 1), 'pid': pid,
+                   'tid': 'request'}]
+        for name, offset, duration, tid in self.spans:
+            events.append({'name': name, 'ph': 'X', 'ts': round(offset * 1e6, 1), 'dur': round(duration * 1e6, 1),
+                           'pid': pid, 'tid': tid})
+        return {'traceEvents': events, 'otherData': {'request': label, 'started_at': self.wall_start}}
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'start')
+
+    def __init__(self, trace: Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Context manager timing a block into the current request's trace (no-op outside one)."""
+    trace = _current.get()
+    return _NO_SPAN if trace is None else _Span(trace, name)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for sync and async functions."""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trace = _current.get()
+            if trace is None:
+                return fn(*args, **kwargs)
+            with _Span(trace, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start() -> Optional[contextvars.Token]:
+    """Begin a trace for the current request context (None when Server-Timing is disabled)."""
+    if not enabled():
+        return None
+    return _current.set(Trace())
+
+
+def current() -> Optional[Trace]:
+    return _current.get()
+
+
+def finish(token: Optional[contextvars.Token], label: str) -> Optional[str]:
+    """End the current trace; returns its Server-Timing value and writes it out if it was slow."""
+    if token is None:
+        return None
+    trace = _current.get()
+    _current.reset(token)
+    if trace is None:
+        return None
+    threshold = slow_ms()
+    if threshold is not None and trace.elapsed() * 1000 >= threshold:
+        write(trace, label)
+    return trace.server_timing()
+
+
+def write(trace: Trace, label: str) -> Optional[str]:
+    """Save `trace` as a Chrome trace-event file; returns its path (None if it could not be written)."""
+    folder = trace_dir()
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', label).strip('_')[:60] or 'request'
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(trace.wall_start))
+    path = os.path.join(folder, f'{stamp}-{int(trace.elapsed() * 1000)}ms-{slug}-{os.getpid()}.json')
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace.chrome_events(label), f)
+    except OSError as e:
+        logger.warning("Could not write trace %s: %s", path, e)
+        return None
+    logger.info("Slow request %s (%.0f ms), trace written to %s", label, trace.elapsed() * 1000, path)
+    return path
+
+
+class ASGIMiddleware:
+    """Traces each HTTP request of an ASGI (FastAPI) app and adds the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        token = start()
+        if token is None:
+            return await self.app(scope, receive, send)
+        trace = _current.get()
+        label = f"{scope.get('method', '')} {scope.get('path', '')}"
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                # Headers go out before any streamed body: the timing covers the work done so far
+                headers = list(message.get('headers', []))
+                headers.append((b'server-timing', trace.server_timing().encode('latin-1')))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish(token, label)
@@ -0,0 +1,107 @@
+"""Concurrent note translation.
+
+A note's title, content and tags used to be translated one LLM call at a time
+(2 + number of tags round trips). Here the tags go out as a single call that
+asks for a JSON array back, and the title, content and tag calls run at the
+same time on a bounded thread pool, so a translate request costs about one
+LLM latency. If the batched tag call fails or returns something unusable,
+each tag is translated on its own instead.
+
+Pool size: LLM_TRANSLATE_WORKERS (default 8, shared by all requests).
+"""
+import contextvars
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src import log
+
+logger = log.get_logger(__name__)
+
+Translator = Callable[[str, str], str]
+BatchTranslator = Callable[[List[str], str], List[str]]
+
+_FENCE = re.compile(r'^```(?:json)?\s*|\s*```$')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('LLM_TRANSLATE_WORKERS', 8)),
+                    thread_name_prefix='translate',
+                )
+    return _executor
+
+
+def batch_messages(texts: List[str], target_language: str) -> List[Dict[str, str]]:
+    """Chat messages asking for `texts` translated as a JSON array of the same length and order."""
+    prompt = (
+        f"Translate each string in the following JSON array to {target_language}. "
+        f"Reply with only a JSON array of {len(texts)} strings, in the same order, without ```json.\n\n"
+        + json.dumps(texts, ensure_ascii=False)
+    )
+    return [{"role": "user", "content": prompt}]
+
+
+def parse_batch(response: str, expected: int) -> List[str]:
+    """Parse a batched reply; raises ValueError unless it is a JSON array of `expected` strings."""
+    items = json.loads(_FENCE.sub('', (response or '').strip()))
+    if not isinstance(items, list) or len(items) != expected:
+        raise ValueError(f"expected a JSON array of {expected} items")
+    return [str(item) for item in items]
+
+
+def _clean_tag(value: str) -> str:
+    return value.strip().strip("'\"")
+
+
+def _translate_tag(translator: Translator, tag: str, target_language: str) -> str:
+    try:
+        return _clean_tag(translator(tag, target_language))
+    except Exception as e:
+        logger.warning("Error translating tag %r: %s", tag, e)
+        return tag
+
+
+def _submit(pool: ThreadPoolExecutor, fn: Callable, *args):
+    # Each task runs in a copy of the caller's context, so request-scoped state (trace spans,
+    # log route) follows the work into the pool
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def translate_fields(translator: Translator, batch_translator: Optional[BatchTranslator],
+                     title: str, content: str, tags: List[str], target_language: str) -> Dict[str, object]:
+    """Translate title, content and tags concurrently.
+    Title/content errors propagate; a tag that cannot be translated is kept as is.
+    """
+    pool = _pool()
+    title_f = _submit(pool, translator, title, target_language) if title.strip() else None
+    content_f = _submit(pool, translator, content, target_language) if content.strip() else None
+    tags_f = _submit(pool, batch_translator, tags, target_language) if tags and batch_translator else None
+
+    translated_tags: List[str] = []
+    if tags:
+        try:
+            if tags_f is None:
+                raise ValueError("no batch translator")
+            translated_tags = [_clean_tag(t) for t in tags_f.result()]
+        except Exception as e:
+            if batch_translator is not None:
+                logger.warning("Batched tag translation failed (%s); translating tags one by one", e)
+            tag_fs = [_submit(pool, _translate_tag, translator, tag, target_language) for tag in tags]
+            translated_tags = [f.result() for f in tag_fs]
+
+    return {
+        'title': title_f.result().strip() if title_f else '',
+        'content': content_f.result().strip() if content_f else '',
+        'tags': translated_tags,
+    }
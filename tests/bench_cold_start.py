@@ -0,0 +1,35 @@
+"""Cold-start benchmark for the Vercel entrypoint.
+
+Each run starts a fresh interpreter (no -X importtime, so the numbers are the
+real ones), imports `api.index` and sends the first requests to `api.index.app`
+through werkzeug's WSGI test client, then asserts the median time to the first
+response stays within budget. `python -m src.coldstart` shows where the time
+goes when it does not.
+
+Run: python tests/bench_cold_start.py [runs]
+Env: COLD_START_BUDGET_MS (default 800)
+"""
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.coldstart import measure
+
+PATHS = ('/api/health', '/')
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget = float(os.getenv('COLD_START_BUDGET_MS', '800'))
+    results = [measure(PATHS, importtime=False) for _ in range(runs)]
+    for path_index, path in enumerate(PATHS):
+        assert all(r['requests'][path_index]['status'] == 200 for r in results), path
+    first = [r['import_ms'] + r['requests'][0]['ms'] for r in results]
+    total = [r['total_ms'] for r in results]
+    print(f"import api.index:            median {statistics.median(r['import_ms'] for r in results):7.1f} ms")
+    print(f"import + first request:      median {statistics.median(first):7.1f} ms  (max {max(first):.1f})")
+    print(f"import + {len(PATHS)} requests:         median {statistics.median(total):7.1f} ms")
+    assert statistics.median(first) <= budget, f'cold start {statistics.median(first):.1f} ms > budget {budget:.0f} ms'
+    print(f'within budget ({budget:.0f} ms)')
@@ -0,0 +1,196 @@
+"""Microbenchmark for src/datetime_infer.py on long pasted meeting notes.
+
+Compares the single-pass scanner with the per-cue searches it replaced
+(kept below as the reference implementation) and checks that both give the
+same answers on every generated text, including randomized ones.
+
+Run: python tests/bench_infer_datetime.py [n_texts]
+"""
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.datetime_infer import MONTHS, WEEKDAYS, infer_event_datetime
+
+NOW = datetime(2025, 10, 15, 9, 0)
+
+
+# ---- reference: the previous implementation from src/main_flask.py ----
+def legacy_next_weekday(target_weekday: int, ref: datetime) -> datetime:
+    days_ahead = (target_weekday - ref.weekday()) % 7
+    if days_ahead == 0:
+        days_ahead = 7
+    return ref + timedelta(days=days_ahead)
+
+def legacy_this_or_next_weekday(target_weekday: int, ref: datetime, force_next: bool) -> datetime:
+    if force_next:
+        return legacy_next_weekday(target_weekday, ref)
+    # upcoming occurrence including today
+    days_ahead = (target_weekday - ref.weekday()) % 7
+    return ref + timedelta(days=days_ahead)
+
+def legacy_infer_time(text: str) -> str or None:
+    s = (text or '').lower()
+    # Prefer explicit 24-hour times like 18:00 or 09:30 first
+    m0 = re.search(r'(?:\bat\s*)?\b([01]?\d|2[0-3]):([0-5]\d)\b', s)
+    if m0:
+        h = int(m0.group(1)); mi = int(m0.group(2))
+        return f"{h:02d}:{mi:02d}"
+    # hh:mm[:ss] with optional am/pm (fallback)
+    m = re.search(r'(?:at\s*)?(\d{1,2})(?::(\d{2}))?(?::(\d{2}))?\s*(am|pm)\b', s)
+    if m:
+        h = int(m.group(1)); mi = int(m.group(2) or 0)
+        ampm = m.group(4)
+        if ampm == 'pm' and h != 12:
+            h += 12
+        if ampm == 'am' and h == 12:
+            h = 0
+        h = max(0, min(23, h)); mi = max(0, min(59, mi))
+        return f"{h:02d}:{mi:02d}"
+    # 5pm / 1130am compact
+    m2 = re.search(r'\b(\d{1,2})(\d{2})?\s*(am|pm)\b', s)
+    if m2:
+        h = int(m2.group(1)); mi = int(m2.group(2) or 0)
+        ampm = m2.group(3)
+        if ampm == 'pm' and h != 12:
+            h += 12
+        if ampm == 'am' and h == 12:
+            h = 0
+        return f"{h:02d}:{mi:02d}"
+    # Named periods
+    if any(w in s for w in ['noon', 'midday']):
+        return '12:00'
+    if 'midnight' in s:
+        return '00:00'
+    if 'morning' in s:
+        return '09:00'
+    if 'afternoon' in s:
+        return '15:00'
+    if 'evening' in s:
+        return '19:00'
+    if 'night' in s:
+        return '21:00'
+    return None
+
+def legacy_parse_numeric_date(token: str) -> datetime or None:
+    token = token.replace('.', '/').replace('-', '/').strip()
+    parts = token.split('/')
+    try:
+        if len(parts) == 3:
+            a, b, c = parts
+            if len(a) == 4:  # YYYY/MM/DD
+                return datetime(int(a), int(b), int(c))
+            d1, m1, y1 = int(a), int(b), int(c)
+            if 1 <= d1 <= 31 and 1 <= m1 <= 12 and len(c) == 4:
+                if d1 > 12:
+                    return datetime(y1, m1, d1)
+                if m1 > 12:
+                    return datetime(y1, d1, m1)
+                return datetime(y1, m1, d1)
+    except Exception:
+        return None
+    return None
+
+def legacy_infer_date(text: str, now: datetime = None) -> str or None:
+    if not text:
+        return None
+    now = now or datetime.now()
+    s = text.lower()
+    # Relative
+    if any(k in s for k in ['tomorrow', 'tmr', 'tmrw']):
+        return (now + timedelta(days=1)).date().isoformat()
+    if 'today' in s:
+        return now.date().isoformat()
+    # Weekdays
+    m = re.search(r'\b(next|this)?\s*(monday|tuesday|wednesday|thursday|friday|saturday|sunday|mon|tue|tues|wed|thu|thurs|fri|sat|sun)\b', s)
+    if m:
+        modifier = (m.group(1) or '').strip()
+        wd = WEEKDAYS[m.group(2)]
+        dt = legacy_this_or_next_weekday(wd, now, force_next=(modifier == 'next'))
+        return dt.date().isoformat()
+    # Month name forms
+    m2 = re.search(r'\b(\d{1,2})\s+(jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|sep|sept|september|oct|october|nov|november|dec|december)\s*(\d{4})?\b', s)
+    if m2:
+        day = int(m2.group(1)); month = MONTHS[m2.group(2)]; year = int(m2.group(3) or now.year)
+        try:
+            return datetime(year, month, day).date().isoformat()
+        except Exception:
+            pass
+    m3 = re.search(r'\b(jan|january|feb|february|mar|march|apr|april|may|jun|june|jul|july|aug|august|sep|sept|september|oct|october|nov|november|dec|december)\s+(\d{1,2})(?:,\s*(\d{4}))?\b', s)
+    if m3:
+        month = MONTHS[m3.group(1)]; day = int(m3.group(2)); year = int(m3.group(3) or now.year)
+        try:
+            return datetime(year, month, day).date().isoformat()
+        except Exception:
+            pass
+    # Numeric
+    for tok in re.findall(r'\b\d{1,4}[\-/\.]\d{1,2}[\-/\.]\d{1,4}\b', s):
+        dt = legacy_parse_numeric_date(tok)
+        if dt:
+            return dt.date().isoformat()
+    return None
+
+
+def legacy_infer_event_datetime(*texts, now=None):
+    merged = ' \n '.join(t for t in texts if t)
+    return legacy_infer_date(merged, now), legacy_infer_time(merged)
+
+
+# ---- inputs ----
+FILLER = ('the team reviewed the roadmap and agreed to revisit the budget with finance '
+          'action items were assigned to each owner and tracked in the shared sheet ').split()
+CUES = ['18:00', '9:30', 'at 5pm', '6:30 pm', '1130am', '12am', 'noon', 'afternoon', 'tonight', 'midnight',
+        'morning', 'evening', 'tomorrow', 'tmrw', 'today', 'next monday', 'this fri', 'sat', 'nextmonday',
+        '17 oct', '31 feb 2025', 'oct 17, 2026', 'march 3', '17/10/2025', '2025-10-17', '10.12.2025',
+        '99/99/9999', '25:61', '7:65:30pm', '5 may 2025 pm', '31 feb 2025-01-02', 'sunny', 'mon3', 'at', ':',
+        '12', '2025', 'pm', 'am', 'may', '-', '/', '.', ',']
+
+
+def meeting_notes(rnd, words=2000, cues=3):
+    """Long pasted notes: mostly filler, a few cues anywhere (or none)."""
+    text = [rnd.choice(FILLER) for _ in range(words)]
+    for _ in range(cues):
+        text.insert(rnd.randrange(len(text) + 1), rnd.choice(CUES))
+    return ' '.join(text)
+
+
+def fuzz_text(rnd):
+    """Short texts with cues glued together to stress overlaps and word boundaries."""
+    parts = [rnd.choice(CUES + FILLER[:5]) for _ in range(rnd.randrange(1, 8))]
+    return ''.join(p + rnd.choice(['', ' ', '  ', '\n', ',', '-']) for p in parts)
+
+
+def check_equivalence(rnd, n=20000):
+    for _ in range(n):
+        text = fuzz_text(rnd)
+        expected = legacy_infer_event_datetime(text, now=NOW)
+        got = infer_event_datetime(text, now=NOW)
+        assert got == expected, (text, got, expected)
+
+
+def throughput(fn, texts):
+    t0 = time.perf_counter()
+    for text in texts:
+        fn(text, now=NOW)
+    elapsed = time.perf_counter() - t0
+    mb = sum(len(t) for t in texts) / 1e6
+    return len(texts) / elapsed, mb / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rnd = random.Random(7)
+    check_equivalence(rnd)
+    print('equivalence: 20000 randomized texts match the reference')
+    for label, cues in (('no cues', 0), ('3 cues', 3), ('10 cues', 10)):
+        texts = [meeting_notes(rnd, cues=cues) for _ in range(n)]
+        for fn in (legacy_infer_event_datetime, infer_event_datetime):
+            assert fn is legacy_infer_event_datetime or all(
+                infer_event_datetime(t, now=NOW) == legacy_infer_event_datetime(t, now=NOW) for t in texts[:50])
+            per_s, mb_s = throughput(fn, texts)
+            print(f'{label:>8} {fn.__name__:>28}: {per_s:8.0f} texts/s, {mb_s:6.1f} MB/s')
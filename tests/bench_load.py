@@ -0,0 +1,338 @@
+"""Concurrent load test of the notes API against a local PostgREST stand-in.
+
+Starts tests/fake_postgrest.py (SQLite), points SUPABASE_URL at it, serves the
+Flask app (`main_flask.app`, werkzeug threaded server) or the FastAPI app
+(`main.app`, uvicorn) on a local port and has `--workers` threads replay a
+weighted mix of requests for `--duration` seconds:
+
+    list      GET /api/notes?limit=20 (half of them follow next_cursor)
+    get       GET /api/notes/<id>
+    autosave  a burst of 2-5 PUT /api/notes/<id> with If-Match, one per keystroke pause
+    create    POST /api/notes
+    delete    DELETE /api/notes/<id> of a note the same worker created
+    search    GET /api/notes/search?q=<word>
+
+Per endpoint it reports requests, errors (5xx, connection failures or an
+unexpected status), throughput and p50/p95/p99 latency, and writes the whole
+result with the git commit and the run's settings as JSON, so two commits can
+be compared with `--compare old.json`. Exits non-zero when any request failed.
+
+Run: python tests/bench_load.py [--app flask|fastapi] [--workers 8] [--duration 10]
+                                [--seed-notes 500] [--db-latency-ms 0] [--out FILE]
+                                [--compare FILE]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tests.fake_postgrest import WORDS, FakePostgREST
+
+# name -> relative weight in the mix
+MIX = {'list': 30, 'get': 25, 'autosave': 10, 'create': 10, 'delete': 5, 'search': 20}
+# Statuses that count as success; anything else is an error
+EXPECTED = {
+    'list': {200, 304},
+    'get': {200, 304},
+    'autosave': {200, 412},  # 412: another worker saved the same seeded note in between
+    'create': {201},
+    'delete': {200},
+    'search': {200},
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted `values` (0.0 when empty)."""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+# ---- servers ----
+
+def serve_flask():
+    from werkzeug.serving import make_server
+    from src.main_flask import app
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # no access log line per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='load-server', daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def serve_fastapi():
+    try:
+        import uvicorn
+        from src.main import app
+    except ImportError as e:
+        raise SystemExit(f'--app fastapi needs fastapi and uvicorn installed ({e})')
+    import socket
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level='warning', access_log=False))
+    threading.Thread(target=server.run, kwargs={'sockets': [sock]}, name='load-server', daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+
+    return sock.getsockname()[1], stop
+
+
+SERVERS = {'flask': serve_flask, 'fastapi': serve_fastapi}
+
+
+# ---- client ----
+
+class Client:
+    """One keep-alive connection per worker; reconnects when the server closes it."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body=None, headers=None):
+        """(status, headers, parsed JSON or None, seconds); status 0 on a connection failure."""
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        start = time.perf_counter()
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+            try:
+                self.conn.request(method, path, body=data, headers=headers)
+                response = self.conn.getresponse()
+                raw = response.read()
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    return 0, {}, None, time.perf_counter() - start
+                start = time.perf_counter()  # stale keep-alive socket: retry once on a fresh one
+                continue
+            elapsed = time.perf_counter() - start
+            if response.will_close:
+                self.conn.close()
+                self.conn = None
+            try:
+                payload = json.loads(raw) if raw else None
+            except ValueError:
+                payload = None
+            return response.status, response.headers, payload, elapsed
+        return 0, {}, None, time.perf_counter() - start
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {name: [] for name in MIX}
+        self.statuses: Dict[str, Counter] = {name: Counter() for name in MIX}
+        self.errors: Counter = Counter()
+
+    def add(self, name: str, status: int, seconds: float) -> None:
+        with self.lock:
+            self.latencies[name].append(seconds)
+            self.statuses[name][status] += 1
+            if status not in EXPECTED[name]:
+                self.errors[name] += 1
+
+
+class Worker(threading.Thread):
+    def __init__(self, index: int, port: int, ids: List[int], recorder: Recorder, deadline: float, seed: int):
+        super().__init__(name=f'load-worker-{index}', daemon=True)
+        self.client = Client(port)
+        self.ids = ids  # seeded notes, never deleted
+        self.recorder = recorder
+        self.deadline = deadline
+        self.rnd = random.Random(seed * 1000 + index)
+        self.created: List[str] = []
+        self.cursor: Optional[str] = None
+
+    def call(self, name: str, method: str, path: str, body=None, headers=None):
+        status, response_headers, payload, seconds = self.client.request(method, path, body, headers)
+        self.recorder.add(name, status, seconds)
+        return status, response_headers, payload
+
+    def note_id(self) -> str:
+        return str(self.rnd.choice(self.ids))
+
+    def run(self) -> None:
+        names = list(MIX)
+        weights = [MIX[name] for name in names]
+        while time.perf_counter() < self.deadline:
+            getattr(self, 'do_' + self.rnd.choices(names, weights)[0])()
+
+    def do_list(self) -> None:
+        path = '/api/notes?limit=20'
+        if self.cursor and self.rnd.random() < 0.5:
+            path += '&cursor=' + self.cursor
+        status, _, payload = self.call('list', 'GET', path)
+        self.cursor = payload.get('next_cursor') if status == 200 and isinstance(payload, dict) else None
+
+    def do_get(self) -> None:
+        self.call('get', 'GET', f'/api/notes/{self.note_id()}')
+
+    def do_autosave(self) -> None:
+        note_id = self.created[-1] if self.created and self.rnd.random() < 0.5 else self.note_id()
+        etag = None
+        text = ' '.join(self.rnd.sample(WORDS, 4))
+        for _ in range(self.rnd.randint(2, 5)):
+            text += ' ' + self.rnd.choice(WORDS)
+            headers = {'If-Match': etag} if etag else None
+            status, response_headers, _ = self.call('autosave', 'PUT', f'/api/notes/{note_id}',
+                                                    {'content': text}, headers)
+            if status != 200:
+                return
+            etag = response_headers.get('ETag')
+            time.sleep(self.rnd.uniform(0.005, 0.02))  # typing pause between debounced saves
+
+    def do_create(self) -> None:
+        words = self.rnd.sample(WORDS, 5)
+        status, _, payload = self.call('create', 'POST', '/api/notes', {
+            'title': ' '.join(words[:2]).title(),
+            'content': ' '.join(words),
+            'tags': words[:2],
+        })
+        if status == 201 and isinstance(payload, dict) and payload.get('id'):
+            self.created.append(payload['id'])
+
+    def do_delete(self) -> None:
+        if not self.created:
+            return self.do_create()
+        self.call('delete', 'DELETE', f'/api/notes/{self.created.pop(0)}')
+
+    def do_search(self) -> None:
+        self.call('search', 'GET', f'/api/notes/search?q={self.rnd.choice(WORDS)}&limit=20')
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    def stats(latencies: List[float], errors: int, statuses: Counter) -> dict:
+        latencies = sorted(latencies)
+        return {
+            'requests': len(latencies),
+            'errors': errors,
+            'rps': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'max_ms': round((latencies[-1] if latencies else 0.0) * 1000, 2),
+            'statuses': {str(status): n for status, n in sorted(statuses.items())},
+        }
+
+    endpoints = {name: stats(recorder.latencies[name], recorder.errors[name], recorder.statuses[name])
+                 for name in MIX}
+    everything = [s for values in recorder.latencies.values() for s in values]
+    total = stats(everything, sum(recorder.errors.values()), sum(recorder.statuses.values(), Counter()))
+    return {'endpoints': endpoints, 'total': total}
+
+
+def print_table(result: dict, baseline: Optional[dict] = None) -> None:
+    print(f"{'endpoint':<10} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+          + (f"  {'req/s vs base':>13} {'p95 vs base':>11}" if baseline else ''))
+    rows = list(result['endpoints'].items()) + [('total', result['total'])]
+    for name, s in rows:
+        line = (f"{name:<10} {s['requests']:>8} {s['errors']:>6} {s['rps']:>8.1f} {s['p50_ms']:>8.2f} "
+                f"{s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+        if baseline:
+            old = baseline['total'] if name == 'total' else baseline.get('endpoints', {}).get(name)
+            if old and old.get('rps') and old.get('p95_ms'):
+                line += f"  {(s['rps'] / old['rps'] - 1) * 100:>+12.1f}% {(s['p95_ms'] / old['p95_ms'] - 1) * 100:>+10.1f}%"
+        print(line)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--app', choices=sorted(SERVERS), default='flask')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load')
+    parser.add_argument('--seed-notes', type=int, default=500, help='notes in the database at start')
+    parser.add_argument('--db-latency-ms', type=float, default=0.0, help='added to every PostgREST request')
+    parser.add_argument('--seed', type=int, default=1, help='random seed of the request mix')
+    parser.add_argument('--out', help='result JSON (default .bench/load-<app>-<commit>.json)')
+    parser.add_argument('--compare', help='earlier result JSON to compare against')
+    args = parser.parse_args(argv)
+
+    fake = FakePostgREST(latency=args.db_latency_ms / 1000)
+    url = fake.start()
+    ids = fake.seed(args.seed_notes, random.Random(args.seed))
+    # Before the app is imported: the Supabase client and the log level are read on first use
+    os.environ.update(SUPABASE_URL=url, SUPABASE_KEY=FakePostgREST.KEY)
+    os.environ.setdefault('NOTES_LOG_LEVEL', 'WARNING')
+    port, stop = SERVERS[args.app]()
+
+    # Warm-up outside the measurement: lazy imports, client creation, first connections
+    warm = Worker(-1, port, ids, Recorder(), 0, args.seed)
+    for name in MIX:
+        getattr(warm, 'do_' + name)()
+
+    recorder = Recorder()
+    start = time.perf_counter()
+    workers = [Worker(i, port, ids, recorder, start + args.duration, args.seed)
+               for i in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    stop()
+    fake.stop()
+
+    commit = git_commit()
+    result = {
+        'app': args.app,
+        'commit': commit,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'config': {'workers': args.workers, 'duration_s': args.duration, 'seed_notes': args.seed_notes,
+                   'db_latency_ms': args.db_latency_ms, 'seed': args.seed, 'mix': MIX,
+                   'python': sys.version.split()[0]},
+        'elapsed_s': round(elapsed, 3),
+        'db_requests': fake.requests,
+        **summarize(recorder, elapsed),
+    }
+    out = args.out or os.path.join(ROOT, '.bench', f"load-{args.app}-{commit or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"baseline: {baseline.get('app')} @ {baseline.get('commit')}")
+    print(f"{args.app} @ {commit}: {args.workers} workers, {elapsed:.1f} s, {args.seed_notes} seeded notes, "
+          f"{args.db_latency_ms:g} ms DB latency")
+    print_table(result, baseline)
+    print(f'saved {out}')
+    if result['total']['errors']:
+        print(f"FAILED: {result['total']['errors']} requests errored", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Microbenchmark: listing notes through the pydantic model vs `Note.dict_from_row`.
+
+Times turning PostgREST rows into the JSON body of `GET /api/notes` both ways
+(the model path parses both timestamps, validates a `Note` and re-formats every
+field in `to_dict()`), and checks the bodies are byte-identical.
+
+Run: python tests/bench_note_rows.py [n_rows]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.note_supabase import Note
+
+
+def make_rows(n, seed=7):
+    rnd = random.Random(seed)
+    for i in range(n):
+        fraction = f'.{rnd.randint(1, 999999)}' if rnd.random() < 0.3 else ''
+        yield {
+            'id': i + 1,
+            'title': f'Note {i}',
+            'content': 'Meeting notes ' * rnd.randint(1, 40),
+            'tags': 'work,ideas' if i % 3 else None,
+            'event_date': f'2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}' if i % 2 else None,
+            'event_time': f'{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00' if i % 4 else None,
+            'created_at': f'2025-10-01T08:{i % 60:02d}:00{fraction}+00:00',
+            'updated_at': f'2025-10-02T09:{i % 60:02d}:00+00:00',
+        }
+
+
+def model_path(rows):
+    return [note.to_dict() for note in Note._from_rows([dict(r) for r in rows])]
+
+
+def fast_path(rows):
+    return Note._from_rows(rows, as_dicts=True)
+
+
+def timed(fn, rows, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        body = json.dumps(fn(rows), ensure_ascii=False, separators=(',', ':'))
+        best = min(best, time.perf_counter() - t0)
+    return best, body
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rows = list(make_rows(n))
+    slow, slow_body = timed(model_path, rows)
+    fast, fast_body = timed(fast_path, rows)
+    assert slow_body == fast_body, 'bodies differ'
+    print(f'{n} rows -> JSON: model {slow * 1000:7.1f} ms, dict_from_row {fast * 1000:7.1f} ms '
+          f'({slow / fast:.1f}x), bodies identical')
@@ -0,0 +1,64 @@
+"""Microbenchmark for src/search_index.py: build, query latency and snapshot restore.
+
+Single-term queries on very common words (e.g. w5) cannot be pruned and scan
+their whole postings list; multi-term queries are pruned MaxScore-style.
+
+Run: python tests/bench_search_index.py [n_notes]
+"""
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.search_index import NoteIndex
+
+WORDS = [f'w{i}' for i in range(20000)]
+TAGS = ['work', 'sports', 'family', 'shopping', 'travel', 'study', 'health', 'ideas']
+
+
+def make_notes(n, seed=7):
+    rnd = random.Random(seed)
+    log_v = math.log(len(WORDS))
+
+    def words(k):
+        # Log-uniform ranks give a Zipf-like vocabulary: few common terms, many rare ones
+        return ' '.join(WORDS[int(math.exp(rnd.random() * log_v)) - 1] for _ in range(k))
+
+    for i in range(n):
+        yield {
+            'id': str(i + 1),
+            'title': words(4),
+            'content': words(60),
+            'tags': ','.join(rnd.sample(TAGS, 2)),
+            'updated_at': f'2025-01-01T00:00:{i % 60:02d}',
+        }
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    index = NoteIndex()
+    t0 = time.perf_counter()
+    for doc in make_notes(n):
+        index.add(doc)
+    print(f'build: {n} notes in {time.perf_counter() - t0:.2f}s')
+
+    queries = [('w500 w1200', ()), ('w3000', ()), ('w15000 w18000', ()), ('w800', ('work',)), ('w40 w9000', ()), ('w5', ())]
+    for q, tags in queries:
+        runs = 200
+        t0 = time.perf_counter()
+        for _ in range(runs):
+            hits, _ = index.search(q, tags=tags, limit=20)
+        per = (time.perf_counter() - t0) / runs * 1000
+        print(f'search {q!r:>18} tags={tags}: {per:.3f} ms/query, {len(hits)} hits')
+
+    path = os.path.join(tempfile.mkdtemp(), 'index.snap')
+    t0 = time.perf_counter()
+    index.save(path)
+    print(f'snapshot save: {time.perf_counter() - t0:.2f}s, {os.path.getsize(path) / 1e6:.1f} MB')
+    t0 = time.perf_counter()
+    NoteIndex.load(path)
+    print(f'snapshot load: {time.perf_counter() - t0:.2f}s')
@@ -0,0 +1,169 @@
+"""Microbenchmark for src/temporal.py against the per-model parsers it replaced.
+
+Checks that both give the same answers on randomized inputs (valid, invalid
+and odd shapes), then times valid, invalid and repeated-value workloads and
+the `to_dict()`-style formatting of stored date/time objects.
+
+Run: python tests/bench_temporal.py [n_values]
+"""
+import os
+import random
+import re
+import sys
+import time as clock
+from datetime import date, datetime, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import temporal
+
+
+# ---- Previous implementation (models/note.py parse_date/parse_time) ----
+
+def legacy_parse_date(value):
+    if value in (None, '', 'null'):
+        return None
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    v = str(value).strip()
+    if 'T' in v:
+        v = v.split('T')[0]
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d'):
+        try:
+            return datetime.strptime(v, fmt).date()
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(v).date()
+    except Exception:
+        return None
+
+
+def legacy_parse_time(value):
+    if value in (None, '', 'null'):
+        return None
+    if isinstance(value, time):
+        return value.replace(microsecond=0)
+    if isinstance(value, datetime):
+        return value.time().replace(microsecond=0)
+    v = str(value).strip().lower()
+    m = re.match(r'^(\d{1,2}):?(\d{2})(?::?(\d{2}))?\s*([ap]\.?.?m\.?)?$', v)
+    if m:
+        h = int(m.group(1)); mi = int(m.group(2)); s = int(m.group(3) or 0)
+        ampm = m.group(4)
+        if ampm:
+            if 'p' in ampm and h != 12:
+                h += 12
+            if 'a' in ampm and h == 12:
+                h = 0
+        h = max(0, min(23, h)); mi = max(0, min(59, mi)); s = max(0, min(59, s))
+        return time(hour=h, minute=mi, second=s)
+    try:
+        return time.fromisoformat(v).replace(microsecond=0)
+    except Exception:
+        return None
+
+
+def legacy_to_dict_date(d):
+    return d.strftime('%Y-%m-%d')
+
+
+def legacy_to_dict_time(t):
+    return t.replace(microsecond=0).strftime('%H:%M:%S')
+
+
+# ---- Inputs ----
+
+def _num(rnd, width):
+    n = rnd.randint(0, 10 ** width - 1)
+    return str(n).zfill(width) if rnd.random() < 0.5 else str(n)
+
+
+def fuzz_date(rnd):
+    y = rnd.choice(['2025', '2024', '0999', '0000', '25', '20251', _num(rnd, 4)])
+    m = rnd.choice(['1', '01', '10', '12', '13', '0', ' 1', _num(rnd, 2)])
+    d = rnd.choice(['1', '01', '29', '30', '31', '32', ' 5', '00', _num(rnd, 2)])
+    sep = rnd.choice('-/-/.')
+    order = rnd.choice([(y, m, d), (d, m, y), (m, d, y)])
+    s = sep.join(order)
+    extra = rnd.random()
+    if extra < 0.1:
+        s += 'T10:00:00Z'
+    elif extra < 0.15:
+        s += ' 10:00'
+    elif extra < 0.2:
+        s = ' ' + s + ' '
+    elif extra < 0.25:
+        s = y + m.strip().zfill(2) + d.strip().zfill(2)
+    elif extra < 0.28:
+        s = f'{y}-W{rnd.randint(1, 53):02d}-{rnd.randint(1, 7)}'
+    elif extra < 0.32:
+        s = rnd.choice(['tomorrow', 'null', '', 'next friday', '17 oct 2025'])
+    return s
+
+
+def fuzz_time(rnd):
+    h = rnd.choice(['0', '00', '9', '09', '12', '23', '24', '99', ''])
+    m = rnd.choice(['00', '30', '59', '60', '5', ''])
+    sec = rnd.choice(['', ':00', ':59', ':75', '00', '.5'])
+    sep = rnd.choice([':', ':', ''])
+    ampm = rnd.choice(['', '', ' pm', 'am', ' a.m.', ' P.M.', 'pm.', ' xm', '+08:00', 'Z'])
+    s = f'{h}{sep}{m}{sec}{ampm}'
+    if rnd.random() < 0.1:
+        s = rnd.choice(['noon', 'T10:30', '10', '1030', 'evening', ' 10:30 '])
+    return s
+
+
+def check_equivalence(rnd, n=50000):
+    for _ in range(n):
+        s = fuzz_date(rnd)
+        assert temporal.parse_date(s) == legacy_parse_date(s), s
+        s = fuzz_time(rnd)
+        assert temporal.parse_time(s) == legacy_parse_time(s), s
+    for value in (date(2025, 10, 17), datetime(2025, 10, 17, 9, 30, 15, 500), date(999, 1, 2)):
+        assert temporal.parse_date(value) == legacy_parse_date(value)
+        assert temporal.format_date(value) == legacy_to_dict_date(legacy_parse_date(value))
+    for value in (time(9, 30, 15, 500), datetime(2025, 10, 17, 23, 59, 1)):
+        assert temporal.parse_time(value) == legacy_parse_time(value)
+        assert temporal.format_time(value) == legacy_to_dict_time(legacy_parse_time(value))
+
+
+def rate(fn, values):
+    t0 = clock.perf_counter()
+    for v in values:
+        fn(v)
+    return len(values) / (clock.perf_counter() - t0)
+
+
+def report(label, legacy, new, values):
+    temporal._parse_date_text.cache_clear()
+    temporal._parse_time_text.cache_clear()
+    old_rate, new_rate = rate(legacy, values), rate(new, values)
+    print(f'{label:>34}: legacy {old_rate:10.0f}/s  temporal {new_rate:10.0f}/s  ({new_rate / old_rate:4.1f}x)')
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rnd = random.Random(7)
+    check_equivalence(rnd)
+    print('equivalence: randomized dates and times match the previous parsers')
+
+    # Dates spread over ~8 years: the first 3000 are nearly all distinct (parsing cost),
+    # the full lists repeat values the way a real note list does (memo hits)
+    days = [date(2020, 1, 1).toordinal() + rnd.randint(0, 3000) for _ in range(n)]
+    iso = [date.fromordinal(d).isoformat() for d in days]
+    dmy = [date.fromordinal(d).strftime('%d/%m/%Y') for d in days]
+    mdy = [date.fromordinal(d).strftime('%m/%d/%Y') for d in days]
+    junk = [rnd.choice(['tomorrow', 'next fri', 'tbd', '17 oct']) + str(i) for i in range(n)]
+    report('dates YYYY-MM-DD (first sight)', legacy_parse_date, temporal.parse_date, iso[:min(n, 3000)])
+    report('dates DD/MM/YYYY', legacy_parse_date, temporal.parse_date, dmy)
+    report('dates MM/DD/YYYY (4th format)', legacy_parse_date, temporal.parse_date, mdy)
+    report('invalid dates (all formats fail)', legacy_parse_date, temporal.parse_date, junk)
+    times = [f'{rnd.randint(1, 12)}:{rnd.randint(0, 59):02d} {rnd.choice(["am", "pm"])}' for _ in range(n)]
+    report('times h:mm am/pm (repeating)', legacy_parse_time, temporal.parse_time, times)
+    report('to_dict date objects', lambda d: legacy_to_dict_date(legacy_parse_date(d)), temporal.format_date,
+           [date.fromordinal(d) for d in days])
+    report('to_dict time objects', lambda t: legacy_to_dict_time(legacy_parse_time(t)), temporal.format_time,
+           [time(rnd.randint(0, 23), rnd.randint(0, 59)) for _ in range(n)])
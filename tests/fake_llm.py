@@ -0,0 +1,109 @@
+"""Local OpenAI-compatible chat completions endpoint for tests.
+
+Serves POST /chat/completions with deterministic answers so src.llm and the
+translate/generate routes can run without network access or tokens:
+- note extraction prompts get a JSON {Title, Notes, Tags} object
+- "Translate the following text to <lang>:" prompts get "[<lang>] <text>"
+- batched JSON-array translation prompts get the array with each item prefixed
+- anything else is echoed back
+`latency` adds a fixed delay per call; `connections` records the distinct
+client sockets seen, which shows whether callers reuse pooled connections.
+
+Usage:
+    fake = FakeLLM(latency=0.05)
+    url = fake.start()  # then set GITHUB_MODELS_ENDPOINT/OPENAI_BASE_URL=url
+"""
+import json
+import re
+import threading
+import time
+from typing import Callable, List
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_TRANSLATE = re.compile(r'^Translate the following text to (.+?):\n\n(.*)$', re.S)
+_TRANSLATE_BATCH = re.compile(r'^Translate each string in the following JSON array to (.+?)\. .*?\n\n(\[.*\])$', re.S)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 with explicit Content-Length keeps the connection open between
+    # requests (werkzeug's dev server always answers "Connection: close")
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            body = {}
+        status, payload = self.server.fake.handle(self.path, body, self.client_address)
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def default_responder(messages: List[dict]) -> str:
+    system = next((m['content'] for m in messages if m['role'] == 'system'), '')
+    user = next((m['content'] for m in reversed(messages) if m['role'] == 'user'), '')
+    if "Extract the user's notes" in system:
+        words = user.split()
+        return json.dumps({'Title': ' '.join(words[:4]), 'Notes': user, 'Tags': words[:2]})
+    m = _TRANSLATE_BATCH.match(user)
+    if m:
+        return json.dumps([f'[{m.group(1)}] {item}' for item in json.loads(m.group(2))], ensure_ascii=False)
+    m = _TRANSLATE.match(user)
+    if m:
+        return f'[{m.group(1)}] {m.group(2)}'
+    return user
+
+
+class FakeLLM:
+    def __init__(self, responder: Callable[[List[dict]], str] = default_responder, latency: float = 0.0):
+        self.responder = responder
+        self.latency = latency
+        self.requests: List[dict] = []
+        self.connections = set()
+        self.server = None
+        self._lock = threading.Lock()
+
+    def handle(self, path: str, body: dict, client_address) -> tuple:
+        with self._lock:
+            self.requests.append(body)
+            self.connections.add(client_address)
+        if not path.endswith('/chat/completions'):
+            return 404, {'error': 'not found'}
+        if self.latency:
+            time.sleep(self.latency)
+        content = self.responder(body.get('messages') or [])
+        payload = {
+            'id': f'chatcmpl-fake-{len(self.requests)}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': content},
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+        return 200, payload
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f'http://{host}:{self.server.server_port}'
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+
+import pytest
+
+from src import async_runner
+
+
+async def _loop_and_value(value):
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop(), value
+
+
+async def _fail():
+    raise ValueError('boom')
+
+
+def test_run_uses_one_persistent_loop():
+    loop, value = async_runner.run(_loop_and_value(1))
+    assert value == 1
+    assert loop is async_runner.get_loop()
+    assert loop.is_running()
+    assert async_runner.run(_loop_and_value(2))[0] is loop
+
+
+def test_exceptions_propagate():
+    with pytest.raises(ValueError):
+        async_runner.run(_fail())
+
+
+def test_submit_carries_the_callers_context():
+    route = contextvars.ContextVar('route', default=None)
+
+    async def read():
+        return route.get()
+
+    route.set('/api/notes/bulk')
+    try:
+        assert async_runner.submit(read()).result(1) == '/api/notes/bulk'
+    finally:
+        route.set(None)
+
+
+def test_concurrent_callers_overlap():
+    def call():
+        async_runner.run(asyncio.sleep(0.2))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - start < 0.8
+
+
+def test_concurrent_first_calls_share_one_async_client(monkeypatch):
+    import supabase
+    from src import db_config
+
+    created = []
+
+    async def acreate_client(url, key):
+        await asyncio.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(db_config, '_SUPABASE_KEY', 'key')
+    monkeypatch.setattr(db_config, '_async_clients', weakref.WeakKeyDictionary())
+    monkeypatch.setattr(supabase, 'acreate_client', acreate_client)
+
+    async def first_requests():
+        return await asyncio.gather(*(db_config.get_async_supabase() for _ in range(5)))
+
+    clients = async_runner.run(first_requests())
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+    assert async_runner.run(db_config.get_async_supabase()) is created[0]
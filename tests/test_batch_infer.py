@@ -0,0 +1,90 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from src import batch_infer
+from src.datetime_infer import infer_event_datetime
+
+NOW = datetime(2025, 10, 16, 10, 0)
+TEXTS = ["Dinner tomorrow at 6pm", ["Standup", "every day 09:30"], None, "nothing here", "Call next Monday evening"]
+
+
+def test_parse_request():
+    texts, now = batch_infer.parse_request({'texts': TEXTS, 'now': '2025-10-16T10:00:00Z'})
+    assert texts == TEXTS and now == NOW
+    for bad in (None, {'texts': 'x'}, {'texts': [1]}, {'texts': [], 'now': 'soon'}):
+        with pytest.raises(ValueError):
+            batch_infer.parse_request(bad)
+
+
+def test_infer_many_inline_matches_single():
+    expected = [infer_event_datetime(*(t if isinstance(t, list) else [t]), now=NOW) for t in TEXTS]
+    assert list(batch_infer.infer_many(TEXTS, NOW, chunk=2, max_workers=0)) == expected
+    assert expected[0] == ('2025-10-17', '18:00') and expected[2] == (None, None)
+
+
+def test_infer_many_process_pool_keeps_order():
+    texts = [f"item {i}: meet on {i % 28 + 1}/11/2025 at {i % 24}:15" for i in range(60)]
+    results = list(batch_infer.infer_many(texts, NOW, chunk=7, max_workers=2))
+    assert results == [(f'2025-11-{i % 28 + 1:02d}', f'{i % 24:02d}:15') for i in range(60)]
+
+
+def test_iter_ndjson():
+    lines = ''.join(batch_infer.iter_ndjson(TEXTS[:2], NOW)).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'index': 0, 'event_date': '2025-10-17', 'event_time': '18:00'},
+        {'index': 1, 'event_date': None, 'event_time': '09:30'},
+    ]
+
+
+def test_plan_updates_only_changed_rows():
+    rows = [
+        {'id': '1', 'event_date': None, 'event_time': None},
+        {'id': '2', 'event_date': '2025-10-17', 'event_time': '18:00:00'},
+        {'id': '3', 'event_date': '2025-12-01', 'event_time': None},
+    ]
+    inferred = [('2025-10-17', '18:00'), ('2025-10-17', '18:00'), ('2025-10-18', None)]
+    assert batch_infer.plan_updates(rows, inferred) == [{'id': '1', 'event_date': '2025-10-17', 'event_time': '18:00:00'}]
+    assert batch_infer.plan_updates(rows, inferred, overwrite=True)[1] == \
+        {'id': '3', 'event_date': '2025-10-18', 'event_time': None}
+
+
+class FakeStore:
+    writes = []
+    notes = [{'id': str(i), 'title': f'note {i}', 'content': 'lunch tomorrow at noon' if i % 2 else 'no plans',
+              'event_date': None, 'event_time': None} for i in range(5)]
+
+    @classmethod
+    async def get_page(cls, limit, cursor=None, as_dicts=False):
+        start = int(cursor or 0)
+        page = cls.notes[start:start + limit]
+        return page, (str(start + limit) if start + limit < len(cls.notes) else None)
+
+    @classmethod
+    async def set_events_many(cls, changes):
+        cls.writes.append(changes)
+        return len(changes)
+
+
+def test_backfill_writes_changed_rows_per_page():
+    summary = asyncio.run(batch_infer.backfill(FakeStore, NOW, batch_size=2))
+    assert summary == {'scanned': 5, 'changed': 2, 'written': 2}
+    assert FakeStore.writes == [
+        [{'id': '1', 'event_date': '2025-10-17', 'event_time': '12:00:00'}],
+        [{'id': '3', 'event_date': '2025-10-17', 'event_time': '12:00:00'}],
+    ]
+
+
+def test_backfill_pages_stay_below_postgrest_max_rows():
+    limits = []
+
+    class Store(FakeStore):
+        @classmethod
+        async def get_page(cls, limit, cursor=None, as_dicts=False):
+            limits.append(limit)
+            return [], None
+
+    asyncio.run(batch_infer.backfill(Store, NOW, batch_size=1000, dry_run=True))
+    assert limits == [999]
@@ -0,0 +1,119 @@
+import asyncio
+import io
+import json
+
+import pytest
+from flask import Flask
+
+from src import bulk_import
+from src.models.note import Note, db
+from src.routes.note import note_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    app.register_blueprint(note_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+
+
+def _ndjson(*objs):
+    return '\n'.join(o if isinstance(o, str) else json.dumps(o) for o in objs) + '\n'
+
+
+def test_parse_rows_reports_bad_lines():
+    report = bulk_import.ImportReport()
+    lines = _ndjson(
+        {'title': 'a', 'tags': ['x', ' y '], 'event_date': '17/10/2025'},
+        'not json',
+        '',
+        [1, 2],
+        {'content': 'b', 'event_time': 'whenever'},
+        {'content': 'c'},
+    ).splitlines()
+    rows = list(bulk_import.parse_rows(lines, Note.parse_date, Note.parse_time, report))
+    assert [n for n, _ in rows] == [1, 6]
+    assert rows[0][1]['tags'] == 'x,y'
+    assert str(rows[0][1]['event_date']) == '2025-10-17'
+    assert rows[1][1]['title'] == 'Untitled'
+    assert [e['line'] for e in report.to_dict()['errors']] == [2, 4, 5]
+
+
+def test_failed_batch_is_retried_row_by_row():
+    calls = []
+
+    async def insert_many(rows):
+        calls.append(len(rows))
+        if any(r['title'] == 'bad' for r in rows):
+            raise ValueError('constraint violated')
+        return len(rows)
+
+    report = bulk_import.ImportReport()
+    batch = [(1, {'title': 'a'}), (2, {'title': 'bad'}), (3, {'title': 'c'})]
+    asyncio.run(bulk_import.insert_batch(insert_many, batch, report))
+    assert calls == [3, 1, 1, 1]
+    assert report.to_dict()['inserted'] == 2
+    assert report.to_dict()['errors'] == [{'line': 2, 'error': 'constraint violated'}]
+
+
+def test_read_lines_splits_across_chunks():
+    stream = io.BytesIO(b'{"a": 1}\n{"b": 2}\n\n{"c": 3}')
+    assert list(bulk_import.read_lines(stream, chunk_size=3)) == [b'{"a": 1}', b'{"b": 2}', b'', b'{"c": 3}']
+
+
+def test_long_lines_are_reassembled_from_many_chunks():
+    long_line = b'{"title": "' + b'x' * 5000 + b'"}'
+    body = long_line + b'\n{"a": 1}\n' + long_line
+    assert list(bulk_import.read_lines(io.BytesIO(body), chunk_size=7)) == [long_line, b'{"a": 1}', long_line]
+
+    async def chunks():
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    async def collect():
+        return [line async for line in bulk_import.iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == [long_line, b'{"a": 1}', long_line]
+
+
+def test_flask_bulk_route_reports_failures_as_json(monkeypatch):
+    from src import main_flask
+
+    def broken(rows, size):
+        raise RuntimeError('loop stopped')
+
+    monkeypatch.setattr(main_flask, 'init_supabase_if_needed', lambda: True)
+    monkeypatch.setattr(bulk_import, 'batches', broken)
+    resp = main_flask.app.test_client().post('/api/notes/bulk', data=b'{"title": "a"}\n')
+    assert resp.status_code == 500
+    assert resp.get_json() == {'error': 'Failed to import notes'}
+
+
+def test_parse_batch_size(monkeypatch):
+    monkeypatch.delenv('NOTES_BULK_BATCH_SIZE', raising=False)
+    assert bulk_import.parse_batch_size(None) == 500
+    assert bulk_import.parse_batch_size('10') == 10
+    assert bulk_import.parse_batch_size(10 ** 9) == bulk_import.MAX_BATCH_SIZE
+    with pytest.raises(ValueError):
+        bulk_import.parse_batch_size('0')
+
+
+def test_bulk_endpoint_inserts_in_batches(client):
+    body = _ndjson(*[{'title': f'note {i}', 'content': 'x'} for i in range(25)], {'nope': 1})
+    resp = client.post('/api/notes/bulk?batch_size=10', data=body, content_type='application/x-ndjson')
+    assert resp.status_code == 200
+    assert resp.get_json() == {
+        'inserted': 25, 'failed': 1, 'errors_truncated': False,
+        'errors': [{'line': 26, 'error': 'title or content is required'}],
+    }
+    assert Note.query.count() == 25
+    # Rows inserted through executemany are still picked up by the FTS triggers
+    assert len(client.get('/api/notes/search?q=note&limit=100').get_json()) == 25
+
+
+def test_bulk_endpoint_rejects_bad_batch_size(client):
+    assert client.post('/api/notes/bulk?batch_size=-1', data='').status_code == 400
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+from src import coldstart
+from src.coldstart import ImportRecord, by_package, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       512 |        512 |   _io
+import time:      1200 |       1800 |     flask.json
+import time:       600 |        600 |       json
+import time:      3000 |       4800 |   flask
+import time:        40 |         40 | src
+"""
+
+
+def test_parse_importtime():
+    records = parse_importtime(SAMPLE + 'unrelated warning\n')
+    assert records[0] == ImportRecord('_io', 512, 512, 1)
+    assert records[2] == ImportRecord('json', 600, 600, 3)
+    assert [r.name for r in records] == ['_io', 'flask.json', 'json', 'flask', 'src']
+    assert by_package(records) == {'flask': 4200, 'json': 600, '_io': 512, 'src': 40}
+
+
+def test_entrypoint_import_defers_clients():
+    # Importing the app must not pull in the Supabase SDK or openai; they load on first use
+    code = ('import sys; from src import main_flask; '
+            'print(sorted(m for m in ("supabase", "openai", "httpx") if m in sys.modules))')
+    out = subprocess.run([sys.executable, '-c', code], cwd=coldstart.PROJECT_ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == '[]'
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from flask import Flask
+
+from src import etags
+from src.models.note import db
+from src.routes.note import note_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    app.register_blueprint(note_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+
+
+def test_matches():
+    tag = etags.note_etag(1, '2025-10-17T08:30:00')
+    assert etags.matches(tag, tag)
+    assert etags.matches(f'"other", W/{tag}', tag)
+    assert etags.matches('*', tag)
+    assert not etags.matches(None, tag)
+    assert not etags.matches('"other"', tag)
+
+
+def test_list_etag_tracks_inserts_updates_and_deletes(client):
+    first = client.post('/api/notes', json={'title': 'a', 'content': 'x'}).get_json()
+    second = client.post('/api/notes', json={'title': 'b', 'content': 'y'}).get_json()
+    tags = [client.get('/api/notes').headers['ETag']]
+    client.put(f"/api/notes/{first['id']}", json={'title': 'a2'})
+    tags.append(client.get('/api/notes').headers['ETag'])
+    # `second` is now the older note: its delete leaves max(updated_at) alone
+    client.delete(f"/api/notes/{second['id']}")
+    tags.append(client.get('/api/notes').headers['ETag'])
+    client.delete(f"/api/notes/{first['id']}")
+    tags.append(client.get('/api/notes').headers['ETag'])
+    assert len(set(tags)) == 4
+    # Each keyset page gets its own validator
+    assert client.get('/api/notes?limit=1').headers['ETag'] != tags[-1]
+
+
+def test_supabase_list_etag_changes_on_same_second_writes(monkeypatch):
+    from postgrest import AsyncPostgrestClient
+
+    from src import main_flask
+    from src.models import note_supabase
+    from tests.fake_postgrest import FakePostgREST
+
+    fake = FakePostgREST()
+    url = fake.start()
+    try:
+        ids = fake.seed(3)
+        clients = {}
+
+        async def get_client():
+            # One client per loop, as db_config keeps them
+            return clients.setdefault(asyncio.get_running_loop(), AsyncPostgrestClient(url + '/rest/v1'))
+
+        monkeypatch.setattr(main_flask, 'init_supabase_if_needed', lambda: True)
+        monkeypatch.setattr(note_supabase, 'init_supabase_if_needed', lambda: True)
+        monkeypatch.setattr(note_supabase, 'get_async_supabase', get_client)
+        client = main_flask.app.test_client()
+        tags = [client.get('/api/notes').headers['ETag']]
+        for content in ('a', 'b'):
+            assert client.put(f'/api/notes/{ids[0]}', json={'content': content}).status_code == 200
+            tags.append(client.get('/api/notes').headers['ETag'])
+        # Deleting a note that is not the newest leaves max(updated_at) alone; the tombstone moves the tag
+        assert client.delete(f'/api/notes/{ids[1]}').status_code == 200
+        tags.append(client.get('/api/notes').headers['ETag'])
+        assert len(set(tags)) == 4
+        assert client.get('/api/notes', headers={'If-None-Match': tags[-1]}).status_code == 304
+    finally:
+        fake.stop()
+
+
+def test_conditional_get_returns_304(client):
+    note = client.post('/api/notes', json={'title': 'a', 'content': 'x'}).get_json()
+    for url in ('/api/notes', '/api/notes?limit=5', f"/api/notes/{note['id']}"):
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.headers['Cache-Control'] == 'no-cache'
+        cached = client.get(url, headers={'If-None-Match': resp.headers['ETag']})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == resp.headers['ETag']
+
+    client.put(f"/api/notes/{note['id']}", json={'content': 'changed'})
+    resp = client.get(f"/api/notes/{note['id']}", headers={'If-None-Match': cached.headers['ETag']})
+    assert resp.status_code == 200
+    assert resp.get_json()['content'] == 'changed'
+
+
+def test_if_match_pins_updated_at():
+    tag = etags.note_etag(7, '2025-10-17T08:30:00+00:00')
+    assert etags.if_match_updated_at(tag, '7') == '2025-10-17T08:30:00+00:00'
+    assert etags.if_match_updated_at('*', 7) is None
+    for bad in (f'W/{tag}', '"garbage"'):
+        with pytest.raises(ValueError):
+            etags.if_match_updated_at(bad, 7)
+    # A tag taken from another note never matches
+    with pytest.raises(ValueError):
+        etags.if_match_updated_at(tag, 8)
+    assert etags.expected_updated_at(None, '2025-10-17T08:30:00Z', 7) == '2025-10-17T08:30:00Z'
+    with pytest.raises(ValueError):
+        etags.expected_updated_at(None, 'yesterday', 7)
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from src import export
+from src.models.note import Note, db
+from src.routes.note import note_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    app.register_blueprint(note_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        base = datetime(2025, 10, 1)
+        # Pairs of notes share an updated_at so the id tie-breaker is exercised
+        for i in range(25):
+            db.session.add(Note(title=f'note {i}', content='x', tags='a,b',
+                                created_at=base, updated_at=base + timedelta(minutes=i // 2)))
+        db.session.commit()
+        yield app.test_client()
+
+
+def test_ndjson_export_walks_all_chunks(client, monkeypatch):
+    monkeypatch.setenv('NOTES_EXPORT_CHUNK_SIZE', '4')
+    resp = client.get('/api/notes/export')
+    assert resp.status_code == 200
+    assert resp.mimetype == 'application/x-ndjson'
+    assert 'attachment' in resp.headers['Content-Disposition']
+    rows = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert len(rows) == 25
+    assert len({r['id'] for r in rows}) == 25
+    keys = [(r['updated_at'], r['id']) for r in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_csv_export(client, monkeypatch):
+    monkeypatch.setenv('NOTES_EXPORT_CHUNK_SIZE', '5')
+    resp = client.get('/api/notes/export?format=csv')
+    assert resp.mimetype == 'text/csv'
+    rows = list(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+    assert rows[0] == export.COLUMNS
+    assert len(rows) == 26
+    assert rows[1][export.COLUMNS.index('tags')] == 'a,b'
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get('/api/notes/export?format=xml').status_code == 400
+
+
+def test_supabase_export_pages_past_postgrest_max_rows(monkeypatch):
+    import asyncio
+
+    from postgrest import AsyncPostgrestClient
+
+    from src.models import note_supabase
+    from tests.fake_postgrest import FakePostgREST
+
+    fake = FakePostgREST(max_rows=1000)
+    url = fake.start()
+    try:
+        fake.seed(1100)
+        clients = {}
+
+        async def get_client():
+            # One client per asyncio.run() loop, as db_config keeps them
+            loop = asyncio.get_running_loop()
+            return clients.setdefault(loop, AsyncPostgrestClient(url + '/rest/v1'))
+
+        async def export_all():
+            return [row async for rows in export.iter_chunks(note_supabase.Note, export.chunk_size()) for row in rows]
+
+        monkeypatch.setattr(note_supabase, 'init_supabase_if_needed', lambda: True)
+        monkeypatch.setattr(note_supabase, 'get_async_supabase', get_client)
+        for size in (None, '5000'):
+            if size:
+                monkeypatch.setenv('NOTES_EXPORT_CHUNK_SIZE', size)
+            rows = asyncio.run(export_all())
+            assert len(rows) == 1100
+            assert len({r['id'] for r in rows}) == 1100
+    finally:
+        fake.stop()
@@ -1,4 +1,36 @@
-from src.main_flask import infer_event_datetime
+from datetime import datetime
+
+from src.datetime_infer import infer_date, infer_event_datetime, infer_time
+
+# A Thursday
+NOW = datetime(2025, 10, 16, 10, 0)
+
+
+def test_samples():
+    assert infer_event_datetime("There is a meeting scheduled with John today at 18:00.", now=NOW) == ('2025-10-16', '18:00')
+    assert infer_event_datetime("Dinner tomorrow at 6pm", now=NOW) == ('2025-10-17', '18:00')
+    assert infer_event_datetime("Call on next Monday evening", now=NOW) == ('2025-10-20', '19:00')
+    assert infer_event_datetime("Standup 09:30", now=NOW) == (None, '09:30')
+
+
+def test_cue_priorities():
+    # 24h beats am/pm and keywords, wherever they appear
+    assert infer_time("this evening at 7pm, doors 18:45") == '18:45'
+    assert infer_time("lunch at noon or 1 pm") == '13:00'
+    # "1:15 pm" is read by the 24h pattern first, as it always has been
+    assert infer_time("lunch at 1:15 pm") == '01:15'
+    # "noon" inside "afternoon" has always counted as noon
+    assert infer_time("see you this afternoon") == '12:00'
+    assert infer_date("on 2025-11-03, or 5 nov, or friday", now=NOW) == '2025-10-17'
+    assert infer_date("on 2025-11-03, or 5 nov", now=NOW) == '2025-11-05'
+
+
+def test_invalid_and_missing():
+    assert infer_date("31 feb then 2025-12-01", now=NOW) == '2025-12-01'
+    assert infer_date("version 1.2.3 then 03/04/2026", now=NOW) == '2026-04-03'
+    assert infer_event_datetime("", None) == (None, None)
+    assert infer_time("nothing scheduled") is None
+
 
 if __name__ == "__main__":
     samples = [
@@ -0,0 +1,41 @@
+import time
+
+from src.llm_cache import LLMCache, make_key
+
+MESSAGES = [{'role': 'user', 'content': 'Translate the following text to Japanese:\n\nHello'}]
+
+
+def test_key_covers_every_input():
+    base = make_key('m', MESSAGES, 1.0, 1.0)
+    assert base == make_key('m', [dict(MESSAGES[0])], 1, 1)
+    assert base != make_key('m2', MESSAGES, 1.0, 1.0)
+    assert base != make_key('m', MESSAGES, 0.2, 1.0)
+    assert base != make_key('m', MESSAGES, 1.0, 0.9)
+    assert base != make_key('m', MESSAGES, 1.0, 1.0, namespace='openai')
+
+
+def test_tiers_and_counters(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    calls = []
+    fn = lambda: calls.append(1) or 'こんにちは'
+    cache = LLMCache(path=path)
+    assert cache.get_or_call(fn, 'm', MESSAGES) == 'こんにちは'
+    assert cache.get_or_call(fn, 'm', MESSAGES) == 'こんにちは'
+    # A fresh process only shares the disk tier
+    other = LLMCache(path=path)
+    assert other.get_or_call(fn, 'm', MESSAGES) == 'こんにちは'
+    assert len(calls) == 1
+    assert cache.stats()['memory_hits'] == 1 and cache.stats()['misses'] == 1
+    assert other.stats()['disk_hits'] == 1
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = LLMCache(path=str(tmp_path / 'c.sqlite3'), ttl=0.05, max_bytes=25, memory_entries=1)
+    cache.put('a', 'x' * 10)
+    cache.put('b', 'y' * 10)
+    cache.put('c', 'z' * 10)  # over 25 bytes: least recently used 'a' goes
+    assert cache.get('a') is None
+    assert cache.get('b') == 'y' * 10
+    time.sleep(0.06)
+    assert cache.get('b') is None and cache.get('c') is None
+    assert cache.stats()['evictions'] >= 1
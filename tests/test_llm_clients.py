@@ -0,0 +1,36 @@
+import pytest
+
+from src import llm_clients
+from tests.fake_llm import FakeLLM
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeLLM()
+    url = fake.start()
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    monkeypatch.setenv('GITHUB_MODELS_ENDPOINT', url)
+    llm_clients.close_all()
+    yield fake
+    llm_clients.close_all()
+    fake.stop()
+
+
+def test_client_is_shared_and_connections_are_reused(fake):
+    client = llm_clients.get_client('github')
+    assert llm_clients.get_client('github') is client
+    for i in range(5):
+        resp = client.chat.completions.create(
+            model='openai/gpt-4.1-mini',
+            messages=[{'role': 'user', 'content': f'Translate the following text to French:\n\nhello {i}'}],
+        )
+        assert resp.choices[0].message.content == f'[French] hello {i}'
+    assert len(fake.requests) == 5
+    assert len(fake.connections) == 1
+
+
+def test_missing_key_raises(monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    llm_clients.close_all()
+    with pytest.raises(RuntimeError):
+        llm_clients.get_client('openai')
@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_load_harness_short_run(tmp_path):
+    out = tmp_path / 'load.json'
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, 'tests', 'bench_load.py'),
+         '--duration', '1', '--workers', '2', '--seed-notes', '50', '--out', str(out)],
+        capture_output=True, text=True, timeout=120,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    result = json.loads(out.read_text())
+    assert result['app'] == 'flask'
+    assert result['total']['errors'] == 0
+    assert result['total']['requests'] > 0
+    assert set(result['endpoints']) == {'list', 'get', 'autosave', 'create', 'delete', 'search'}
+    for stats in result['endpoints'].values():
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
@@ -0,0 +1,93 @@
+import io
+import json
+import logging
+
+import pytest
+
+from src import log
+from src.log import RouteSampler, parse_sample, preview
+
+
+class Loud:
+    rendered = 0
+
+    def __repr__(self):
+        Loud.rendered += 1
+        return 'loud'
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    out = io.StringIO()
+    monkeypatch.setenv('NOTES_LOG_LEVEL', 'INFO')
+    log.configure(stream=out, force=True)
+    log.bind_route(None)
+    yield out
+    log.flush()
+    log.configure(force=True)
+
+
+def test_preview_truncates_lazily():
+    assert str(preview('x' * 20, limit=16)) == 'x' * 16 + '... [20 chars]'
+    assert str(preview({'a': 1})) == "{'a': 1}"
+    Loud.rendered = 0
+    preview(Loud())
+    assert Loud.rendered == 0
+
+
+def test_debug_payloads_not_formatted_at_default_level(stream):
+    logger = log.get_logger('src.test')
+    Loud.rendered = 0
+    logger.debug('payload: %s', preview(Loud()))
+    assert Loud.rendered == 0
+    logger.info('kept %s', preview(Loud()))
+    log.flush()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1 and lines[0].endswith('INFO notes.test kept loud')
+
+
+def test_payload_is_rendered_when_logged(stream):
+    payload = {'title': 'before'}
+    log.get_logger('src.test').info('note %s', preview(payload))
+    # The request goes on changing the payload while the listener thread may not have run yet
+    payload['title'] = 'after'
+    log.flush()
+    assert stream.getvalue().splitlines()[-1].endswith("note {'title': 'before'}")
+
+
+def test_exceptions_and_json(stream, monkeypatch):
+    monkeypatch.setenv('NOTES_LOG_FORMAT', 'json')
+    log.configure(stream=stream, force=True)
+    log.bind_route('/api/notes')
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        log.get_logger('src.test').exception('failed: %s', 'x')
+    log.flush()
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry['level'] == 'ERROR' and entry['msg'] == 'failed: x'
+    assert entry['route'] == '/api/notes' and 'ValueError: boom' in entry['exc']
+
+
+def test_parse_sample():
+    assert parse_sample('/api/notes=0.1, *=2,bad,/x=nan?') == {'/api/notes': 0.1, '*': 1.0}
+    assert parse_sample(None) == {}
+
+
+def test_route_sampling_is_per_request():
+    draws = iter([0.5, 0.05])
+    sampler = RouteSampler({'/api/notes': 0.1, '/api/health': 0.0}, rand=lambda: next(draws))
+
+    def record(level):
+        return logging.LogRecord('notes.t', level, __file__, 1, 'm', None, None)
+
+    log.bind_route('/api/notes')  # draws 0.5: dropped, but warnings still pass
+    assert [sampler.filter(record(logging.INFO)), sampler.filter(record(logging.DEBUG)),
+            sampler.filter(record(logging.WARNING))] == [False, False, True]
+    log.bind_route('/api/notes')  # draws 0.05: kept for the whole request
+    assert sampler.filter(record(logging.INFO)) and sampler.filter(record(logging.INFO))
+    log.bind_route('/api/health')
+    assert not sampler.filter(record(logging.INFO))
+    log.bind_route('/other')  # no rate configured: always kept, no draw
+    assert sampler.filter(record(logging.INFO))
+    log.bind_route(None)
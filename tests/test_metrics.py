@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+import pytest
+
+from src import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def series(name, labels):
+    return metrics.snapshot()[(name, labels)]
+
+
+def test_histogram_buckets_and_render():
+    for seconds in (0.0005, 0.001, 0.02, 100.0):
+        metrics.observe('notes_db_call_duration_seconds', ('get_all',), seconds)
+    cell = series('notes_db_call_duration_seconds', ('get_all',))
+    assert cell[0] == 4 and cell[1] == pytest.approx(100.0215)
+    text = metrics.render()
+    assert 'notes_db_call_duration_seconds_bucket{method="get_all",le="0.001"} 2' in text
+    assert 'notes_db_call_duration_seconds_bucket{method="get_all",le="0.025"} 3' in text
+    assert 'notes_db_call_duration_seconds_bucket{method="get_all",le="+Inf"} 4' in text
+    assert 'notes_db_call_duration_seconds_count{method="get_all"} 4' in text
+    assert '# TYPE notes_errors_total counter' in text
+
+
+def test_record_request_counts_5xx_as_errors():
+    metrics.record_request('flask', 'GET', '/api/notes/<note_id>', 200, 0.01)
+    metrics.record_request('flask', 'GET', '/api/notes/<note_id>', 500, 0.01)
+    text = metrics.render()
+    assert 'notes_http_requests_total{app="flask",method="GET",route="/api/notes/<note_id>",status="500"} 1' in text
+    assert 'notes_errors_total{component="http",operation="/api/notes/<note_id>"} 1' in text
+
+
+def test_timed_sync_and_async():
+    @metrics.llm_call
+    def translate(text):
+        if text is None:
+            raise ValueError('no text')
+        return text
+
+    @metrics.db_call
+    async def get_by_id(note_id):
+        return note_id
+
+    assert translate('hi') == 'hi' and translate.__name__ == 'translate'
+    with pytest.raises(ValueError):
+        translate(None)
+    assert asyncio.run(get_by_id(3)) == 3
+    assert series('notes_llm_call_duration_seconds', ('translate',))[0] == 2
+    assert series('notes_errors_total', ('llm', 'translate')) == [1]
+    assert series('notes_db_call_duration_seconds', ('get_by_id',))[0] == 1
+
+
+def test_shards_merge_across_threads_and_survive_thread_exit():
+    def work():
+        for _ in range(100):
+            metrics.inc('notes_errors_total', ('db', 'create'))
+
+    threads = [threading.Thread(target=work) for _ in range(metrics._RETIRE_EVERY + 8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    work()
+    assert series('notes_errors_total', ('db', 'create')) == [100 * (len(threads) + 1)]
+    assert len(metrics._shards) < len(threads)
+
+
+def test_flask_routes_are_recorded():
+    from src.main_flask import app
+    client = app.test_client()
+    assert client.get('/api/health').status_code == 200
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'notes_http_requests_total{app="flask",method="GET",route="/api/health",status="200"} 1' in response.get_data(as_text=True)
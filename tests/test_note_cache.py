@@ -0,0 +1,43 @@
+import time
+
+from src.models.note_supabase import Note
+from src.note_cache import NoteCache
+
+
+def _note(note_id, title='t', updated_at=None):
+    return Note(id=note_id, title=title, content='c', updated_at=updated_at)
+
+
+def test_hits_copies_and_counters():
+    cache = NoteCache()
+    assert cache.get(1) is None
+    cache.put(_note(1))
+    hit = cache.get('1')
+    hit.title = 'mutated'
+    assert cache.get(1).title == 't'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 1, 2 / 3)
+
+
+def test_lru_and_ttl_eviction():
+    cache = NoteCache(max_entries=2, ttl=0.05)
+    for i in range(3):
+        cache.put(_note(i))
+    assert cache.get(0) is None and cache.get(2) is not None
+    assert cache.stats()['evictions'] == 1
+    time.sleep(0.06)
+    assert cache.get(2) is None
+
+
+def test_fill_skipped_after_concurrent_write():
+    cache = NoteCache()
+    generation = cache.generation()
+    cache.invalidate(1)  # a delete lands while the read is in flight
+    cache.fill(_note(1), generation)
+    assert cache.get(1) is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = NoteCache(enabled=False)
+    cache.put(_note(1))
+    assert cache.get(1) is None
@@ -0,0 +1,39 @@
+import pytest
+from flask import Flask
+
+from src.models.note import Note, db
+from src.models import note_fts
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def test_build_match_query():
+    assert note_fts.build_match_query('badm* "review meeting"') == '"badm"* "review meeting"'
+    # FTS5 syntax in user input is neutralised, never passed through
+    assert note_fts.build_match_query('NEAR( a OR') == '"NEAR" "a" "OR"'
+    assert note_fts.build_match_query('  ') == ''
+
+
+def test_index_follows_insert_update_delete(app):
+    note = Note(title='Badminton', content='Play at <b>PolyU</b> tomorrow')
+    db.session.add(note)
+    db.session.commit()
+    hits = note_fts.search('poly*')
+    assert [h['id'] for h in hits] == [note.id]
+    assert hits[0]['highlight']['content'] == 'Play at &lt;b&gt;<mark>PolyU</mark>&lt;/b&gt; tomorrow'
+
+    note.content = 'Cancelled'
+    db.session.commit()
+    assert note_fts.search('polyu') == []
+
+    db.session.delete(note)
+    db.session.commit()
+    assert note_fts.search('cancelled') == []
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from postgrest import AsyncPostgrestClient
+
+from src.models import note_supabase
+from src.models.note_supabase import Note, NoteConflict
+
+
+def test_build_tsquery():
+    assert Note.build_tsquery('review meet') == "'review' & 'meet':*"
+    assert Note.build_tsquery('"review meeting" john') == "('review' <-> 'meeting') & 'john':*"
+    assert Note.build_tsquery("badm* O'Brien") == "'badm':* & ('o' <-> 'brien':*)"
+    # tsquery operators in user input never reach Postgres
+    assert Note.build_tsquery('&|!():*') == ''
+
+
+class _PostgREST:
+    """Answers GET/PATCH/DELETE on `notes` the way PostgREST does, for the real postgrest-py client."""
+
+    def __init__(self):
+        self.rows = {1: {'id': 1, 'title': 't', 'content': 'c', 'tags': None, 'event_date': None,
+                         'event_time': None, 'created_at': '2025-10-01T08:00:00+00:00',
+                         'updated_at': '2025-10-01T08:00:00+00:00'}}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        params = request.url.params
+        matched = [row for row in self.rows.values()
+                   if f"eq.{row['id']}" == params.get('id')
+                   and params.get('updated_at', f"eq.{row['updated_at']}") == f"eq.{row['updated_at']}"]
+        if request.method == 'PATCH':
+            for row in matched:
+                row.update(json.loads(request.content))
+        elif request.method == 'DELETE':
+            for row in matched:
+                del self.rows[row['id']]
+        if request.method != 'GET' and 'return=representation' not in request.headers.get('prefer', ''):
+            return httpx.Response(204, headers={'Content-Range': f'*/{len(matched)}'})
+        columns = params.get('select', '*')
+        return httpx.Response(200, json=[row if columns == '*' else {c: row[c] for c in columns.split(',')}
+                                         for row in matched])
+
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    server = _PostgREST()
+    client = AsyncPostgrestClient('http://postgrest.test')
+    client.session = httpx.AsyncClient(base_url='http://postgrest.test', transport=httpx.MockTransport(server))
+
+    async def get_client():
+        return client
+
+    monkeypatch.setattr(note_supabase, 'init_supabase_if_needed', lambda: True)
+    monkeypatch.setattr(note_supabase, 'get_async_supabase', get_client)
+    return server
+
+
+def test_delete_by_id_reports_deleted_rows(postgrest):
+    assert asyncio.run(Note.delete_by_id('1')) is True
+    assert postgrest.requests[0].url.params['select'] == 'id'
+    assert postgrest.rows == {}
+    assert asyncio.run(Note.delete_by_id('1')) is False
+
+
+def test_update_by_id_returns_api_columns_only(postgrest):
+    note = asyncio.run(Note.update_by_id('1', content='new', expected_updated_at='2025-10-01T08:00:00+00:00'))
+    assert note.content == 'new'
+    assert postgrest.requests[0].url.params['select'] == note_supabase.NOTE_COLUMNS
+    with pytest.raises(NoteConflict):
+        asyncio.run(Note.update_by_id('1', content='stale', expected_updated_at='2025-10-01T08:00:00+00:00'))
+
+
+def test_writes_within_one_second_get_distinct_validators(postgrest):
+    # An autosave burst: each save sends the validator of the previous one
+    first = asyncio.run(Note.update_by_id('1', content='a', expected_updated_at='2025-10-01T08:00:00+00:00'))
+    second = asyncio.run(Note.update_by_id('1', content='ab', expected_updated_at=first.updated_at.isoformat()))
+    assert second.updated_at != first.updated_at
+    # A client still holding the first validator must not overwrite the second save
+    with pytest.raises(NoteConflict):
+        asyncio.run(Note.update_by_id('1', content='lost', expected_updated_at=first.updated_at.isoformat()))
+    assert postgrest.rows[1]['content'] == 'ab'
+
+
+def _legacy_to_dict(row):
+    return Note._from_rows([dict(row)])[0].to_dict()
+
+
+def test_dict_from_row_matches_model_path():
+    rows = [
+        {'id': 7, 'title': 'Dinner', 'content': 'x', 'tags': 'a,b', 'event_date': '2025-10-17',
+         'event_time': '18:00:00', 'created_at': '2025-10-01T08:00:00+00:00', 'updated_at': '2025-10-02T09:30:00+00:00'},
+        # Fractional seconds, 'Z', no event fields: normalized exactly as the model does
+        {'id': 8, 'title': 'Ünïcode', 'content': '', 'tags': None, 'event_date': None, 'event_time': None,
+         'created_at': '2025-10-01T08:00:00.12+00:00', 'updated_at': '2025-10-02T09:30:00Z'},
+        # Non-canonical time takes the full model path
+        {'id': 'abc', 'title': 't', 'content': 'c', 'tags': None, 'event_date': '2025-10-17',
+         'event_time': '18:00:00.5', 'created_at': '2025-10-01T08:00:00+05:30', 'updated_at': '2025-10-01T08:00:00+05:30'},
+    ]
+    for row in rows:
+        assert Note.dict_from_row(row) == _legacy_to_dict(row)
+        assert list(Note.dict_from_row(row)) == list(_legacy_to_dict(row))
@@ -0,0 +1,22 @@
+import pytest
+
+from src.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, parse_limit
+
+
+def test_cursor_round_trip():
+    token = encode_cursor('2025-10-17T08:30:00+00:00', 42)
+    assert decode_cursor(token) == ('2025-10-17T08:30:00+00:00', 42)
+
+
+@pytest.mark.parametrize('token', ['not-a-cursor', encode_cursor('yesterday', 1), encode_cursor('2025-10-17', 'a"b')])
+def test_decode_rejects_malformed(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_parse_limit():
+    assert parse_limit(None) == 50
+    assert parse_limit('10') == 10
+    assert parse_limit(10_000) == MAX_PAGE_SIZE
+    with pytest.raises(ValueError):
+        parse_limit('0')
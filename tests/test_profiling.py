@@ -0,0 +1,90 @@
+import pstats
+import tracemalloc
+
+import pytest
+
+from src import profiling
+
+TOKEN = 'secret-token'
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('NOTES_PROFILE_TOKEN', TOKEN)
+    monkeypatch.setenv('NOTES_PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('NOTES_INFER_WORKERS', '0')
+    from src.main_flask import app
+    return app.test_client()
+
+
+def test_requested_is_cheap_and_parses():
+    assert profiling.requested(None, 'limit=10') is None
+    assert profiling.requested('Sample', '') == ('sample', None)
+    assert profiling.requested(None, f'__profile=alloc&__profile_token={TOKEN}') == ('alloc', TOKEN)
+    assert profiling.requested(None, '__profile') == ('cpu', None)
+    # Other parameters merely containing the name are not a profile request
+    assert profiling.requested(None, 'q=my__profile_notes') is None
+    assert profiling.requested(None, '__profile_token=x') is None
+
+
+def test_requires_token(client, monkeypatch):
+    assert client.get('/api/health', headers={'X-Notes-Profile': 'cpu'}).status_code == 403
+    monkeypatch.delenv('NOTES_PROFILE_TOKEN')
+    response = client.get('/api/health', headers={'X-Notes-Profile': 'cpu', 'X-Notes-Profile-Token': ''})
+    assert response.status_code == 403
+    assert client.get('/api/admin/profiles').status_code == 403
+    # Unprofiled requests are untouched
+    response = client.get('/api/health')
+    assert response.status_code == 200 and 'X-Notes-Profile-Id' not in response.headers
+
+
+def test_cpu_profile_covers_streamed_body(client, tmp_path):
+    texts = [f'dentist on {d} october at {d % 12 + 1}pm' for d in range(1, 29)] * 50
+    response = client.post('/api/infer/batch', json={'texts': texts, 'now': '2025-10-16T09:00:00'},
+                           headers={'X-Notes-Profile': 'cpu', 'X-Notes-Profile-Token': TOKEN})
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == len(texts)
+    name = response.headers['X-Notes-Profile-Id']
+    stats = pstats.Stats(str(tmp_path / name))
+    assert any(func[2] == 'infer_event_datetime' for func in stats.stats)
+
+
+def test_sample_and_alloc_modes(client, tmp_path):
+    for mode, suffix in (('sample', '.folded'), ('alloc', '.txt')):
+        response = client.get(f'/api/health?__profile={mode}&__profile_token={TOKEN}')
+        assert response.status_code == 200
+        assert response.headers['X-Notes-Profile-Id'].endswith(suffix)
+    assert client.get('/api/health', headers={'X-Notes-Profile': 'nope', 'X-Notes-Profile-Token': TOKEN}).status_code == 400
+
+
+def test_overlapping_alloc_sessions_share_tracemalloc(tmp_path, monkeypatch):
+    monkeypatch.setenv('NOTES_PROFILE_DIR', str(tmp_path))
+    # Two requests whose sessions interleave: the first to start is the first to finish
+    first = profiling.Session('alloc', 'first').__enter__()
+    second = profiling.Session('alloc', 'second').__enter__()
+    first.__exit__(None, None, None)
+    assert tracemalloc.is_tracing()
+    second.__exit__(None, None, None)
+    assert first.name and second.name
+    assert not tracemalloc.is_tracing()
+    # Tracing started elsewhere is left running
+    tracemalloc.start()
+    try:
+        with profiling.Session('alloc', 'traced'):
+            pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_admin_list_and_download(client, tmp_path):
+    name = client.get('/api/health', headers={'X-Notes-Profile': 'alloc', 'X-Notes-Profile-Token': TOKEN}
+                      ).headers['X-Notes-Profile-Id']
+    listing = client.get('/api/admin/profiles', headers={'X-Notes-Profile-Token': TOKEN}).get_json()
+    assert [p['name'] for p in listing['profiles']] == [name]
+    assert listing['profiles'][0]['mode'] == 'alloc'
+    download = client.get(f'/api/admin/profiles/{name}?token={TOKEN}')
+    assert download.status_code == 200 and download.data.startswith(b'# GET /api/health')
+    assert client.get(f'/api/admin/profiles/missing.prof?token={TOKEN}').status_code == 404
+    assert profiling.profile_path(f'../{name}') is None and profiling.profile_path('app.db') is None
+    assert client.get(f'/api/admin/profiles/{name}').status_code == 403
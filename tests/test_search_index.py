@@ -0,0 +1,121 @@
+import asyncio
+import math
+import random
+from types import SimpleNamespace
+
+from src import search_index
+from src.search_index import NoteIndex, tokenize
+
+
+def _docs(n, seed=3):
+    rnd = random.Random(seed)
+    vocab = [f'w{i}' for i in range(60)]
+    for i in range(n):
+        yield {
+            'id': i + 1,
+            'title': ' '.join(rnd.choices(vocab[:10], k=2)),
+            'content': ' '.join(rnd.choices(vocab, k=rnd.randint(3, 30))),
+            'tags': 'even' if i % 2 == 0 else 'odd',
+            'updated_at': f'2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}',
+        }
+
+
+def _brute_force(index, q, tag=None):
+    n = len(index)
+    avgdl = index.total_len / n
+    scores = {}
+    for term in set(tokenize(q)):
+        docnos, tfs = index.postings.get(term, ((), ()))
+        idf = math.log(1 + (n - len(docnos) + 0.5) / (len(docnos) + 0.5))
+        for d, tf in zip(docnos, tfs):
+            if index.doc_ids[d] is None or (tag and tag not in index.doc_tags[d]):
+                continue
+            denom = tf + index.K1 * (1 - index.B + index.B * index.doc_len[d] / avgdl)
+            scores[d] = scores.get(d, 0.0) + idf * tf * (index.K1 + 1) / denom
+    return sorted(scores.values(), reverse=True)
+
+
+def test_pruned_ranking_matches_brute_force():
+    index = NoteIndex()
+    for doc in _docs(400):
+        index.add(doc)
+    for q, tag in [('w1 w55', None), ('w0 w2 w59', None), ('w3 w40', 'even')]:
+        hits, has_more = index.search(q, tags=[tag] if tag else (), limit=10)
+        expected = _brute_force(index, q, tag)
+        assert [round(s, 9) for _, s in hits] == [round(s, 9) for s in expected[:10]]
+        assert has_more == (len(expected) > 10)
+
+
+def test_incremental_updates_and_snapshot(tmp_path):
+    index = NoteIndex()
+    index.add({'id': 1, 'title': 'Badminton', 'content': 'at PolyU', 'tags': 'sports'})
+    index.add({'id': 2, 'title': '會議', 'content': '明天下午開會', 'tags': 'work'})
+    index.add({'id': 1, 'title': 'Tennis', 'content': 'at PolyU', 'tags': 'sports'})
+    assert [d['id'] for d, _ in index.search('badminton')[0]] == []
+    assert [d['id'] for d, _ in index.search('polyu', tags=['Sports'])[0]] == [1]
+    assert [d['id'] for d, _ in index.search('開會')[0]] == [2]
+
+    path = str(tmp_path / 'index.snap')
+    index.save(path)
+    restored = NoteIndex.load(path)
+    restored.remove(2)
+    restored.compact()
+    assert restored.search('開會') == ([], False)
+    assert [d['id'] for d, _ in restored.search('tennis')[0]] == [1]
+
+
+def test_build_and_restore_page_past_postgrest_max_rows(tmp_path, monkeypatch):
+    from postgrest import AsyncPostgrestClient
+
+    from src.models import note_supabase
+    from tests.fake_postgrest import FakePostgREST, timestamptz
+
+    fake = FakePostgREST(max_rows=1000)
+    url = fake.start()
+    try:
+        ids = fake.seed(1100)
+        clients = {}
+
+        async def get_client():
+            # One client per asyncio.run() loop, as db_config keeps them
+            return clients.setdefault(asyncio.get_running_loop(), AsyncPostgrestClient(url + '/rest/v1'))
+
+        monkeypatch.setattr(note_supabase, 'init_supabase_if_needed', lambda: True)
+        monkeypatch.setattr(note_supabase, 'get_async_supabase', get_client)
+        monkeypatch.setenv('NOTES_SEARCH_SNAPSHOT', str(tmp_path / 'index.snap'))
+        monkeypatch.setattr(search_index, '_index', None)
+        assert len(asyncio.run(search_index.ensure_built(note_supabase.Note))) == 1100
+
+        # A restarted worker catches up on more changed rows than one read returns
+        with fake.lock:
+            fake.db.execute("UPDATE notes SET title = 'renamed', updated_at = ?", (timestamptz(),))
+            fake.db.execute('DELETE FROM notes WHERE id IN (?, ?)', ids[:2])
+            fake.db.commit()
+        monkeypatch.setattr(search_index, '_index', None)
+        index = asyncio.run(search_index.ensure_built(note_supabase.Note))
+        assert len(index) == 1098
+        assert len(index.search('renamed', limit=2000)[0]) == 1098
+    finally:
+        monkeypatch.setattr(search_index, '_index', None)
+        fake.stop()
+
+
+def test_writes_during_build_are_replayed(monkeypatch):
+    monkeypatch.setattr(search_index, '_index', None)
+    monkeypatch.delenv('NOTES_SEARCH_SNAPSHOT', raising=False)
+    late = {'id': '3', 'title': 'late', 'content': 'written mid build', 'tags': None}
+
+    class Notes:
+        @classmethod
+        async def get_page(cls, limit, cursor=None, as_dicts=False):
+            # Writes land while the build is still reading
+            search_index.index_note(SimpleNamespace(to_dict=lambda: late))
+            search_index.remove_note('1')
+            return [{'id': '1', 'title': 'gone', 'content': 'x'}, {'id': '2', 'title': 'kept', 'content': 'x'}], None
+
+    try:
+        index = asyncio.run(search_index.ensure_built(Notes))
+        assert sorted(index.docno_by_id) == ['2', '3']
+        assert search_index._pending is None
+    finally:
+        monkeypatch.setattr(search_index, '_index', None)
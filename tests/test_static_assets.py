@@ -0,0 +1,63 @@
+import gzip
+
+import pytest
+
+from src import static_assets
+from src.static_assets import AssetTable, negotiate
+
+
+@pytest.fixture
+def table(tmp_path):
+    (tmp_path / 'index.html').write_text('<html>' + 'note ' * 2000 + '</html>')
+    (tmp_path / 'favicon.ico').write_bytes(bytes(range(256)))
+    return AssetTable(str(tmp_path))
+
+
+def test_gzip_variant_and_fallback_to_index(table):
+    status, headers, body = table.respond('/notes/42', 'gzip, deflate', None)
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Type'] == 'text/html; charset=utf-8'
+    assert headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(body).startswith(b'<html>note')
+
+
+def test_identity_and_incompressible(table):
+    status, headers, body = table.respond('', None, None)
+    assert 'Content-Encoding' not in headers and body.startswith(b'<html>')
+    # Random-looking bytes are not worth compressing: only the identity variant exists
+    status, headers, body = table.respond('favicon.ico', 'gzip', None)
+    assert 'Content-Encoding' not in headers and body == bytes(range(256))
+
+
+def test_conditional_get_is_per_variant(table):
+    _, plain, _ = table.respond('index.html', None, None)
+    _, zipped, _ = table.respond('index.html', 'gzip', None)
+    assert plain['ETag'] != zipped['ETag']
+    assert table.respond('index.html', 'gzip', zipped['ETag'])[0] == 304
+    assert table.respond('index.html', None, zipped['ETag'])[0] == 200
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, br', 'br'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0', ''),
+    ('*', 'br'),
+    ('identity', ''),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ('', 'br', 'gzip')) == expected
+
+
+def test_missing_folder():
+    assert AssetTable(None).respond('x', None, None) is None
+
+
+def test_table_is_built_once(tmp_path, monkeypatch):
+    monkeypatch.delenv('NOTES_STATIC_RELOAD', raising=False)
+    (tmp_path / 'index.html').write_text('v1')
+    first = static_assets.get_table(str(tmp_path))
+    (tmp_path / 'index.html').write_text('v2')
+    assert static_assets.get_table(str(tmp_path)) is first
+    monkeypatch.setenv('NOTES_STATIC_RELOAD', '1')
+    assert static_assets.get_table(str(tmp_path)).respond('', None, None)[2] == b'v2'
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from src import sync
+from src.models.note import Note, db
+from src.routes.note import note_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    app.register_blueprint(note_bp, url_prefix='/api')
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+
+
+def test_token_round_trip():
+    token = sync.encode_token('2025-10-17T08:30:00+00:00', None)
+    assert sync.decode_token(token) == ('2025-10-17T08:30:00+00:00', None)
+
+
+@pytest.mark.parametrize('token', ['nope', sync.encode_token('yesterday', None)])
+def test_decode_rejects_malformed(token):
+    with pytest.raises(ValueError):
+        sync.decode_token(token)
+
+
+def test_changes_return_updates_and_tombstones(client):
+    kept = client.post('/api/notes', json={'title': 'kept', 'content': 'x'}).get_json()
+    doomed = client.post('/api/notes', json={'title': 'doomed', 'content': 'x'}).get_json()
+    token = client.get('/api/notes/changes').get_json()['sync_token']
+
+    client.put(f"/api/notes/{kept['id']}", json={'title': 'kept v2'})
+    client.delete(f"/api/notes/{doomed['id']}")
+    created = client.post('/api/notes', json={'title': 'new', 'content': 'x'}).get_json()
+
+    delta = client.get(f'/api/notes/changes?since={token}').get_json()
+    assert {n['title'] for n in delta['notes']} == {'kept v2', 'new'}
+    assert delta['deleted'] == [str(doomed['id'])]
+
+    # Nothing changed since: only rows inside the safety window come back
+    again = client.get(f"/api/notes/changes?since={delta['sync_token']}").get_json()
+    assert {n['id'] for n in again['notes']} <= {kept['id'], created['id']}
+    assert again['deleted'] == [str(doomed['id'])]
+
+
+def _pull(get, token):
+    notes, deleted = [], []
+    while True:
+        delta = get(token)
+        notes += [str(n['id']) for n in delta['notes']]
+        deleted += delta['deleted']
+        token = delta['sync_token']
+        if not delta['has_more']:
+            return notes, deleted, token
+
+
+def test_changes_page_without_skipping_or_repeating(client, monkeypatch):
+    monkeypatch.setattr(sync, 'PAGE_SIZE', 3)
+    token = client.get('/api/notes/changes').get_json()['sync_token']
+    # A bulk insert gives many rows one updated_at, so pages continue by (updated_at, id)
+    stamp = datetime.utcnow()
+    db.session.add_all([Note(title=f'n{i}', content='x', created_at=stamp, updated_at=stamp) for i in range(8)])
+    db.session.commit()
+    ids = [str(n.id) for n in Note.query.order_by(Note.id)]
+    for note_id in ids[:4]:
+        client.delete(f'/api/notes/{note_id}')
+
+    notes, deleted, token = _pull(lambda t: client.get(f'/api/notes/changes?since={t}').get_json(), token)
+    assert sorted(notes, key=int) == ids[4:]
+    assert sorted(deleted, key=int) == ids[:4]
+
+    # A write stamped before the watermark but committed after it is still sent
+    watermark = datetime.fromisoformat(sync.decode_token(token)[0])
+    late = Note(title='late', content='x', updated_at=watermark - timedelta(seconds=2))
+    db.session.add(late)
+    db.session.commit()
+    assert str(late.id) in _pull(lambda t: client.get(f'/api/notes/changes?since={t}').get_json(), token)[0]
+
+
+def test_supabase_changes_page_past_postgrest_max_rows(monkeypatch):
+    from postgrest import AsyncPostgrestClient
+
+    from src.models import note_supabase
+    from tests.fake_postgrest import FakePostgREST
+
+    fake = FakePostgREST(max_rows=1000)
+    url = fake.start()
+    try:
+        ids = fake.seed(1100)
+        monkeypatch.setattr(note_supabase, 'init_supabase_if_needed', lambda: True)
+
+        async def pull():
+            client = AsyncPostgrestClient(url + '/rest/v1')
+
+            async def get_client():
+                return client
+
+            monkeypatch.setattr(note_supabase, 'get_async_supabase', get_client)
+            notes, deleted = [], []
+            token = sync.encode_token(None, None)
+            while True:
+                delta = await sync.changes(note_supabase.Note, token)
+                notes += [int(n['id']) for n in delta['notes']]
+                deleted += delta['deleted']
+                token = delta['sync_token']
+                if not delta['has_more']:
+                    return notes, deleted
+
+        notes, deleted = asyncio.run(pull())
+        assert notes == ids and deleted == []
+    finally:
+        fake.stop()
+
+
+def test_changes_reject_bad_token(client):
+    assert client.get('/api/notes/changes?since=garbage').status_code == 400
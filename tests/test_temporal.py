@@ -0,0 +1,48 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from src import temporal
+from src.models.note import Note
+from src.models.note_supabase import Note as SupabaseNote
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-10-17', date(2025, 10, 17)),
+    ('2025-10-17T08:00:00Z', date(2025, 10, 17)),
+    ('17/10/2025', date(2025, 10, 17)),
+    ('05/10/2025', date(2025, 10, 5)),      # DD/MM first
+    ('10/17/2025', date(2025, 10, 17)),     # MM/DD when DD/MM is no date
+    ('17-10-2025', date(2025, 10, 17)),
+    ('2025/10/17', date(2025, 10, 17)),
+    ('20251017', date(2025, 10, 17)),
+    ('2025-02-30', None),
+    ('tomorrow', None),
+    ('null', None),
+    (datetime(2025, 10, 17, 9, 30), date(2025, 10, 17)),
+])
+def test_parse_date(value, expected):
+    assert temporal.parse_date(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('18:30', time(18, 30)),
+    ('2:43 pm', time(14, 43)),
+    ('12:05 a.m.', time(0, 5)),
+    ('0930', time(9, 30)),
+    ('25:75', time(23, 59)),
+    ('10:30:00.5+08:00', time(10, 30)),
+    ('noon', None),
+    ('', None),
+])
+def test_parse_time(value, expected):
+    result = temporal.parse_time(value)
+    assert (result.replace(tzinfo=None) if result else result) == expected
+
+
+def test_both_models_share_the_normalizers():
+    assert Note.parse_date('17/10/2025') == date(2025, 10, 17)
+    assert SupabaseNote.format_date_str('17/10/2025') == '2025-10-17'
+    assert SupabaseNote.format_time_str(time(9, 5, 7, 123)) == '09:05:07'
+    note = SupabaseNote(id=1, title='t', content='c', event_date='2025-10-17', event_time='09:30')
+    assert (note.to_dict()['event_date'], note.to_dict()['event_time']) == ('2025-10-17', '09:30:00')
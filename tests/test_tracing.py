@@ -0,0 +1,89 @@
+import asyncio
+import json
+import sys
+import types
+
+import pytest
+
+from src import async_runner, tracing
+
+
+def test_span_is_a_noop_outside_a_request():
+    assert tracing.current() is None
+    with tracing.span('db.get_all') as s:
+        pass
+    assert s is tracing._NO_SPAN
+
+
+def test_totals_server_timing_and_context_propagation():
+    token = tracing.start()
+    trace = tracing.current()
+
+    @tracing.traced('db.get_by_id')
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return 1
+
+    assert async_runner.run(fetch()) == 1  # span recorded on the background loop
+    async_runner.run(fetch())
+    with tracing.span('to_dict'):
+        pass
+    timing = tracing.finish(token, 'GET /x')
+    assert tracing.current() is None
+    assert trace.totals['db.get_by_id'][0] == 2
+    names = [part.split(';')[0] for part in timing.split(', ')]
+    assert names == ['db.get_by_id', 'to_dict', 'total']
+    assert 'db.get_by_id;dur=' in timing and ';desc="2 calls"' in timing
+
+
+def test_slow_requests_are_written_as_chrome_traces(tmp_path, monkeypatch):
+    monkeypatch.setenv('NOTES_TRACE_SLOW_MS', '0')
+    monkeypatch.setenv('NOTES_TRACE_DIR', str(tmp_path))
+    token = tracing.start()
+    with tracing.span('llm'):
+        pass
+    tracing.finish(token, 'POST /api/notes/generate-and-save')
+    [path] = tmp_path.iterdir()
+    data = json.loads(path.read_text())
+    assert [e['name'] for e in data['traceEvents']] == ['POST /api/notes/generate-and-save', 'llm']
+    assert all(e['ph'] == 'X' for e in data['traceEvents'])
+
+
+def test_disabled(monkeypatch):
+    monkeypatch.setenv('NOTES_SERVER_TIMING', '0')
+    assert tracing.start() is None
+    assert tracing.finish(None, 'GET /') is None
+
+
+@pytest.fixture
+def flask_app(monkeypatch):
+    from src import main_flask
+    monkeypatch.setattr(main_flask, 'init_supabase_if_needed', lambda: True)
+    return main_flask
+
+
+def test_generate_and_save_breakdown(flask_app, monkeypatch):
+    fake_llm = types.ModuleType('src.llm')
+
+    @tracing.traced('llm')
+    def extract_notes(text, lang='English'):
+        return {'title': 'Lunch', 'content': text, 'tags': ['food']}
+
+    fake_llm.extract_notes = extract_notes
+    monkeypatch.setitem(sys.modules, 'src.llm', fake_llm)
+
+    class Saved:
+        @tracing.traced('to_dict')
+        def to_dict(self):
+            return {'id': '1'}
+
+    async def create(**fields):
+        with tracing.span('db.create'):
+            await asyncio.sleep(0)
+        return Saved()
+
+    monkeypatch.setattr(flask_app.Note, 'create', create)
+    response = flask_app.app.test_client().post('/api/notes/generate-and-save', json={'text': 'lunch tomorrow at noon'})
+    assert response.status_code == 201
+    names = [part.split(';')[0] for part in response.headers['Server-Timing'].split(', ')]
+    assert sorted(names) == ['db.create', 'infer', 'llm', 'to_dict', 'total']
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from src import llm_clients
+from src.translation import batch_messages, parse_batch, translate_fields
+from tests.fake_llm import FakeLLM, default_responder
+
+LATENCY = 0.2
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeLLM(latency=LATENCY)
+    url = fake.start()
+    monkeypatch.setenv('GITHUB_TOKEN', 'test-token')
+    monkeypatch.setenv('GITHUB_MODELS_ENDPOINT', url)
+    llm_clients.close_all()
+    yield fake
+    llm_clients.close_all()
+    fake.stop()
+
+
+def _complete(messages):
+    resp = llm_clients.get_client('github').chat.completions.create(model='fake', messages=messages)
+    return resp.choices[0].message.content
+
+
+def translator(text, lang):
+    return _complete([{'role': 'user', 'content': f'Translate the following text to {lang}:\n\n{text}'}])
+
+
+def batch_translator(texts, lang):
+    return parse_batch(_complete(batch_messages(texts, lang)), len(texts))
+
+
+def test_parse_batch():
+    assert parse_batch('```json\n["a", "b"]\n```', 2) == ['a', 'b']
+    with pytest.raises(ValueError):
+        parse_batch('["a"]', 2)
+    with pytest.raises(ValueError):
+        parse_batch('not json', 1)
+
+
+def test_fields_translate_concurrently_with_one_tag_call(fake):
+    start = time.perf_counter()
+    result = translate_fields(translator, batch_translator, 'Hi', 'Body', ['work', 'home', 'urgent'], 'French')
+    elapsed = time.perf_counter() - start
+    assert result == {
+        'title': '[French] Hi',
+        'content': '[French] Body',
+        'tags': ['[French] work', '[French] home', '[French] urgent'],
+    }
+    assert len(fake.requests) == 3
+    assert elapsed < 2 * LATENCY
+
+
+def test_bad_batch_reply_falls_back_to_per_tag_calls(fake):
+    fake.responder = lambda messages: (
+        '["only one"]' if 'JSON array' in messages[-1]['content'] else default_responder(messages)
+    )
+    result = translate_fields(translator, batch_translator, '', '', ['a', 'b'], 'German')
+    assert result == {'title': '', 'content': '', 'tags': ['[German] a', '[German] b']}
+    assert len(fake.requests) == 3